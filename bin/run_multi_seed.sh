@@ -5,7 +5,12 @@
 #   RUN_MULTI_SEED_WORKERS=2 ./bin/run_multi_seed.sh pymarl2 qmix sc2 5 --map 3s5z --with t_max=3000000
 #   ./bin/run_multi_seed.sh pymarl2 qmix sc2v2 3 --map protoss_5_vs_5 --wandb smac2
 #   ./bin/run_multi_seed.sh marllib mappo mpe 4 --map simple_tag --timesteps 2000000 --num-workers 8
+#   ./bin/run_multi_seed.sh marllib mappo mpe 8 --map simple_tag --num-workers 3 --workers 0 --shared-ray
 #   ./bin/run_multi_seed.sh marllib mappo overcooked 2 --map cramped_room --num-gpus 1 --local-mode
+#   ./bin/run_multi_seed.sh pymarl2 qmix sc2v2 16 --map protoss_5_vs_5 --workers 0 --job-cores 2 --job-mem-gb 6 --env-procs 32
+#
+# 시드 실행은 scripts/seed_scheduler.py가 담당합니다. 작업마다 선언한 코어/메모리/env 프로세스가
+# 비는 즉시 다음 시드를 시작하므로 앞선 시드가 느려도 빈 슬롯이 놀지 않습니다.
 
 set -euo pipefail
 
@@ -18,10 +23,23 @@ Usage: run_multi_seed.sh <framework> <algorithm> <environment> <num_seeds> [opti
   num_seeds  : 실행할 시드 개수 (양의 정수)
 
 Common options:
-  --workers <int>       동시에 실행할 실험 수 (기본 RUN_MULTI_SEED_WORKERS 또는 1)
+  --workers <int>       동시에 실행할 실험 수 (기본 RUN_MULTI_SEED_WORKERS 또는 1, 0이면 자원으로만 제한)
   --start-seed <int>    시작 시드 값 (기본 1000)
   --timesteps <int>     PyMARL2 t_max 또는 MARLlib 학습 스텝
 
+Scheduler options:
+  --job-cores <int>     시드당 CPU 코어, 지정하면 시드별로 코어를 고정 (기본 pymarl2 총 코어/workers,
+                        marllib num-workers+1, 기본값일 때는 코어를 고정하지 않음)
+  --job-mem-gb <float>  시드당 메모리 GiB (기본 0: 제한 없음)
+  --job-env-procs <int> 시드당 env 프로세스 수 (기본 SMAC 계열 1, 그 외 0)
+  --cores <int>         사용할 총 코어 (기본 현재 CPU affinity)
+  --mem-gb <float>      사용할 총 메모리 GiB (기본 물리 메모리)
+  --env-procs <int>     동시에 띄울 SC2 등 env 프로세스 상한 (기본 무제한)
+  --log-dir <path>      시드별 로그 파일 디렉터리 (기본 터미널 출력)
+  --no-pin-cores        시드별 코어 고정과 OMP/MKL/torch 스레드 제한을 끄기
+  --fork-server         (PyMARL2) torch/sacred/smacv2를 미리 import한 fork-server를 띄워 시드마다 재사용
+  --shared-ray          (MARLlib) Ray head를 한 번만 띄우고 모든 시드가 그 위에서 trial을 실행 (--cores만큼 CPU 등록)
+
 PyMARL2 전용 옵션:
   --wandb <name>        W&B 프리셋 이름 (기본 default)
   --env-config <name>   PyMARL2 환경 설정 이름 (기본 sc2)
@@ -75,12 +93,8 @@ if [ -f "$SETUP_SCRIPT" ]; then
     source "$SETUP_SCRIPT"
 fi
 
-if [ "$FRAMEWORK" = "pymarl2" ]; then
-    PATCH_SCRIPT="$PROJECT_ROOT/scripts/apply_pymarl2_patches.sh"
-    if [ -x "$PATCH_SCRIPT" ]; then
-        "$PATCH_SCRIPT"
-    fi
-fi
+# 지문이 같으면 즉시 반환하고, 필요할 때만 잠금을 잡고 적용합니다.
+python "$PROJECT_ROOT/scripts/patch_manager.py" "$FRAMEWORK"
 
 MAX_WORKERS=${RUN_MULTI_SEED_WORKERS:-1}
 START_SEED=1000
@@ -103,6 +117,17 @@ CORE_ARCH=""
 ENCODE_LAYER=""
 TIMESTEPS=""
 
+JOB_CORES=""
+JOB_MEM_GB=0
+JOB_ENV_PROCS=""
+TOTAL_CORES=""
+TOTAL_MEM_GB=""
+TOTAL_ENV_PROCS=""
+LOG_DIR=""
+PIN_CORES=1
+USE_FORK_SERVER=0
+USE_SHARED_RAY=0
+
 REMAINDER=()
 
 while [[ $# -gt 0 ]]; do
@@ -125,12 +150,22 @@ while [[ $# -gt 0 ]]; do
         --encode-layer) ENCODE_LAYER=$2; shift 2;;
         --local-mode) LOCAL_MODE=1; shift 1;;
         --force-coop) FORCE_COOP=1; shift 1;;
+        --job-cores) JOB_CORES=$2; shift 2;;
+        --job-mem-gb) JOB_MEM_GB=$2; shift 2;;
+        --job-env-procs) JOB_ENV_PROCS=$2; shift 2;;
+        --cores) TOTAL_CORES=$2; shift 2;;
+        --mem-gb) TOTAL_MEM_GB=$2; shift 2;;
+        --env-procs) TOTAL_ENV_PROCS=$2; shift 2;;
+        --log-dir) LOG_DIR=$2; shift 2;;
+        --no-pin-cores) PIN_CORES=0; shift 1;;
+        --fork-server) USE_FORK_SERVER=1; shift 1;;
+        --shared-ray) USE_SHARED_RAY=1; shift 1;;
         --) shift; REMAINDER=("$@") ; break;;
         *) REMAINDER+=("$1"); shift;;
     esac
 done
 
-if ! [[ $MAX_WORKERS =~ ^[0-9]+$ ]] || [ "$MAX_WORKERS" -lt 1 ]; then
+if ! [[ $MAX_WORKERS =~ ^[0-9]+$ ]]; then
     MAX_WORKERS=1
 fi
 if ! [[ $START_SEED =~ ^[0-9]+$ ]]; then
@@ -142,21 +177,42 @@ if [ "$FRAMEWORK" = "marllib" ] && [ -z "$MAP_NAME" ]; then
     exit 1
 fi
 
-JOB_PIDS=()
-FAILURE=0
+if [[ "$USE_SHARED_RAY" -eq 1 ]]; then
+    if [ "$FRAMEWORK" != "marllib" ]; then
+        echo "--shared-ray는 MARLlib에서만 사용할 수 있습니다." >&2
+        exit 1
+    fi
+    if [[ "$LOCAL_MODE" -eq 1 ]]; then
+        echo "--shared-ray와 --local-mode는 함께 쓸 수 없습니다." >&2
+        exit 1
+    fi
+    # rollout worker는 공유 head의 raylet이 띄우므로 시드별 코어 고정은 의미가 없습니다.
+    # Ray가 trial마다 num_workers+1 CPU를 예약하고, 남는 자원이 없으면 trial을 대기시킵니다.
+    PIN_CORES=0
+fi
 
-cleanup() {
-    if [ ${#JOB_PIDS[@]} -gt 0 ]; then
-        kill "${JOB_PIDS[@]}" 2>/dev/null || true
+if [ -z "$JOB_CORES" ]; then
+    # 코어 수를 직접 주지 않았으면 고정하지 않습니다. 한 코어에 trainer·env worker·SC2가
+    # 몰려 느려지는 것을 막기 위해서이며, pymarl2는 스케줄러가 총 코어 // workers로 셉니다.
+    PIN_CORES=0
+    if [ "$FRAMEWORK" = "marllib" ]; then
+        JOB_CORES=$((NUM_WORKERS + 1))
     fi
-}
-trap cleanup INT TERM
+fi
+if [ -z "$JOB_ENV_PROCS" ]; then
+    if [[ "$FRAMEWORK" = "pymarl2" && "$ENV_CONFIG" == sc2* ]]; then
+        JOB_ENV_PROCS=1
+    else
+        JOB_ENV_PROCS=0
+    fi
+fi
+
+# 명령 템플릿: {seed}는 스케줄러가 시드별로 치환합니다.
+CURRENT_SEED="{seed}"
+JOB_CMD=()
 
 launch_command() {
-    local cmd=("$@")
-    echo "[seed $CURRENT_SEED] ${cmd[*]}"
-    "${cmd[@]}" &
-    JOB_PIDS+=("$!")
+    JOB_CMD=("$@")
 }
 
 run_pymarl2() {
@@ -213,6 +269,7 @@ echo "algorithm   : $ALGORITHM"
 echo "environment : $TARGET_ENV"
 echo "num_seeds   : $NUM_SEEDS (start_seed=$START_SEED)"
 echo "max_workers : $MAX_WORKERS"
+echo "job needs   : cores=${JOB_CORES:-auto} mem_gb=$JOB_MEM_GB env_procs=$JOB_ENV_PROCS"
 if [ "$FRAMEWORK" = "pymarl2" ]; then
     echo "wandb       : $WANDB_CONFIG"
     echo "env_config  : $ENV_CONFIG"
@@ -222,37 +279,53 @@ else
     echo "share_policy: $SHARE_POLICY"
     echo "num_workers : $NUM_WORKERS"
     echo "num_gpus    : $NUM_GPUS"
+    echo "shared_ray  : $([[ "$USE_SHARED_RAY" -eq 1 ]] && echo yes || echo no)"
     echo "wandb       : $WANDB_CONFIG"
 fi
 echo "========================"
 
-for ((i=0; i<NUM_SEEDS; i++)); do
-    CURRENT_SEED=$((START_SEED + i))
-    if [ "$FRAMEWORK" = "pymarl2" ]; then
-        run_pymarl2
-    else
-        run_marllib
-    fi
+if [ "$FRAMEWORK" = "pymarl2" ]; then
+    run_pymarl2
+else
+    run_marllib
+fi
 
-    while [ ${#JOB_PIDS[@]} -ge "$MAX_WORKERS" ]; do
-        wait "${JOB_PIDS[0]}"
-        EXIT_CODE=$?
-        JOB_PIDS=("${JOB_PIDS[@]:1}")
-        if [ $EXIT_CODE -ne 0 ]; then
-            FAILURE=1
-        fi
+SCHEDULER_ARGS=(
+    --name "$FRAMEWORK-$ALGORITHM-$TARGET_ENV"
+    --seeds "$START_SEED-$((START_SEED + NUM_SEEDS - 1))"
+    --workers "$MAX_WORKERS"
+    --job-mem-gb "$JOB_MEM_GB"
+    --job-env-procs "$JOB_ENV_PROCS"
+)
+if [[ -n "$JOB_CORES" ]]; then SCHEDULER_ARGS+=(--job-cores "$JOB_CORES"); fi
+if [[ -n "$TOTAL_CORES" ]]; then SCHEDULER_ARGS+=(--cores "$TOTAL_CORES"); fi
+if [[ -n "$TOTAL_MEM_GB" ]]; then SCHEDULER_ARGS+=(--mem-gb "$TOTAL_MEM_GB"); fi
+if [[ -n "$TOTAL_ENV_PROCS" ]]; then SCHEDULER_ARGS+=(--env-procs "$TOTAL_ENV_PROCS"); fi
+if [[ -n "$LOG_DIR" ]]; then SCHEDULER_ARGS+=(--log-dir "$LOG_DIR"); fi
+if [[ "$PIN_CORES" -eq 0 ]]; then SCHEDULER_ARGS+=(--no-pin-cores); fi
+
+if [[ "$USE_FORK_SERVER" -eq 1 && "$FRAMEWORK" = "pymarl2" ]]; then
+    # 이 실행 전용 소켓; 패치는 위에서 이미 적용했습니다.
+    export MARL_LAB_FORK_SERVER="/tmp/marl_lab_fork_$$.sock"
+    python "$PROJECT_ROOT/scripts/fork_server.py" serve --no-patches &
+    FORK_SERVER_PID=$!
+    trap 'kill "$FORK_SERVER_PID" 2>/dev/null || true' EXIT
+    for _ in $(seq 1 240); do
+        if python "$PROJECT_ROOT/scripts/fork_server.py" status >/dev/null 2>&1; then break; fi
+        sleep 0.5
     done
+fi
 
-done
-
-for pid in "${JOB_PIDS[@]}"; do
-    if ! wait "$pid"; then
-        FAILURE=1
-    fi
-
-done
+SCHEDULER_CMD=(python "$PROJECT_ROOT/scripts/seed_scheduler.py" "${SCHEDULER_ARGS[@]}" -- "${JOB_CMD[@]}")
+if [[ "$USE_SHARED_RAY" -eq 1 ]]; then
+    # head를 띄우고 RAY_ADDRESS를 export한 뒤 스케줄러를 실행하고, 끝나면 head를 내립니다.
+    RAY_HEAD_ARGS=()
+    if [[ -n "$TOTAL_CORES" ]]; then RAY_HEAD_ARGS+=(--num-cpus "$TOTAL_CORES"); fi
+    SCHEDULER_CMD=(python "$PROJECT_ROOT/scripts/shared_ray.py" ${RAY_HEAD_ARGS[@]+"${RAY_HEAD_ARGS[@]}"} -- "${SCHEDULER_CMD[@]}")
+fi
 
-trap - INT TERM
+FAILURE=0
+"${SCHEDULER_CMD[@]}" || FAILURE=1
 
 if [ $FAILURE -eq 0 ]; then
     echo "모든 시드 실험이 완료되었습니다."
@@ -0,0 +1 @@
+"""Episode replay buffers selected with ``with buffer=<name>`` (see ``plugins.registry.BUFFERS``)."""
@@ -0,0 +1,190 @@
+"""De-duplicated episode storage for large-unit SMACv2 maps.
+
+Select with ``with buffer=compact``.  The stock ``ReplayBuffer`` keeps every
+``EpisodeBatch`` column as a padded torch tensor, including ones that are
+redundant or derivable.  :class:`CompactEpisodeBuffer` stores NumPy arrays and
+rebuilds the rest when sampling:
+
+* ``avail_actions`` — bit-packed along the action axis (``np.packbits``);
+* ``actions`` — ``int8`` indices (``-1`` where no action was taken), from
+  which ``actions`` and ``actions_onehot`` (the MAC's last-action inputs) are
+  rebuilt;
+* ``state`` — not stored when ``env_args.obs_instead_of_state`` is set; it is
+  the agents' obs concatenated, which is checked on the first insert;
+* ``filled`` — one length per episode;
+* ``obs`` — ``compact_obs_dtype: float16`` optionally halves the largest
+  column (float32 by default, i.e. lossless).
+
+Agent-id one-hots are never stored by PyMARL2; the MAC appends them when it
+builds agent inputs.  Sampled batches are trimmed to the longest sampled
+episode and created on the CPU; ``run.py`` moves them to the learner device.
+"""
+from __future__ import annotations
+
+from types import SimpleNamespace as SN
+from typing import Dict
+
+import numpy as np
+import torch as th
+
+from components.episode_buffer import EpisodeBatch
+
+OBS_DTYPES = ("float32", "float16")
+# Columns handled specially; any other scheme key is stored as-is.
+_DERIVED = {"filled", "actions_onehot"}
+
+
+def _numpy_dtype(dtype: th.dtype) -> np.dtype:
+    return th.empty((), dtype=dtype).numpy().dtype
+
+
+def _to_numpy(tensor: th.Tensor) -> np.ndarray:
+    return tensor.detach().cpu().numpy()
+
+
+class CompactEpisodeBuffer:
+    """Drop-in ``ReplayBuffer`` (``insert_episode_batch``/``can_sample``/``sample``) with compact storage."""
+
+    def __init__(self, scheme, groups, buffer_size, max_seq_length, args=None, preprocess=None, device="cpu"):
+        # A one-episode batch resolves the scheme exactly as ReplayBuffer would
+        # (preprocess outputs such as actions_onehot, plus "filled").
+        template = EpisodeBatch(scheme, groups, 1, max_seq_length, preprocess=preprocess, device="cpu")
+        self.scheme = template.scheme
+        self.groups = groups
+        self.buffer_size = buffer_size
+        self.max_seq_length = max_seq_length
+        self.device = "cpu"
+        self.buffer_index = 0
+        self.episodes_in_buffer = 0
+
+        self.n_agents = groups["agents"]
+        self.n_actions = self.scheme["avail_actions"]["vshape"][0]
+        if self.n_actions > 127:
+            raise ValueError(f"int8 actions support at most 127 actions, got {self.n_actions}")
+        obs_dtype = getattr(args, "compact_obs_dtype", "float32")
+        if obs_dtype not in OBS_DTYPES:
+            raise ValueError(f"compact_obs_dtype must be one of {OBS_DTYPES}, got {obs_dtype!r}")
+        env_args = getattr(args, "env_args", None) or {}
+        self.state_from_obs = bool(env_args.get("obs_instead_of_state", False))
+        self._state_checked = False
+
+        n, t = buffer_size, max_seq_length
+        self.lengths = np.zeros(n, dtype=np.int16)
+        self.actions = np.full((n, t, self.n_agents), -1, dtype=np.int8)
+        self.avail_bits = np.zeros((n, t, self.n_agents, (self.n_actions + 7) // 8), dtype=np.uint8)
+        self.columns: Dict[str, np.ndarray] = {}
+        for key, field in self.scheme.items():
+            if field.get("episode_const", False):
+                raise ValueError(f"episode_const field '{key}' is not supported by the compact buffer")
+            if key in _DERIVED or key in ("actions", "avail_actions"):
+                continue
+            if key == "state" and self.state_from_obs:
+                continue
+            shape = self._field_shape(key)
+            dtype = np.dtype(obs_dtype) if key == "obs" else _numpy_dtype(field.get("dtype", th.float32))
+            self.columns[key] = np.zeros((n, t) + shape, dtype=dtype)
+
+        if self.state_from_obs:
+            state_dim = self._field_shape("state")
+            obs_dim = self._field_shape("obs")
+            if int(np.prod(state_dim)) != int(np.prod(obs_dim)):
+                raise ValueError(
+                    f"obs_instead_of_state is set but state {state_dim} != concatenated obs {obs_dim}"
+                )
+        print(f"[compact] {self!r}: {self.nbytes / 1024 ** 3:.2f} GiB preallocated")
+
+    def _field_shape(self, key: str):
+        field = self.scheme[key]
+        vshape = field["vshape"]
+        shape = (vshape,) if isinstance(vshape, int) else tuple(vshape)
+        if "group" in field:
+            shape = (self.groups[field["group"]],) + shape
+        return shape
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.lengths, self.actions, self.avail_bits, *self.columns.values()]
+        return int(sum(array.nbytes for array in arrays))
+
+    # ReplayBuffer surface ---------------------------------------------------------
+    def insert_episode_batch(self, ep_batch) -> None:
+        bs, t = ep_batch.batch_size, ep_batch.max_seq_length
+        slots = (self.buffer_index + np.arange(bs)) % self.buffer_size
+
+        filled = _to_numpy(ep_batch["filled"]).reshape(bs, t)
+        self.lengths[slots] = filled.sum(axis=1)
+
+        actions = _to_numpy(ep_batch["actions"]).reshape(bs, t, self.n_agents)
+        taken = _to_numpy(ep_batch["actions_onehot"]).any(axis=-1)
+        self.actions[slots, :t] = np.where(taken, actions, -1)
+        self.actions[slots, t:] = -1
+
+        avail = _to_numpy(ep_batch["avail_actions"]) != 0
+        self.avail_bits[slots, :t] = np.packbits(avail, axis=-1)
+
+        if self.state_from_obs and not self._state_checked:
+            obs = _to_numpy(ep_batch["obs"]).reshape(bs, t, -1)
+            if not np.array_equal(obs, _to_numpy(ep_batch["state"]).reshape(bs, t, -1)):
+                raise ValueError("obs_instead_of_state is set but state is not the concatenated obs")
+            self._state_checked = True
+
+        for key, column in self.columns.items():
+            column[slots, :t] = _to_numpy(ep_batch[key]).astype(column.dtype, copy=False)
+
+        self.buffer_index = (self.buffer_index + bs) % self.buffer_size
+        self.episodes_in_buffer = min(self.episodes_in_buffer + bs, self.buffer_size)
+
+    def can_sample(self, batch_size) -> bool:
+        return self.episodes_in_buffer >= batch_size
+
+    def sample(self, batch_size):
+        assert self.can_sample(batch_size)
+        if self.episodes_in_buffer == batch_size:
+            idx = np.arange(batch_size)
+        else:
+            idx = np.random.choice(self.episodes_in_buffer, batch_size, replace=False)
+        return self.episodes(idx)
+
+    def episodes(self, idx) -> EpisodeBatch:
+        """Rebuild a full-scheme ``EpisodeBatch`` for buffer slots ``idx``."""
+        idx = np.asarray(idx)
+        bs = len(idx)
+        t = max(int(self.lengths[idx].max()), 1)
+
+        data = {key: th.from_numpy(column[idx, :t]) for key, column in self.columns.items()}
+        if "obs" in data:
+            data["obs"] = data["obs"].to(self.scheme["obs"].get("dtype", th.float32))
+
+        actions = th.from_numpy(self.actions[idx, :t].astype(np.int64))
+        taken = actions >= 0
+        actions = actions.clamp(min=0)
+        data["actions"] = actions.unsqueeze(-1).to(self.scheme["actions"].get("dtype", th.long))
+        onehot_dtype = self.scheme["actions_onehot"].get("dtype", th.float32)
+        onehot = th.zeros(bs, t, self.n_agents, self.n_actions, dtype=onehot_dtype)
+        onehot.scatter_(-1, actions.unsqueeze(-1), 1)
+        data["actions_onehot"] = onehot * taken.unsqueeze(-1).to(onehot_dtype)
+
+        avail = np.unpackbits(self.avail_bits[idx, :t], axis=-1, count=self.n_actions)
+        data["avail_actions"] = th.from_numpy(avail).to(self.scheme["avail_actions"].get("dtype", th.float32))
+
+        if self.state_from_obs:
+            data["state"] = data["obs"].reshape(bs, t, -1).to(self.scheme["state"].get("dtype", th.float32))
+
+        steps = th.arange(t).unsqueeze(0)
+        filled = steps < th.from_numpy(self.lengths[idx].astype(np.int64)).unsqueeze(1)
+        data["filled"] = filled.unsqueeze(-1).to(self.scheme["filled"]["dtype"])
+
+        return EpisodeBatch(
+            self.scheme,
+            self.groups,
+            bs,
+            t,
+            data=SN(transition_data=data, episode_data={}),
+            device=self.device,
+        )
+
+    def __repr__(self):
+        return "CompactEpisodeBuffer. {}/{} episodes. Keys:{} Groups:{}".format(
+            self.episodes_in_buffer, self.buffer_size, self.scheme.keys(), self.groups.keys()
+        )
+
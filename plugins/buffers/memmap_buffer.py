@@ -0,0 +1,242 @@
+"""Disk-backed replay buffer over preallocated ``np.memmap`` files.
+
+Select with ``with buffer=memmap``.  Every ``EpisodeBatch`` column lives in a
+``.npy`` file (``np.lib.format.open_memmap``) shaped
+``(buffer_size, episode_limit + 1, *shape)`` under ``memmap_dir`` (default
+``<local_results_path>/replay_buffer/<unique_token>``, i.e. one directory per
+run), so the buffer can be far larger than
+RAM: inserts write through the page cache and :meth:`sample` reads only the
+sampled episodes' rows (sorted for locality), trimmed to the longest one.
+
+While the learner trains on one minibatch, a background thread already reads
+the next (``memmap_prefetch``).  Reads and inserts share a lock, so a prefetch
+never sees a half-written episode; a prefetched minibatch may miss episodes
+inserted after it was drawn, which is the usual one-batch lag.
+
+``meta.json`` records the layout and ring position whenever the learner
+saves a checkpoint (the buffer wraps ``learner.save_models``) and on close, so
+it always describes a state the model checkpoint can resume from.  The stored
+episodes are reused only with ``memmap_resume: True`` and a matching layout; ``run_with_wandb.py --resume auto`` sets it together with a
+``memmap_dir`` inside the per-config resume directory.  Otherwise a previous
+buffer's files are moved into a ``stale-<time>`` subdirectory (only this
+directory's own files, never other runs' subdirectories), and a directory
+locked by another live run is replaced by a per-run subdirectory.
+"""
+from __future__ import annotations
+
+import atexit
+import fcntl
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace as SN
+from typing import Any, Dict
+
+import numpy as np
+import torch as th
+
+from components.episode_buffer import EpisodeBatch
+
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+
+
+def _numpy_dtype(dtype: th.dtype) -> np.dtype:
+    return th.empty((), dtype=dtype).numpy().dtype
+
+
+class MemmapEpisodeBuffer:
+    """Drop-in ``ReplayBuffer`` (``insert_episode_batch``/``can_sample``/``sample``) stored in memmap files."""
+
+    def __init__(self, scheme, groups, buffer_size, max_seq_length, args=None, preprocess=None, device="cpu"):
+        template = EpisodeBatch(scheme, groups, 1, max_seq_length, preprocess=preprocess, device="cpu")
+        self.scheme = template.scheme
+        self.groups = groups
+        self.buffer_size = buffer_size
+        self.max_seq_length = max_seq_length
+        self.device = "cpu"
+        self.buffer_index = 0
+        self.episodes_in_buffer = 0
+
+        self._layout: Dict[str, Any] = {"buffer_size": buffer_size, "max_seq_length": max_seq_length, "fields": {}}
+        for key, field in self.scheme.items():
+            if field.get("episode_const", False):
+                raise ValueError(f"episode_const field '{key}' is not supported by the memmap buffer")
+            vshape = field["vshape"]
+            shape = (vshape,) if isinstance(vshape, int) else tuple(vshape)
+            if "group" in field:
+                shape = (groups[field["group"]],) + shape
+            dtype = _numpy_dtype(field.get("dtype", th.float32))
+            self._layout["fields"][key] = [list(shape), dtype.str]
+
+        self.directory = self._claim_directory(args)
+        self.columns: Dict[str, np.memmap] = {}
+        self._open_columns(resume=bool(getattr(args, "memmap_resume", False)))
+
+        self._lock = threading.Lock()
+        self._prefetch = bool(getattr(args, "memmap_prefetch", True))
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memmap-prefetch") if self._prefetch else None
+        self._pending: Future | None = None
+        self._pending_size = 0
+        atexit.register(self.close)
+
+    # Directory / files -------------------------------------------------------------
+    def _claim_directory(self, args) -> Path:
+        token = getattr(args, "unique_token", None) or f"pid{os.getpid()}"
+        base = getattr(args, "memmap_dir", "") or os.path.join(
+            getattr(args, "local_results_path", "results"), "replay_buffer", token
+        )
+        directory = Path(base)
+        directory.mkdir(parents=True, exist_ok=True)
+        self._lock_handle = (directory / LOCK_FILE).open("w")
+        try:
+            fcntl.flock(self._lock_handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_handle.close()
+            print(f"[memmap] {directory}를 다른 실행이 사용 중이어서 {directory / token}에 새 버퍼를 만듭니다.")
+            directory = directory / token
+            directory.mkdir(parents=True, exist_ok=True)
+            self._lock_handle = (directory / LOCK_FILE).open("w")
+            try:
+                fcntl.flock(self._lock_handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._lock_handle.close()
+                raise RuntimeError(
+                    f"memmap buffer directories {base} and {directory} are both locked by other live runs; "
+                    "set a distinct memmap_dir or unique_token"
+                ) from None
+        return directory
+
+    def _open_columns(self, resume: bool) -> None:
+        meta = self._read_meta()
+        matches = meta is not None and {k: meta.get(k) for k in self._layout} == self._layout
+        if meta is not None and resume and not matches:
+            print(f"[memmap] 버퍼 구성이 달라 {self.directory}의 에피소드를 이어 쓰지 않습니다.")
+        resume = resume and matches
+        if meta is not None and not resume:
+            self._move_aside()
+
+        mode = "r+" if resume else "w+"
+        for key, (shape, dtype) in self._layout["fields"].items():
+            self.columns[key] = np.lib.format.open_memmap(
+                self.directory / f"{key}.npy",
+                mode=mode,
+                dtype=np.dtype(dtype),
+                shape=None if resume else (self.buffer_size, self.max_seq_length, *shape),
+            )
+        if resume:
+            self.buffer_index = int(meta["buffer_index"])
+            self.episodes_in_buffer = int(meta["episodes_in_buffer"])
+            print(f"[memmap] {self.directory}에서 에피소드 {self.episodes_in_buffer}개를 복원했습니다.")
+        else:
+            self._write_meta()
+        total = sum(column.nbytes for column in self.columns.values())
+        print(f"[memmap] {self!r}: {total / 1024 ** 3:.2f} GiB on disk at {self.directory}")
+
+    def _move_aside(self) -> None:
+        """Move this directory's own buffer files (not other runs' subdirectories) into ``stale-<time>/``."""
+        stale = self.directory / f"stale-{time.strftime('%Y%m%d-%H%M%S')}"
+        stale.mkdir(exist_ok=True)
+        for path in self.directory.iterdir():
+            if path.is_file() and (path.suffix == ".npy" or path.name == META_FILE):
+                path.rename(stale / path.name)
+        print(f"[memmap] 이전 버퍼 파일을 옮겼습니다: {stale}")
+
+    def _read_meta(self) -> Dict[str, Any] | None:
+        path = self.directory / META_FILE
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self) -> None:
+        path = self.directory / META_FILE
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(
+            json.dumps({**self._layout, "buffer_index": self.buffer_index, "episodes_in_buffer": self.episodes_in_buffer}),
+            encoding="utf-8",
+        )
+        tmp.replace(path)
+
+    def checkpoint(self) -> None:
+        """Flush the columns, then record the ring position (data before meta)."""
+        with self._lock:
+            for column in self.columns.values():
+                column.flush()
+            self._write_meta()
+
+    def attach_learner(self, learner) -> None:
+        """Checkpoint the buffer whenever the learner saves its models."""
+        save_models = learner.save_models
+
+        def save_models_and_buffer(*args, **kwargs):
+            result = save_models(*args, **kwargs)
+            self.checkpoint()
+            return result
+
+        learner.save_models = save_models_and_buffer
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.checkpoint()
+
+    # ReplayBuffer surface ---------------------------------------------------------
+    def insert_episode_batch(self, ep_batch) -> None:
+        bs, t = ep_batch.batch_size, ep_batch.max_seq_length
+        slots = (self.buffer_index + np.arange(bs)) % self.buffer_size
+        rows = {key: ep_batch[key].detach().cpu().numpy() for key in self.columns}
+        with self._lock:
+            for key, column in self.columns.items():
+                column[slots, :t] = rows[key]
+                if t < self.max_seq_length:
+                    column[slots, t:] = 0
+            self.buffer_index = (self.buffer_index + bs) % self.buffer_size
+            self.episodes_in_buffer = min(self.episodes_in_buffer + bs, self.buffer_size)
+
+    def can_sample(self, batch_size) -> bool:
+        return self.episodes_in_buffer >= batch_size
+
+    def sample(self, batch_size):
+        assert self.can_sample(batch_size)
+        if self._executor is None:
+            return self._read(self._draw(batch_size))
+        pending, self._pending = self._pending, None
+        if pending is None or self._pending_size != batch_size:
+            batch = self._read(self._draw(batch_size))
+        else:
+            batch = pending.result()
+        self._pending = self._executor.submit(self._read, self._draw(batch_size))
+        self._pending_size = batch_size
+        return batch
+
+    def _draw(self, batch_size: int) -> np.ndarray:
+        if self.episodes_in_buffer == batch_size:
+            return np.arange(batch_size)
+        return np.sort(np.random.choice(self.episodes_in_buffer, batch_size, replace=False))
+
+    def _read(self, idx: np.ndarray) -> EpisodeBatch:
+        """Page in rows ``idx`` (trimmed to the longest episode) as an ``EpisodeBatch``."""
+        with self._lock:
+            filled = np.asarray(self.columns["filled"][idx]).reshape(len(idx), -1)
+            t = max(int(filled.sum(axis=1).max()), 1)
+            data = {key: th.from_numpy(np.ascontiguousarray(column[idx, :t])) for key, column in self.columns.items()}
+        return EpisodeBatch(
+            self.scheme,
+            self.groups,
+            len(idx),
+            t,
+            data=SN(transition_data=data, episode_data={}),
+            device=self.device,
+        )
+
+    def __repr__(self):
+        return "MemmapEpisodeBuffer. {}/{} episodes. Keys:{} Groups:{}".format(
+            self.episodes_in_buffer, self.buffer_size, self.scheme.keys(), self.groups.keys()
+        )
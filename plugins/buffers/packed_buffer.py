@@ -0,0 +1,187 @@
+"""Variable-length packed episode storage with a length-bucketed sampler.
+
+Select with ``with buffer=packed``.  PyMARL2 pads every stored episode to
+``episode_limit + 1`` steps; SMACv2 battles often end far earlier.
+:class:`PackedEpisodeBuffer` keeps each column as one flat step arena
+(``(steps, *shape)``) used as a ring: episodes are written back to back at a
+head offset, with an offset index (``starts``/``lengths`` per episode slot).
+Reusing an episode slot frees its steps, so the oldest steps ahead of the
+head are normally free again by the time the head reaches them.  The arena
+only grows (doubling) when the next write would overwrite live episodes,
+so it settles at the real steps of ``buffer_size`` episodes, up to 2x for
+the doubling.  ``packed_max_steps`` caps the growth (``0``:
+``buffer_size * (episode_limit + 1)``, the padded size); at the cap the
+oldest live episodes are evicted instead.
+
+:meth:`PackedEpisodeBuffer.sample` draws episodes of similar length: the
+stored episodes are sorted by length and split into consecutive buckets of
+``packed_bucket_factor * batch_size`` episodes, a bucket is picked with
+probability proportional to its size and the minibatch is drawn uniformly
+from it, so every episode keeps the uniform sampling probability
+(``packed_bucket_factor: 0`` samples uniformly from the whole buffer).  The
+returned ``EpisodeBatch`` is padded only to its longest episode and ordered
+longest first, which is what :class:`plugins.controllers.packed_mac.PackedMAC`
+uses to skip finished episodes in the recurrent forward pass.
+"""
+from __future__ import annotations
+
+from types import SimpleNamespace as SN
+from typing import Dict
+
+import numpy as np
+import torch as th
+
+from components.episode_buffer import EpisodeBatch
+
+INITIAL_STEPS = 1 << 16
+
+
+def _numpy_dtype(dtype: th.dtype) -> np.dtype:
+    return th.empty((), dtype=dtype).numpy().dtype
+
+
+class PackedEpisodeBuffer:
+    """Drop-in ``ReplayBuffer`` (``insert_episode_batch``/``can_sample``/``sample``) without padding."""
+
+    def __init__(self, scheme, groups, buffer_size, max_seq_length, args=None, preprocess=None, device="cpu"):
+        template = EpisodeBatch(scheme, groups, 1, max_seq_length, preprocess=preprocess, device="cpu")
+        self.scheme = template.scheme
+        self.groups = groups
+        self.buffer_size = buffer_size
+        self.max_seq_length = max_seq_length
+        self.device = "cpu"
+        self.buffer_index = 0
+        self.episodes_in_buffer = 0
+
+        self.max_steps = int(getattr(args, "packed_max_steps", 0)) or buffer_size * max_seq_length
+        if self.max_steps < max_seq_length:
+            raise ValueError(f"packed_max_steps ({self.max_steps}) must hold one full episode ({max_seq_length})")
+        self.bucket_factor = float(getattr(args, "packed_bucket_factor", 4))
+        if self.bucket_factor != 0 and self.bucket_factor < 1:
+            raise ValueError(f"packed_bucket_factor must be 0 or >= 1, got {self.bucket_factor}")
+
+        self.starts = np.zeros(buffer_size, dtype=np.int64)
+        self.lengths = np.zeros(buffer_size, dtype=np.int64)
+        self.valid = np.zeros(buffer_size, dtype=bool)
+        self.head = 0
+
+        self._shapes: Dict[str, tuple] = {}
+        self.arena: Dict[str, np.ndarray] = {}
+        capacity = min(self.max_steps, INITIAL_STEPS)
+        for key, field in self.scheme.items():
+            if field.get("episode_const", False):
+                raise ValueError(f"episode_const field '{key}' is not supported by the packed buffer")
+            if key == "filled":
+                continue
+            vshape = field["vshape"]
+            shape = (vshape,) if isinstance(vshape, int) else tuple(vshape)
+            if "group" in field:
+                shape = (groups[field["group"]],) + shape
+            self._shapes[key] = shape
+            self.arena[key] = np.zeros((capacity,) + shape, dtype=_numpy_dtype(field.get("dtype", th.float32)))
+
+    @property
+    def capacity(self) -> int:
+        return len(next(iter(self.arena.values())))
+
+    @property
+    def stored_steps(self) -> int:
+        return int(self.lengths[self.valid].sum())
+
+    @property
+    def padding_ratio(self) -> float:
+        """Fraction of a padded buffer's steps that this buffer does not store."""
+        if self.episodes_in_buffer == 0:
+            return 0.0
+        return 1.0 - self.stored_steps / (self.episodes_in_buffer * self.max_seq_length)
+
+    def _grow(self) -> None:
+        """Double the arena; the steps ahead of the head move to the end so the new space follows the head."""
+        old = self.capacity
+        capacity = min(old * 2, self.max_steps)
+        delta = capacity - old
+        for key, array in self.arena.items():
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[: self.head] = array[: self.head]
+            grown[self.head + delta :] = array[self.head :]
+            self.arena[key] = grown
+        self.starts[self.starts >= self.head] += delta
+
+    def _allocate(self, length: int) -> int:
+        """Arena offset for ``length`` steps; grows rather than overwrite live episodes, evicting at the cap."""
+        while True:
+            start = self.head if self.head + length <= self.capacity else 0
+            end = start + length
+            overlap = self.valid & (self.starts < end) & (self.starts + self.lengths > start)
+            if not overlap.any() or self.capacity >= self.max_steps:
+                break
+            self._grow()
+        self.valid[overlap] = False
+        self.head = end
+        return start
+
+    # ReplayBuffer surface ---------------------------------------------------------
+    def insert_episode_batch(self, ep_batch) -> None:
+        bs = ep_batch.batch_size
+        lengths = ep_batch["filled"].detach().cpu().numpy().reshape(bs, -1).sum(axis=1)
+        rows = {key: ep_batch[key].detach().cpu().numpy() for key in self.arena}
+        for b in range(bs):
+            length = max(int(lengths[b]), 1)
+            slot = self.buffer_index
+            self.valid[slot] = False
+            start = self._allocate(length)
+            for key, array in self.arena.items():
+                array[start : start + length] = rows[key][b, :length]
+            self.starts[slot] = start
+            self.lengths[slot] = length
+            self.valid[slot] = True
+            self.buffer_index = (self.buffer_index + 1) % self.buffer_size
+        self.episodes_in_buffer = int(self.valid.sum())
+
+    def can_sample(self, batch_size) -> bool:
+        return self.episodes_in_buffer >= batch_size
+
+    def sample(self, batch_size):
+        assert self.can_sample(batch_size)
+        slots = np.flatnonzero(self.valid)
+        window = int(self.bucket_factor * batch_size)
+        if 0 < window < len(slots):
+            by_length = slots[np.argsort(self.lengths[slots], kind="stable")]
+            # Consecutive buckets of ``window``; the remainder joins the last one.
+            n_buckets = len(slots) // window
+            bounds = np.arange(n_buckets + 1) * window
+            bounds[-1] = len(slots)
+            sizes = np.diff(bounds)
+            bucket = np.random.choice(n_buckets, p=sizes / sizes.sum())
+            slots = by_length[bounds[bucket] : bounds[bucket + 1]]
+        idx = np.random.choice(slots, batch_size, replace=False)
+        return self.episodes(idx)
+
+    def episodes(self, idx) -> EpisodeBatch:
+        """Unpack slots ``idx`` into an ``EpisodeBatch`` padded to its longest episode, longest first."""
+        idx = np.asarray(idx)
+        idx = idx[np.argsort(-self.lengths[idx], kind="stable")]
+        lengths = self.lengths[idx]
+        bs, t = len(idx), int(lengths.max())
+        mask = np.arange(t)[None, :] < lengths[:, None]
+        positions = (self.starts[idx][:, None] + np.arange(t)[None, :])[mask]
+
+        data = {}
+        for key, array in self.arena.items():
+            out = np.zeros((bs, t) + self._shapes[key], dtype=array.dtype)
+            out[mask] = array[positions]
+            data[key] = th.from_numpy(out)
+        data["filled"] = th.from_numpy(mask).unsqueeze(-1).to(self.scheme["filled"]["dtype"])
+        return EpisodeBatch(
+            self.scheme,
+            self.groups,
+            bs,
+            t,
+            data=SN(transition_data=data, episode_data={}),
+            device=self.device,
+        )
+
+    def __repr__(self):
+        return "PackedEpisodeBuffer. {}/{} episodes, {} steps ({:.0%} padding saved). Keys:{}".format(
+            self.episodes_in_buffer, self.buffer_size, self.stored_steps, self.padding_ratio, self.scheme.keys()
+        )
@@ -0,0 +1,133 @@
+"""Proportional prioritized episode replay on top of PyMARL2's ``ReplayBuffer``.
+
+Select with ``with buffer=per``.  Episodes are drawn with probability
+``p_i^alpha / sum_k p_k^alpha`` through a :class:`~plugins.buffers.sum_tree.SumTree`
+(``O(log n)`` sampling and priority writes, batched).  ``sample`` and
+``insert_episode_batch`` keep the ``ReplayBuffer`` signatures, so ``run.py``
+is unchanged; the buffer hooks into the learner instead
+(:meth:`PrioritizedEpisodeBuffer.attach_learner`).  It switches the learner's
+own PER path on (``learner.use_per = True``), which makes the stock learners
+scale the TD loss by ``per_weight`` (a NumPy array they convert themselves)
+and return ``{"td_errors_abs": ...}``; those become the new priorities, and a
+learner that returns none stops the run.  ``beta`` is annealed from
+``per_beta`` to 1 over ``t_max``.
+
+PyMARL2's built-in PER (``use_per=True`` in the config) is not reused: it is
+chosen inside ``run_sequential`` rather than through :data:`plugins.registry.BUFFERS`,
+so it bypasses the buffer hook.  Keep ``use_per`` off in the config with
+``buffer=per``; only the learner's switch is set.
+
+``per_priority`` selects where priorities come from: ``"td"`` (default; new
+episodes enter at the running max priority) or ``"return"``
+(``|episode return|`` at insertion, for sparse-win maps; the learner's TD
+errors are then ignored).
+"""
+from __future__ import annotations
+
+import inspect
+from typing import Any
+
+import numpy as np
+import torch as th
+
+from components.episode_buffer import ReplayBuffer
+
+from plugins.buffers.sum_tree import SumTree
+
+PRIORITY_SOURCES = ("td", "return")
+
+
+def importance_weights(sample_probs, n_stored: int, beta: float, min_prob: float) -> np.ndarray:
+    """``(N * P(i))^-beta`` normalised by the largest possible weight, ``(N * P_min)^-beta``."""
+    probs = np.asarray(sample_probs, dtype=np.float64)
+    weights = (n_stored * probs) ** (-beta)
+    return (weights / (n_stored * min_prob) ** (-beta)).astype(np.float32)
+
+
+def annealed_beta(beta0: float, t_env: int, t_max: int) -> float:
+    return min(1.0, beta0 + (1.0 - beta0) * t_env / max(t_max, 1))
+
+
+class PrioritizedEpisodeBuffer(ReplayBuffer):
+    """``ReplayBuffer`` with sum-tree proportional sampling over episodes."""
+
+    def __init__(self, scheme, groups, buffer_size, max_seq_length, args=None, preprocess=None, device="cpu"):
+        super().__init__(scheme, groups, buffer_size, max_seq_length, preprocess=preprocess, device=device)
+        self.alpha = float(getattr(args, "per_alpha", 0.6))
+        self.beta0 = float(getattr(args, "per_beta", 0.4))
+        self.eps = float(getattr(args, "per_eps", 1e-6))
+        self.priority_source = getattr(args, "per_priority", "td")
+        if self.priority_source not in PRIORITY_SOURCES:
+            raise ValueError(f"per_priority must be one of {PRIORITY_SOURCES}, got {self.priority_source!r}")
+        if getattr(args, "use_per", False):
+            raise ValueError("use_per=True selects PyMARL2's built-in PER buffer; drop it when using buffer=per")
+        self.t_max = int(getattr(args, "t_max", 1))
+        self.tree = SumTree(buffer_size)
+        self.max_priority = 1.0
+        self._rng = np.random.default_rng(getattr(args, "seed", None))
+        self.last_sample_idx = np.zeros(0, dtype=np.int64)
+        self.last_sample_probs = np.zeros(0, dtype=np.float64)
+
+    # ReplayBuffer surface ---------------------------------------------------------
+    def insert_episode_batch(self, ep_batch):
+        # ReplayBuffer splits wrap-around inserts by calling this method again
+        # on each half, so only the non-wrapping case assigns priorities.
+        if self.buffer_index + ep_batch.batch_size <= self.buffer_size:
+            slots = np.arange(self.buffer_index, self.buffer_index + ep_batch.batch_size)
+            if self.priority_source == "return":
+                returns = ep_batch["reward"].sum(dim=(1, 2)).abs().cpu().numpy()
+                priorities = (returns + self.eps) ** self.alpha
+                self.max_priority = max(self.max_priority, float(priorities.max()))
+            else:
+                priorities = np.full(len(slots), self.max_priority)
+            self.tree.update(slots, priorities)
+        super().insert_episode_batch(ep_batch)
+
+    def sample(self, batch_size):
+        assert self.can_sample(batch_size)
+        idx = np.minimum(self.tree.sample(batch_size, self._rng), self.episodes_in_buffer - 1)
+        self.last_sample_idx = idx
+        self.last_sample_probs = self.tree[idx] / self.tree.total
+        return self[idx]
+
+    # Priorities -------------------------------------------------------------------
+    def update_priorities(self, idx, td_errors_abs) -> None:
+        """Batched priority write: one ``|TD error|`` per sampled episode."""
+        errors = td_errors_abs.detach().cpu().numpy() if th.is_tensor(td_errors_abs) else np.asarray(td_errors_abs)
+        priorities = (np.abs(errors.reshape(-1)) + self.eps) ** self.alpha
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(idx, priorities)
+
+    def sample_weights(self, t_env: int) -> np.ndarray:
+        """Importance weights for the last :meth:`sample` at training step ``t_env``."""
+        beta = annealed_beta(self.beta0, t_env, self.t_max)
+        min_prob = self.tree.min / self.tree.total
+        return importance_weights(self.last_sample_probs, self.episodes_in_buffer, beta, min_prob)
+
+    def attach_learner(self, learner) -> None:
+        """Turn on the learner's PER path and wrap ``learner.train`` to feed weights and collect priorities."""
+        train = learner.train
+        name = type(learner).__name__
+        if not hasattr(learner, "use_per") or "per_weight" not in inspect.signature(train).parameters:
+            raise ValueError(f"buffer=per needs a learner with use_per/per_weight support; {name} has none")
+        learner.use_per = True
+
+        def train_with_priorities(batch, t_env, episode_num, *args: Any, **kwargs: Any):
+            idx = self.last_sample_idx
+            kwargs.setdefault("per_weight", self.sample_weights(t_env))
+            info = train(batch, t_env, episode_num, *args, **kwargs)
+            if self.priority_source == "td":
+                if not isinstance(info, dict) or "td_errors_abs" not in info:
+                    raise RuntimeError(
+                        f"[per] {name}.train가 use_per=True에서도 td_errors_abs를 반환하지 않았습니다. "
+                        "per_priority=return을 사용하세요."
+                    )
+                self.update_priorities(idx, info["td_errors_abs"])
+            return info
+
+        learner.train = train_with_priorities
+
+    def __repr__(self):
+        return "PrioritizedEpisodeBuffer. {}/{} episodes. alpha={} priority={}".format(
+            self.episodes_in_buffer, self.buffer_size, self.alpha, self.priority_source
+        )
@@ -0,0 +1,77 @@
+"""Array-backed sum/min tree for proportional prioritized sampling."""
+from __future__ import annotations
+
+import numpy as np
+
+
+class SumTree:
+    """Complete binary tree over ``capacity`` leaf priorities.
+
+    Node ``i`` has children ``2i`` and ``2i + 1``; leaves live at
+    ``[size, 2 * size)`` where ``size`` is ``capacity`` rounded up to a power of
+    two, and the root is node 1.  Alongside the sums a min-tree is kept so the
+    smallest priority (needed to normalise importance weights) is ``O(1)``.
+
+    All operations are batched: :meth:`update` writes many leaves and
+    re-aggregates each affected level once, and :meth:`find` descends the tree
+    for a whole vector of prefix sums in ``log2(size)`` NumPy steps.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.size = 1 << max(int(capacity - 1).bit_length(), 0)
+        self.depth = self.size.bit_length() - 1
+        self._sum = np.zeros(2 * self.size, dtype=np.float64)
+        self._min = np.full(2 * self.size, np.inf, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return float(self._sum[1])
+
+    @property
+    def min(self) -> float:
+        return float(self._min[1])
+
+    def __getitem__(self, idx) -> np.ndarray:
+        return self._sum[np.asarray(idx) + self.size]
+
+    def update(self, idx, priorities) -> None:
+        """Set leaf ``idx[k]`` to ``priorities[k]`` (later duplicates win)."""
+        nodes = np.asarray(idx, dtype=np.int64).reshape(-1) + self.size
+        values = np.broadcast_to(np.asarray(priorities, dtype=np.float64).reshape(-1), nodes.shape)
+        if nodes.size == 0:
+            return
+        if np.any((nodes < self.size) | (nodes >= self.size + self.capacity)):
+            raise IndexError("SumTree index out of range")
+        self._sum[nodes] = values
+        self._min[nodes] = values
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            left = 2 * nodes
+            self._sum[nodes] = self._sum[left] + self._sum[left + 1]
+            self._min[nodes] = np.minimum(self._min[left], self._min[left + 1])
+            if nodes[0] == 1:
+                break
+            nodes = np.unique(nodes // 2)
+
+    def find(self, prefix_sums) -> np.ndarray:
+        """Leaf index whose cumulative priority range contains each prefix sum."""
+        values = np.asarray(prefix_sums, dtype=np.float64).reshape(-1).copy()
+        nodes = np.ones(values.shape, dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sum = self._sum[left]
+            go_right = values >= left_sum
+            values -= np.where(go_right, left_sum, 0.0)
+            nodes = left + go_right
+        # Float round-off can land on an empty (zero-priority) leaf past the data.
+        return np.minimum(nodes - self.size, self.capacity - 1)
+
+    def sample(self, batch_size: int, rng: np.random.Generator | None = None) -> np.ndarray:
+        """Stratified proportional sample: one draw from each of ``batch_size`` equal mass segments."""
+        rng = rng or np.random.default_rng()
+        segment = self.total / batch_size
+        prefix = (np.arange(batch_size) + rng.random(batch_size)) * segment
+        return self.find(prefix)
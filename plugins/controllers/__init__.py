@@ -0,0 +1 @@
+"""Multi-agent controllers registered into PyMARL2's ``controllers.REGISTRY``."""
@@ -0,0 +1,73 @@
+"""Recurrent MAC that skips finished episodes during training forward passes.
+
+Select with ``with mac=packed_mac packed_inner_mac=n_mac`` (usually together
+with ``buffer=packed``).  Learners unroll the agent network over every
+timestep of the padded minibatch, so an episode of length 20 in a batch
+padded to 120 still costs 120 RNN steps.  :class:`PackedMAC` wraps the
+configured MAC and, at timestep ``t``, runs the agent only on the episodes
+whose ``filled`` mask is set, like a packed sequence: with the packed
+buffer's longest-first batches those are a shrinking prefix of the batch.
+Finished episodes get zero outputs and keep their hidden state; the
+learners mask those steps anyway, so losses and gradients are unchanged.
+
+Everything except :meth:`PackedMAC.forward` is delegated to the inner MAC,
+including ``select_actions`` during rollouts (no padding there).  The mixer
+still runs over the padded batch.
+"""
+from __future__ import annotations
+
+import torch as th
+
+from controllers import REGISTRY as mac_REGISTRY
+
+
+class PackedMAC:
+    def __init__(self, scheme, groups, args):
+        inner = getattr(args, "packed_inner_mac", "n_mac")
+        if inner not in mac_REGISTRY or inner == "packed_mac":
+            raise ValueError(f"packed_inner_mac must name another MAC, got {inner!r}")
+        self.__dict__["inner"] = mac_REGISTRY[inner](scheme, groups, args)
+
+    def __getattr__(self, name):
+        # Only reached for attributes not on PackedMAC itself; guard "inner"
+        # so copy.deepcopy (which skips __init__) does not recurse.
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.inner, name, value)
+
+    def forward(self, ep_batch, t, test_mode=False):
+        inner = self.inner
+        active = ep_batch["filled"][:, t].reshape(-1) > 0
+        if test_mode or bool(active.all()):
+            return inner.forward(ep_batch, t, test_mode=test_mode)
+
+        bs, n_agents = ep_batch.batch_size, inner.n_agents
+        rows = active.nonzero(as_tuple=False).reshape(-1)
+        hidden = inner.hidden_states.reshape(bs, n_agents, -1)
+        if len(rows) > 0:
+            inputs = inner._build_inputs(ep_batch, t)
+            # n_mac builds (bs, n_agents, -1) inputs, basic_mac (bs * n_agents, -1).
+            if inputs.dim() == 3:
+                sub_inputs = inputs[rows]
+            else:
+                sub_inputs = inputs.reshape(bs, n_agents, -1)[rows].reshape(len(rows) * n_agents, -1)
+            sub_outs, sub_hidden = inner.agent(sub_inputs, hidden[rows])
+            sub_outs = sub_outs.reshape(len(rows), n_agents, -1)
+            agent_outs = sub_outs.new_zeros((bs, n_agents, sub_outs.shape[-1]))
+            agent_outs[rows] = sub_outs
+            hidden = hidden.clone()
+            hidden[rows] = sub_hidden.reshape(len(rows), n_agents, -1)
+        else:
+            n_actions = ep_batch["avail_actions"].shape[-1]
+            agent_outs = hidden.new_zeros((bs, n_agents, n_actions))
+        inner.hidden_states = hidden
+
+        if getattr(inner, "agent_output_type", "q") == "pi_logits":
+            if getattr(inner.args, "mask_before_softmax", True):
+                avail_actions = ep_batch["avail_actions"][:, t]
+                agent_outs = agent_outs.masked_fill(avail_actions == 0, -1e10)
+            agent_outs = th.nn.functional.softmax(agent_outs, dim=-1)
+        return agent_outs
@@ -1,7 +1,7 @@
 """EPyMARL registry extension hooks.
 
-Create your own learners/controllers/env wrappers inside ``plugins/`` and
-import/register them in :func:`register_plugins`.  This module is imported by
+Create your own learners/controllers/env wrappers/runners inside ``plugins/``
+and import/register them in :func:`register_plugins`.  This module is imported by
 utility scripts (for example ``scripts/run_once.py``) before executing the core
 EPyMARL entrypoint so that your components are visible to the upstream
 ``REGISTRY`` tables.
@@ -9,18 +9,135 @@ EPyMARL entrypoint so that your components are visible to the upstream
 
 from __future__ import annotations
 
-from typing import Callable
+import importlib
+import warnings
+from typing import Any, Callable, Dict
 
 try:
     from controllers import REGISTRY as MACS
     from learners import REGISTRY as LEARNERS
     from envs import REGISTRY as ENVS
+    from runners import REGISTRY as RUNNERS
 except ImportError:
     # When EPyMARL is not on the path yet (e.g. docs build), just provide
     # fallbacks so that importing this file does not crash.
     MACS = {}
     LEARNERS = {}
     ENVS = {}
+    RUNNERS = {}
+    _PYMARL2_AVAILABLE = False
+else:
+    _PYMARL2_AVAILABLE = True
+
+# PyMARL2 has no replay-buffer registry: ``run_sequential`` builds
+# ``ReplayBuffer`` directly.  Entries here are selected with ``with buffer=<name>``
+# (``"episode"`` keeps the stock buffer) and are called like ``ReplayBuffer``
+# plus an ``args=`` keyword; see :func:`_install_buffer_hook`.
+BUFFERS: Dict[str, Callable[..., Any]] = {}
+
+
+def _register_builtin() -> None:
+    """Components shipped in ``plugins/``; they import PyMARL2 modules."""
+    if not _PYMARL2_AVAILABLE:
+        return
+    from plugins.runners.shm_parallel_runner import SharedMemoryParallelRunner
+
+    RUNNERS.setdefault("shm_parallel", SharedMemoryParallelRunner)
+
+    from plugins.buffers.prioritized_buffer import PrioritizedEpisodeBuffer
+
+    BUFFERS.setdefault("per", PrioritizedEpisodeBuffer)
+
+    from plugins.buffers.compact_buffer import CompactEpisodeBuffer
+
+    BUFFERS.setdefault("compact", CompactEpisodeBuffer)
+
+    from plugins.buffers.memmap_buffer import MemmapEpisodeBuffer
+
+    BUFFERS.setdefault("memmap", MemmapEpisodeBuffer)
+
+    from plugins.buffers.packed_buffer import PackedEpisodeBuffer
+    from plugins.controllers.packed_mac import PackedMAC
+
+    BUFFERS.setdefault("packed", PackedEpisodeBuffer)
+    MACS.setdefault("packed_mac", PackedMAC)
+    _install_buffer_hook()
+
+
+def _install_buffer_hook() -> None:
+    """Wrap ``run.run.run_sequential`` so ``args.buffer`` picks the buffer from :data:`BUFFERS`.
+
+    ``run`` is a package; ``run_sequential`` and the ``ReplayBuffer`` global it
+    uses live in its ``run.run`` module, which is patched here.  For the
+    duration of the run, ``ReplayBuffer`` is swapped for a factory and the
+    learner class for one that hands the new learner to the buffer's
+    ``attach_learner`` (if it has one), e.g. to collect TD-error priorities.
+    A PyMARL2 checkout with a different layout only gets a warning.
+    """
+    try:
+        pymarl2_run = importlib.import_module("run.run")
+    except ImportError as exc:
+        print(f"[plugins] run.run을 불러오지 못해 buffer 플러그인을 건너뜁니다: {exc}")
+        return
+    missing = [name for name in ("run_sequential", "ReplayBuffer") if not hasattr(pymarl2_run, name)]
+    if missing:
+        print(f"[plugins] run.run에 {', '.join(missing)}이(가) 없어 buffer 플러그인을 건너뜁니다.")
+        return
+    if getattr(pymarl2_run.run_sequential, "_plugin_buffer_hook", False):
+        return
+    original = pymarl2_run.run_sequential
+
+    def run_sequential(args, logger):
+        name = getattr(args, "buffer", "episode")
+        _warn_unrestored_buffer(args, logger)
+        if name == "episode":
+            return original(args=args, logger=logger)
+        if name not in BUFFERS:
+            raise KeyError(f"Unknown buffer '{name}'. Available: episode, {', '.join(sorted(BUFFERS))}")
+        buffer_cls = BUFFERS[name]
+        learner_cls = LEARNERS[args.learner]
+        stock_buffer = pymarl2_run.ReplayBuffer
+        built = []
+
+        def make_buffer(scheme, groups, buffer_size, max_seq_length, preprocess=None, device="cpu"):
+            buffer = buffer_cls(scheme, groups, buffer_size, max_seq_length, args=args, preprocess=preprocess, device=device)
+            built.append(buffer)
+            return buffer
+
+        def make_learner(*learner_args, **learner_kwargs):
+            learner = learner_cls(*learner_args, **learner_kwargs)
+            for buffer in built:
+                if hasattr(buffer, "attach_learner"):
+                    buffer.attach_learner(learner)
+            return learner
+
+        pymarl2_run.ReplayBuffer = make_buffer
+        LEARNERS[args.learner] = make_learner
+        try:
+            return original(args=args, logger=logger)
+        finally:
+            pymarl2_run.ReplayBuffer = stock_buffer
+            LEARNERS[args.learner] = learner_cls
+
+    run_sequential._plugin_buffer_hook = True
+    pymarl2_run.run_sequential = run_sequential
+
+
+def _warn_unrestored_buffer(args, logger) -> None:
+    """Checkpoints hold networks and optimiser state only; say so loudly when resuming."""
+    if not getattr(args, "checkpoint_path", "") or getattr(args, "evaluate", False):
+        return
+    if getattr(args, "buffer", "episode") == "memmap" and getattr(args, "memmap_resume", False):
+        return
+    message = (
+        f"replay buffer (buffer={getattr(args, 'buffer', 'episode')}) is NOT restored from {args.checkpoint_path}: "
+        "training resumes with an empty buffer and waits for batch_size new episodes. "
+        "Use buffer=memmap with --resume auto to keep replay state."
+    )
+    warnings.warn(message)
+    logger.console_logger.warning("=" * 80)
+    logger.console_logger.warning(message)
+    logger.console_logger.warning("=" * 80)
 
 
 def register_plugins(register: Callable[[], None] | None = None) -> None:
@@ -39,6 +156,8 @@ def register_plugins(register: Callable[[], None] | None = None) -> None:
         register()
         return
 
+    _register_builtin()
+
     # Example (to be filled in by the user once their components exist):
     # from plugins.algos.my_algo.learner import MyLearner
     # LEARNERS["my_learner"] = MyLearner
@@ -48,6 +167,12 @@ def register_plugins(register: Callable[[], None] | None = None) -> None:
     #
     # from plugins.custom_envs.my_wrapper import MyEnvWrapper
     # ENVS["my_env"] = MyEnvWrapper
+    #
+    # from plugins.runners.my_runner import MyRunner
+    # RUNNERS["my_runner"] = MyRunner
+    #
+    # from plugins.buffers.my_buffer import MyBuffer
+    # BUFFERS["my_buffer"] = MyBuffer
     pass
 
 
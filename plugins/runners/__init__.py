@@ -0,0 +1 @@
+"""Rollout runners registered into PyMARL2's ``runners.REGISTRY``."""
@@ -0,0 +1,310 @@
+"""Parallel episode runner whose env workers write into shared memory.
+
+PyMARL2's ``ParallelRunner`` ships every env's obs/state/avail-action mask and
+reward through a pipe each step and rebuilds the batch slice from per-env
+Python lists.  With ``batch_size_run`` of 8–16 that pickling and list
+assembly, not the environments, limits throughput.
+
+:class:`SharedMemoryParallelRunner` allocates one shared-memory array per
+env-written field, shaped like the ``EpisodeBatch`` column
+(``(batch_size_run, episode_limit + 1, *vshape)``).  Worker ``b`` writes its
+transitions straight into row ``b`` at the current timestep; the pipes carry
+only ``("step", t)`` commands and the info dict of the terminal step.  The
+runner then copies whole timestep columns into its ``EpisodeBatch`` with one
+``copy_`` per field (cross-device when the MAC runs on CUDA), and rewards and
+termination flags once per episode.
+
+Select it with ``with runner=shm_parallel batch_size_run=16``; the control
+flow, logging and returned batch match ``runners.ParallelRunner``.
+"""
+from __future__ import annotations
+
+import traceback
+from functools import partial
+from multiprocessing import Pipe, Process, resource_tracker
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import torch as th
+
+from components.episode_buffer import EpisodeBatch
+from envs import REGISTRY as env_REGISTRY
+from runners.parallel_runner import CloudpickleWrapper
+
+from wrappers.smacv2_vec_env import _SharedArray
+
+# Fields written by the env workers; everything else (actions, filled, probs)
+# is produced by the runner itself.
+STEP_FIELDS = ("obs", "state", "avail_actions")
+EPISODE_FIELDS = ("reward", "terminated")
+
+
+def _numpy_dtype(dtype: th.dtype) -> np.dtype:
+    return th.empty((), dtype=dtype).numpy().dtype
+
+
+def _write_step(env, views: Dict[str, np.ndarray], t: int) -> None:
+    views["obs"][t] = np.asarray(env.get_obs())
+    views["state"][t] = np.asarray(env.get_state())
+    views["avail_actions"][t] = np.asarray(env.get_avail_actions())
+
+
+class WorkerError:
+    """Sent in place of a reply when a worker fails, so the parent raises instead of blocking in ``recv``."""
+
+    def __init__(self, env_idx: int, message: str) -> None:
+        self.env_idx = env_idx
+        self.message = message
+
+
+def _recv(conn) -> Any:
+    reply = conn.recv()
+    if isinstance(reply, WorkerError):
+        raise RuntimeError(f"shm_parallel env worker {reply.env_idx} failed:\n{reply.message}")
+    return reply
+
+
+def env_worker(remote, env_fn: CloudpickleWrapper, env_idx: int) -> None:
+    env = env_fn.x()
+    blocks: Dict[str, _SharedArray] = {}
+    views: Dict[str, np.ndarray] = {}
+    try:
+        while True:
+            cmd, data = remote.recv()
+            try:
+                if cmd == "step":
+                    t = data
+                    reward, terminated, env_info = env.step(views["actions"])
+                    views["reward"][t] = reward
+                    views["terminated"][t] = terminated and not env_info.get("episode_limit", False)
+                    _write_step(env, views, t + 1)
+                    # Non-terminal infos are never read by the runner.
+                    remote.send((reward, terminated, env_info if terminated else None))
+                elif cmd == "reset":
+                    env.reset()
+                    for key in STEP_FIELDS + EPISODE_FIELDS:
+                        views[key].fill(0)
+                    _write_step(env, views, 0)
+                    remote.send(None)
+                elif cmd == "attach":
+                    for key, (name, shape, dtype) in data.items():
+                        blocks[key] = _SharedArray(shape, dtype, name=name)
+                    views = {key: block.array[env_idx] for key, block in blocks.items()}
+                    remote.send(None)
+                elif cmd == "get_env_info":
+                    remote.send(env.get_env_info())
+                elif cmd == "close":
+                    break
+                else:
+                    raise ValueError(f"Unknown command: {cmd}")
+            except Exception:
+                # Reply with the failure; the parent is blocked in recv() for this worker.
+                remote.send(WorkerError(env_idx, traceback.format_exc()))
+                break
+    finally:
+        views = {}
+        for block in blocks.values():
+            block.release()
+        env.close()
+        remote.close()
+
+
+class SharedMemoryParallelRunner:
+    """Drop-in ``ParallelRunner`` that exchanges transitions through shared memory."""
+
+    def __init__(self, args, logger) -> None:
+        self.args = args
+        self.logger = logger
+        self.batch_size = self.args.batch_size_run
+
+        # Start the tracker before forking so the workers share it.
+        resource_tracker.ensure_running()
+        self.parent_conns, self.worker_conns = zip(*[Pipe() for _ in range(self.batch_size)])
+        env_fn = env_REGISTRY[self.args.env]
+        env_args = [self.args.env_args.copy() for _ in range(self.batch_size)]
+        for i in range(self.batch_size):
+            env_args[i]["seed"] += i
+        self.ps = [
+            Process(target=env_worker, args=(worker_conn, CloudpickleWrapper(partial(env_fn, **env_arg)), idx))
+            for idx, (env_arg, worker_conn) in enumerate(zip(env_args, self.worker_conns))
+        ]
+        for p in self.ps:
+            p.daemon = True
+            p.start()
+
+        self.parent_conns[0].send(("get_env_info", None))
+        self.env_info = _recv(self.parent_conns[0])
+        self.episode_limit = self.env_info["episode_limit"]
+
+        self.t = 0
+        self.t_env = 0
+
+        self.train_returns = []
+        self.test_returns = []
+        self.train_stats = {}
+        self.test_stats = {}
+
+        self.log_train_stats_t = -100000
+
+        self._blocks: Dict[str, _SharedArray] = {}
+        self._shared: Dict[str, th.Tensor] = {}
+
+    def setup(self, scheme, groups, preprocess, mac) -> None:
+        self.new_batch = partial(
+            EpisodeBatch, scheme, groups, self.batch_size, self.episode_limit + 1,
+            preprocess=preprocess, device=self.args.device,
+        )
+        self.mac = mac
+        self.scheme = scheme
+        self.groups = groups
+        self.preprocess = preprocess
+        self._attach_shared(scheme, groups)
+
+    def _attach_shared(self, scheme, groups) -> None:
+        layout: Dict[str, Tuple[Tuple[int, ...], np.dtype]] = {}
+        for key in STEP_FIELDS + EPISODE_FIELDS:
+            vshape = scheme[key]["vshape"]
+            shape = (vshape,) if isinstance(vshape, int) else tuple(vshape)
+            if "group" in scheme[key]:
+                shape = (groups[scheme[key]["group"]],) + shape
+            dtype = _numpy_dtype(scheme[key].get("dtype", th.float32))
+            layout[key] = ((self.batch_size, self.episode_limit + 1) + shape, dtype)
+        layout["actions"] = ((self.batch_size, self.env_info["n_agents"]), np.dtype(np.int64))
+
+        for key, (shape, dtype) in layout.items():
+            self._blocks[key] = _SharedArray(shape, dtype.str)
+        specs = {key: (block.name, block.array.shape, block.array.dtype.str) for key, block in self._blocks.items()}
+        for parent_conn in self.parent_conns:
+            parent_conn.send(("attach", specs))
+        for parent_conn in self.parent_conns:
+            _recv(parent_conn)
+        self._shared = {key: th.from_numpy(block.array) for key, block in self._blocks.items()}
+
+    def get_env_info(self) -> Dict[str, Any]:
+        return self.env_info
+
+    def save_replay(self) -> None:
+        pass
+
+    def close_env(self) -> None:
+        for parent_conn in self.parent_conns:
+            parent_conn.send(("close", None))
+        for p in self.ps:
+            p.join(timeout=30)
+        self._shared = {}
+        for block in self._blocks.values():
+            block.release()
+        self._blocks = {}
+
+    def _pull_step(self, ts: int, envs: List[int]) -> None:
+        """Copy timestep ``ts`` of the env-written fields into the batch."""
+        data = self.batch.data.transition_data
+        for key in STEP_FIELDS:
+            data[key][:, ts].copy_(self._shared[key][:, ts])
+        data["filled"][envs, ts] = 1
+
+    def reset(self) -> None:
+        self.batch = self.new_batch()
+
+        for parent_conn in self.parent_conns:
+            parent_conn.send(("reset", None))
+        for parent_conn in self.parent_conns:
+            _recv(parent_conn)
+        self._pull_step(0, list(range(self.batch_size)))
+
+        self.t = 0
+        self.env_steps_this_run = 0
+
+    def run(self, test_mode: bool = False):
+        self.reset()
+
+        all_terminated = False
+        episode_returns = [0 for _ in range(self.batch_size)]
+        episode_lengths = [0 for _ in range(self.batch_size)]
+        self.mac.init_hidden(batch_size=self.batch_size)
+        terminated = [False for _ in range(self.batch_size)]
+        envs_not_terminated = [b_idx for b_idx, termed in enumerate(terminated) if not termed]
+        final_env_infos = []
+
+        save_probs = getattr(self.args, "save_probs", False)
+        actions_buf = self._blocks["actions"].array
+        while True:
+            if save_probs:
+                actions, probs = self.mac.select_actions(
+                    self.batch, t_ep=self.t, t_env=self.t_env, bs=envs_not_terminated, test_mode=test_mode
+                )
+            else:
+                actions = self.mac.select_actions(
+                    self.batch, t_ep=self.t, t_env=self.t_env, bs=envs_not_terminated, test_mode=test_mode
+                )
+
+            cpu_actions = actions.to("cpu").numpy()
+
+            actions_chosen = {"actions": actions.unsqueeze(1).to("cpu")}
+            if save_probs:
+                actions_chosen["probs"] = probs.unsqueeze(1).to("cpu")
+            self.batch.update(actions_chosen, bs=envs_not_terminated, ts=self.t, mark_filled=False)
+
+            # One shared-memory write for all envs, then a bare step command each.
+            stepping = [idx for idx in envs_not_terminated if not terminated[idx]]
+            if stepping:
+                rows = [envs_not_terminated.index(idx) for idx in stepping]
+                actions_buf[stepping] = cpu_actions[rows]
+            for idx in stepping:
+                self.parent_conns[idx].send(("step", self.t))
+
+            envs_not_terminated = [b_idx for b_idx, termed in enumerate(terminated) if not termed]
+            all_terminated = all(terminated)
+            if all_terminated:
+                break
+
+            for idx in stepping:
+                reward, env_done, env_info = _recv(self.parent_conns[idx])
+                episode_returns[idx] += reward
+                episode_lengths[idx] += 1
+                if not test_mode:
+                    self.env_steps_this_run += 1
+                if env_done:
+                    final_env_infos.append(env_info)
+                terminated[idx] = env_done
+
+            self.t += 1
+            self._pull_step(self.t, stepping)
+
+        data = self.batch.data.transition_data
+        for key in EPISODE_FIELDS:
+            data[key].copy_(self._shared[key])
+
+        if not test_mode:
+            self.t_env += self.env_steps_this_run
+
+        cur_stats = self.test_stats if test_mode else self.train_stats
+        cur_returns = self.test_returns if test_mode else self.train_returns
+        log_prefix = "test_" if test_mode else ""
+        infos = [cur_stats] + final_env_infos
+        cur_stats.update({k: sum(d.get(k, 0) for d in infos) for k in set.union(*[set(d) for d in infos])})
+        cur_stats["n_episodes"] = self.batch_size + cur_stats.get("n_episodes", 0)
+        cur_stats["ep_length"] = sum(episode_lengths) + cur_stats.get("ep_length", 0)
+
+        cur_returns.extend(episode_returns)
+
+        n_test_runs = max(1, self.args.test_nepisode // self.batch_size) * self.batch_size
+        if test_mode and (len(self.test_returns) == n_test_runs):
+            self._log(cur_returns, cur_stats, log_prefix)
+        elif self.t_env - self.log_train_stats_t >= self.args.runner_log_interval:
+            self._log(cur_returns, cur_stats, log_prefix)
+            if hasattr(self.mac.action_selector, "epsilon"):
+                self.logger.log_stat("epsilon", self.mac.action_selector.epsilon, self.t_env)
+            self.log_train_stats_t = self.t_env
+
+        return self.batch
+
+    def _log(self, returns, stats, prefix) -> None:
+        self.logger.log_stat(prefix + "return_mean", np.mean(returns), self.t_env)
+        self.logger.log_stat(prefix + "return_std", np.std(returns), self.t_env)
+        returns.clear()
+
+        for k, v in stats.items():
+            if k != "n_episodes":
+                self.logger.log_stat(prefix + k + "_mean", v / stats["n_episodes"], self.t_env)
+        stats.clear()
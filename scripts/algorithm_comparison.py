@@ -6,13 +6,14 @@
 사용법:
   python scripts/algorithm_comparison.py --env matrix_penalty --algorithms qmix vdn qtran --seeds 3
   python scripts/algorithm_comparison.py --env lbf_small --algorithms mappo ippo maa2c --seeds 5 --individual-rewards
+  python scripts/algorithm_comparison.py --env smac2_protoss --algorithms qmix vdn --seeds 5 --workers 4 --grid lr=0.0005,0.001
+
+작업은 scripts/sweep.py 엔진으로 병렬 실행되며, 같은 명령을 다시 실행하면 완료된 작업은 건너뜁니다.
 """
 
 import argparse
-import subprocess
 import sys
 from pathlib import Path
-import time
 
 # 기존 환경 설정을 통합 설정으로 대체
 # 새로운 통합 스크립트 사용 권장: scripts/unified_experiment.py
@@ -22,6 +23,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 from configs.python.environments import ENVIRONMENTS, get_environment_config
+from sweep import add_sweep_arguments, expand_sweep, parse_grid, run_sweep
 
 # 호환성을 위한 전환 사전
 COMPATIBILITY_ENVIRONMENTS = {
@@ -94,44 +96,6 @@ COMPATIBILITY_ENVIRONMENTS = {
     }
 }
 
-def run_experiment(algorithm, env_config, seed, individual_rewards=False, additional_args=""):
-    \"\"\"
-    주의: 이 스크립트는 호환성을 위해 유지되지만, 
-    새로운 통합 실험 스크립트 사용을 권장합니다:
-    python scripts/unified_experiment.py --algorithm <alg> --environment <env> --seeds <n>
-    \"\"\"
-    """단일 실험을 실행합니다."""
-    script_dir = Path(__file__).parent
-    run_script = script_dir / "run_with_wandb.py"
-    
-    cmd = [
-        sys.executable,
-        str(run_script),
-        f"--config={algorithm}",
-        f"--env-config={env_config['config']}",
-        f"--wandb-config={env_config['wandb_config']}",
-        f"env_args.key={env_config['key']}",
-        f"seed={seed}"
-    ]
-    
-    # 기본 인자 추가
-    if env_config['default_args']:
-        cmd.extend(env_config['default_args'].split())
-    
-    # 개별 보상 설정
-    if individual_rewards:
-        cmd.append("common_reward=False")
-    
-    # 추가 인자
-    if additional_args:
-        cmd.extend(additional_args.split())
-    
-    print(f"실행 중: {algorithm} (시드 {seed})")
-    print(f"명령어: {' '.join(cmd)}")
-    
-    result = subprocess.run(cmd, capture_output=False)
-    return result.returncode == 0
-
 def main():
     parser = argparse.ArgumentParser(description='여러 알고리즘 성능 비교 실험')
     parser.add_argument('--env', required=True, choices=list(ENVIRONMENTS.keys()),
@@ -144,46 +108,45 @@ def main():
                         help='개별 보상 환경으로 실행 (지원하는 알고리즘만)')
     parser.add_argument('--additional-args', default="",
                         help='추가 인자들')
-    parser.add_argument('--delay', type=int, default=5,
-                        help='실험 간 대기 시간(초)')
+    parser.add_argument('--delay', type=int, default=0,
+                        help='(사용하지 않음) 이전 순차 실행용 대기 시간')
+    parser.add_argument('--sweep-name', default=None,
+                        help='스윕 ledger 이름 (기본: compare_<env>_<algorithms>)')
+    add_sweep_arguments(parser)
     
     args = parser.parse_args()
     
     env_config = ENVIRONMENTS[args.env]
     
     print("=== 알고리즘 비교 실험 시작 ===")
-    print(f"환경: {args.env} ({env_config['key']})")
+    print(f"환경: {args.env} ({env_config.key})")
     print(f"알고리즘: {', '.join(args.algorithms)}")
     print(f"시드 개수: {args.seeds}")
     print(f"개별 보상: {args.individual_rewards}")
     print("=" * 40)
     
-    total_experiments = len(args.algorithms) * args.seeds
-    current_experiment = 0
-    
-    for algorithm in args.algorithms:
-        print(f"\n[{algorithm}] 실험 시작")
-        
-        for seed_idx in range(args.seeds):
-            current_experiment += 1
-            seed = 1000 + seed_idx + 1
-            
-            print(f"\n진행률: {current_experiment}/{total_experiments}")
-            
-            success = run_experiment(
-                algorithm, 
-                env_config, 
-                seed, 
-                args.individual_rewards,
-                args.additional_args
-            )
-            
-            if not success:
-                print(f"경고: {algorithm} 시드 {seed} 실험 실패")
-            
-            # 마지막 실험이 아니면 대기
-            if current_experiment < total_experiments:
-                time.sleep(args.delay)
+    extra_args = args.additional_args.split()
+    if args.individual_rewards:
+        extra_args.append("common_reward=False")
+    jobs = expand_sweep(
+        args.algorithms,
+        [args.env],
+        range(1001, 1001 + args.seeds),
+        parse_grid(args.grid),
+        extra_args,
+    )
+    sweep_name = args.sweep_name or f"compare_{args.env}_{'_'.join(args.algorithms)}"
+    success = run_sweep(
+        sweep_name,
+        jobs,
+        workers=args.workers,
+        job_cores=args.job_cores,
+        job_mem_gb=args.job_mem_gb,
+        retry_failed=args.retry_failed,
+    )
+    if not success:
+        print("경고: 일부 실험이 실패했습니다. `python scripts/sweep.py --name "
+              f"{sweep_name} --status`로 확인하세요.")
     
     print("\n=== 모든 비교 실험 완료 ===")
     print("결과는 results/ 디렉토리와 W&B에서 확인할 수 있습니다.")
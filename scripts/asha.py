@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""Asynchronous successive halving (ASHA) for PyMARL2 hyperparameter sweeps.
+
+Trials are expanded like ``sweep.py`` (algorithms × one environment × grid ×
+seeds) and launched through ``run_with_wandb.py``.  Each trial streams its
+scalars to ``results/asha/<name>/streams/<job_id>.jsonl`` through
+``PYMARL2_SCALAR_STREAM`` (``patches/pymarl2/0004-stream-scalars-jsonl.patch``).
+
+Rungs sit at ``min_t * eta**k`` environment steps.  When a trial first reports
+``--metric`` at or beyond a rung, its value is compared with every value
+recorded at that rung so far; only the top ``1/eta`` (rounded up) keep
+running, the rest are terminated (SIGTERM to the whole process group, so the
+SC2 instances go with them).  Promotion is decided as soon as a trial reaches
+a rung — no waiting for a full bracket — so free slots are refilled
+immediately.
+
+The rung table and trial states are kept in ``results/asha/<name>/state.json``;
+re-running the same command resumes: stopped/finished trials are not
+relaunched.  ``test_interval`` must be at most ``--min-t``, otherwise the
+metric is not reported before the first rung.
+
+사용법:
+  python scripts/asha.py --name qmix_lr --env smac2_protoss --algorithms qmix \\
+      --grid lr=0.0002,0.0005,0.001 --grid batch_size=32,64 --seeds 2 \\
+      --min-t 500000 --max-t 10000000 --eta 3 --workers 6 --job-cores 2
+  python scripts/asha.py --name qmix_lr --status
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import signal
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from cpu_affinity import available_core_ids, budget_env, format_core_list
+from seed_scheduler import Job, Resources, default_job_cores
+from sweep import DEFAULT_START_SEED, ROOT, SweepJob, build_command, expand_sweep, parse_grid
+
+ASHA_ROOT = ROOT / "results" / "asha"
+STREAM_ENV = "PYMARL2_SCALAR_STREAM"
+DEFAULT_METRIC = "test_battle_won_mean"
+TERMINATE_GRACE_S = 15.0
+
+
+def rung_budgets(min_t: int, eta: int, max_t: int) -> List[int]:
+    """``[min_t, min_t * eta, ...]`` strictly below ``max_t``."""
+    if min_t <= 0 or eta < 2 or max_t <= min_t:
+        raise SystemExit("--min-t는 양수이고 --max-t보다 작아야 하며, --eta는 2 이상이어야 합니다.")
+    rungs: List[int] = []
+    budget = min_t
+    while budget < max_t:
+        rungs.append(budget)
+        budget *= eta
+    return rungs
+
+
+@dataclass
+class Trial:
+    job_id: str
+    name: str
+    status: str = "pending"  # pending -> running -> done / stopped / failed
+    rung: int = 0  # index of the next rung to reach
+    last_t: int = 0
+    last_value: float | None = None
+    exit_code: int | None = None
+
+
+class ScalarStream:
+    """Incremental reader of one trial's JSONL scalar stream."""
+
+    def __init__(self, path: Path, metric: str, offset: int = 0) -> None:
+        self.path = path
+        self.metric = metric
+        self.offset = offset
+
+    def read_new(self) -> List[tuple[int, float]]:
+        if not self.path.exists():
+            return []
+        points: List[tuple[int, float]] = []
+        with self.path.open("rb") as handle:
+            handle.seek(self.offset)
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break  # partially written; read it next poll
+                self.offset += len(line)
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("key") == self.metric:
+                    points.append((int(record["t"]), float(record["value"])))
+        return points
+
+
+class AshaState:
+    """Trials and per-rung results, persisted as JSON after every change."""
+
+    def __init__(self, path: Path, rungs: Sequence[int]) -> None:
+        self.path = path
+        self.rungs = list(rungs)
+        self.trials: Dict[str, Trial] = {}
+        self.results: Dict[int, Dict[str, float]] = {rung: {} for rung in self.rungs}
+        if path.exists():
+            with path.open("r", encoding="utf-8") as handle:
+                saved = json.load(handle)
+            if saved.get("rungs") != self.rungs:
+                raise SystemExit(
+                    f"저장된 rung {saved.get('rungs')}과 현재 설정 {self.rungs}이 다릅니다. "
+                    f"다른 --name을 쓰거나 {path}를 지우세요."
+                )
+            self.trials = {t["job_id"]: Trial(**t) for t in saved.get("trials", [])}
+            for rung, values in saved.get("results", {}).items():
+                self.results[int(rung)] = dict(values)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        payload = {
+            "rungs": self.rungs,
+            "trials": [asdict(trial) for trial in self.trials.values()],
+            "results": {str(rung): values for rung, values in self.results.items()},
+        }
+        with tmp.open("w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2)
+        os.replace(tmp, self.path)
+
+
+def promotes(value: float, recorded: Dict[str, float], eta: int, sign: float) -> bool:
+    """True if ``value`` is within the top ``ceil(n / eta)`` of the values at a rung."""
+    ranked = sorted((sign * v for v in recorded.values()), reverse=True)
+    keep = max(1, math.ceil(len(ranked) / eta))
+    return sign * value >= ranked[keep - 1]
+
+
+class AshaRunner:
+    def __init__(
+        self,
+        name: str,
+        jobs: Sequence[SweepJob],
+        rungs: Sequence[int],
+        eta: int,
+        metric: str = DEFAULT_METRIC,
+        mode: str = "max",
+        workers: int = 1,
+        job_cores: int | None = None,
+        pin_cores: bool = True,
+        wandb_config: str | None = None,
+        poll_interval: float = 30.0,
+    ) -> None:
+        self.name = name
+        self.root = ASHA_ROOT / name
+        self.rungs = list(rungs)
+        self.eta = eta
+        self.metric = metric
+        self.sign = 1.0 if mode == "max" else -1.0
+        self.workers = max(1, workers)
+        self.wandb_config = wandb_config
+        self.poll_interval = poll_interval
+        self.jobs = {job.job_id: job for job in jobs}
+        self.state = AshaState(self.root / "state.json", self.rungs)
+        for job in jobs:
+            trial = self.state.trials.setdefault(job.job_id, Trial(job.job_id, job.name))
+            if trial.status == "running":
+                # Left over from a killed scheduler; its stream restarts from scratch.
+                trial.status = "pending"
+        self.state.save()
+        core_ids = available_core_ids()
+        # Without an explicit --job-cores: an even share per worker, not pinned.
+        self.job_cores = min(job_cores or default_job_cores(self.workers, len(core_ids)), len(core_ids))
+        self.free = Resources(
+            cores=len(core_ids),
+            mem_gb=float("inf"),
+            core_ids=core_ids if pin_cores and job_cores else None,
+        )
+        self.running: Dict[str, tuple[Job, subprocess.Popen, ScalarStream]] = {}
+
+    # ------------------------------------------------------------------ launch
+    def _stream_path(self, job_id: str) -> Path:
+        return self.root / "streams" / f"{job_id}.jsonl"
+
+    def _previous_stream_path(self, job_id: str) -> Path:
+        return self.root / "streams" / f"{job_id}.prev.jsonl"
+
+    def _launch(self, trial: Trial) -> None:
+        sweep_job = self.jobs[trial.job_id]
+        job = Job(name=trial.name, command=build_command(sweep_job, self.wandb_config), cores=self.job_cores)
+        self.free.take(job)
+        stream_path = self._stream_path(trial.job_id)
+        stream_path.parent.mkdir(parents=True, exist_ok=True)
+        # The patched logger appends, so a relaunched trial would otherwise
+        # replay its old points first.  Rotate the old stream away; it is still
+        # read if the run cache skips the launch and nothing new is written.
+        if stream_path.exists():
+            stream_path.replace(self._previous_stream_path(trial.job_id))
+        stream = ScalarStream(stream_path, self.metric, offset=0)
+        trial.rung, trial.last_t, trial.last_value = 0, 0, None
+
+        env = dict(os.environ)
+        env[STREAM_ENV] = str(stream_path)
+        preexec_fn = None
+        if job.assigned_cores:
+            cores = list(job.assigned_cores)
+            env.update(budget_env(cores))
+            preexec_fn = lambda: os.sched_setaffinity(0, cores)  # noqa: E731
+        log_dir = self.root / "logs"
+        log_dir.mkdir(parents=True, exist_ok=True)
+        cores_note = f" cores={format_core_list(job.assigned_cores)}" if job.assigned_cores else ""
+        print(f"[asha {self.name}] 시작: {trial.name}{cores_note}", flush=True)
+        with (log_dir / f"{trial.job_id}.log").open("ab") as log:
+            proc = subprocess.Popen(
+                job.command,
+                cwd=ROOT,
+                env=env,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                preexec_fn=preexec_fn,
+                start_new_session=True,
+            )
+        trial.status = "running"
+        self.running[trial.job_id] = (job, proc, stream)
+
+    def _terminate(self, job_id: str) -> None:
+        _, proc, _ = self.running[job_id]
+        try:
+            os.killpg(proc.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        try:
+            proc.wait(timeout=TERMINATE_GRACE_S)
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            proc.wait()
+
+    def _release(self, job_id: str) -> None:
+        job, _, _ = self.running.pop(job_id)
+        self.free.give_back(job)
+
+    # ----------------------------------------------------------------- rungs
+    def _observe(self, trial: Trial, stream: ScalarStream) -> bool:
+        """Consume new metric points; returns ``False`` if the trial should stop."""
+        for t, value in stream.read_new():
+            trial.last_t, trial.last_value = t, value
+            while trial.rung < len(self.rungs) and t >= self.rungs[trial.rung]:
+                rung = self.rungs[trial.rung]
+                recorded = self.state.results[rung]
+                recorded[trial.job_id] = value
+                trial.rung += 1
+                if not promotes(value, recorded, self.eta, self.sign):
+                    print(
+                        f"[asha {self.name}] 중단: {trial.name} — rung t={rung} {self.metric}={value:.4f} "
+                        f"(상위 1/{self.eta} 밖, {len(recorded)}개 기록)",
+                        flush=True,
+                    )
+                    return False
+                print(f"[asha {self.name}] 승급: {trial.name} — rung t={rung} {self.metric}={value:.4f}", flush=True)
+        return True
+
+    def _poll(self) -> None:
+        for job_id, (_, proc, stream) in list(self.running.items()):
+            trial = self.state.trials[job_id]
+            keep = self._observe(trial, stream)
+            code = proc.poll()
+            if not keep:
+                self._terminate(job_id)
+                trial.status = "stopped"
+                self._release(job_id)
+            elif code is not None:
+                self._observe(trial, stream)
+                previous = self._previous_stream_path(job_id)
+                if code == 0 and trial.last_value is None and previous.exists():
+                    # Skipped by the run cache: the earlier attempt's stream is the result.
+                    self._observe(trial, ScalarStream(previous, self.metric))
+                trial.status = "done" if code == 0 else "failed"
+                trial.exit_code = code
+                self._release(job_id)
+                state = "완료" if code == 0 else f"실패 (exit {code})"
+                print(f"[asha {self.name}] {state}: {trial.name}", flush=True)
+        self.state.save()
+
+    def _fill(self) -> None:
+        for trial in self.state.trials.values():
+            if len(self.running) >= self.workers:
+                return
+            if trial.status != "pending" or trial.job_id not in self.jobs:
+                continue
+            if not self.free.fits(Job(name=trial.name, command=[], cores=self.job_cores)):
+                return
+            self._launch(trial)
+        self.state.save()
+
+    def run(self) -> Dict[str, Trial]:
+        previous = signal.signal(signal.SIGTERM, _raise_interrupt)
+        try:
+            while True:
+                self._fill()
+                if not self.running:
+                    break
+                time.sleep(self.poll_interval)
+                self._poll()
+        except KeyboardInterrupt:
+            for job_id in list(self.running):
+                self._terminate(job_id)
+                self.state.trials[job_id].status = "pending"
+                self._release(job_id)
+            self.state.save()
+            raise
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+        return self.state.trials
+
+
+def _raise_interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+def print_status(state: AshaState, metric: str, mode: str) -> None:
+    sign = 1.0 if mode == "max" else -1.0
+    trials = sorted(
+        state.trials.values(),
+        key=lambda t: (t.rung, sign * t.last_value if t.last_value is not None else -math.inf),
+        reverse=True,
+    )
+    print(f"rungs (t_env): {state.rungs}")
+    for trial in trials:
+        value = "-" if trial.last_value is None else f"{trial.last_value:.4f}"
+        print(f"  {trial.name:<60} {trial.status:<8} rung={trial.rung}/{len(state.rungs)} t={trial.last_t:<10} {metric}={value}")
+    counts: Dict[str, int] = {}
+    for trial in trials:
+        counts[trial.status] = counts.get(trial.status, 0) + 1
+    print(f"요약: {counts}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="PyMARL2 하이퍼파라미터 스윕용 ASHA 조기 종료")
+    parser.add_argument("--name", required=True, help="ASHA 실행 이름 (results/asha/<name>/)")
+    parser.add_argument("--env", help="configs/python/environments.py의 환경 이름")
+    parser.add_argument("--algorithms", nargs="+", help="알고리즘 이름들")
+    parser.add_argument("--grid", action="append", default=[], help="하이퍼파라미터 그리드 (예: lr=0.0005,0.001), 반복 가능")
+    parser.add_argument("--seeds", type=int, default=1, help="설정당 시드 개수 (시드마다 별도 trial)")
+    parser.add_argument("--start-seed", type=int, default=DEFAULT_START_SEED)
+    parser.add_argument("--metric", default=DEFAULT_METRIC, help=f"비교할 스칼라 키 (기본: {DEFAULT_METRIC})")
+    parser.add_argument("--mode", choices=["max", "min"], default="max")
+    parser.add_argument("--min-t", type=int, help="첫 rung의 env step 수")
+    parser.add_argument("--max-t", type=int, help="최대 env step (trial의 t_max로 전달)")
+    parser.add_argument("--eta", type=int, default=3, help="감축 비율: rung마다 상위 1/eta만 계속 (기본: 3)")
+    parser.add_argument("--workers", type=int, default=1, help="동시에 실행할 trial 수")
+    parser.add_argument(
+        "--job-cores", type=int, default=None, help="trial당 CPU 코어 (지정 시 코어 고정, 기본: 총 코어 // workers, 고정 안 함)"
+    )
+    parser.add_argument("--no-pin-cores", action="store_true", help="trial별 CPU 코어 고정 끄기")
+    parser.add_argument("--poll-interval", type=float, default=30.0, help="스칼라 스트림 확인 주기(초)")
+    parser.add_argument("--wandb-config", default=None, help="W&B 프리셋 (기본: 환경별 설정)")
+    parser.add_argument("--status", action="store_true", help="저장된 상태만 출력")
+    parser.add_argument("extra_args", nargs="*", help="모든 trial에 붙일 추가 with 인자 (key=value)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    state_path = ASHA_ROOT / args.name / "state.json"
+    if args.status:
+        if not state_path.exists():
+            raise SystemExit(f"ASHA 기록이 없습니다: {state_path}")
+        with state_path.open("r", encoding="utf-8") as handle:
+            rungs = json.load(handle)["rungs"]
+        print_status(AshaState(state_path, rungs), args.metric, args.mode)
+        return
+    if not args.env or not args.algorithms or not args.min_t or not args.max_t:
+        raise SystemExit("--env, --algorithms, --min-t, --max-t가 필요합니다.")
+
+    rungs = rung_budgets(args.min_t, args.eta, args.max_t)
+    extra_args = list(args.extra_args) + [f"t_max={args.max_t}"]
+    jobs = expand_sweep(
+        args.algorithms,
+        [args.env],
+        range(args.start_seed, args.start_seed + args.seeds),
+        parse_grid(args.grid),
+        extra_args,
+    )
+    runner = AshaRunner(
+        args.name,
+        jobs,
+        rungs,
+        args.eta,
+        metric=args.metric,
+        mode=args.mode,
+        workers=args.workers,
+        job_cores=args.job_cores,
+        pin_cores=not args.no_pin_cores,
+        wandb_config=args.wandb_config,
+        poll_interval=args.poll_interval,
+    )
+    print(f"[asha {args.name}] trial {len(jobs)}개, rungs={rungs}, eta={args.eta}, metric={args.metric} ({args.mode})")
+    try:
+        runner.run()
+    except KeyboardInterrupt:
+        print(f"[asha {args.name}] 중단됨. 같은 명령으로 다시 실행하면 이어서 진행합니다.", file=sys.stderr)
+        sys.exit(130)
+    print_status(runner.state, args.metric, args.mode)
+    failed = [t for t in runner.state.trials.values() if t.status == "failed"]
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Measure SMACv2 wrapper throughput (env steps/sec) with random legal actions."""
+from __future__ import annotations
+
+import argparse
+import cProfile
+import pstats
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from wrappers.smacv2_env import SMACv2Env  # noqa: E402
+
+
+def random_actions(avail: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Sample one legal action per agent from a ``(n_agents, n_actions)`` mask."""
+    scores = rng.random(avail.shape) * avail
+    return scores.argmax(axis=-1)
+
+
+def run_single(args: argparse.Namespace, rng: np.random.Generator) -> int:
+    env = SMACv2Env(
+        args.map,
+        seed=args.seed,
+        synthetic=args.backend == "synthetic",
+        **_cost_kwargs(args),
+    )
+    steps = 0
+    try:
+        out = env.reset_full()
+        while steps < args.steps:
+            out = env.step_full(random_actions(out["avail_actions"], rng))
+            steps += 1
+            if out["terminated"]:
+                out = env.reset_full()
+    finally:
+        env.close()
+    return steps
+
+
+def run_vectorised(args: argparse.Namespace, rng: np.random.Generator) -> int:
+    from wrappers.smacv2_vec_env import SMACv2VecEnv
+
+    env = SMACv2VecEnv(
+        args.map,
+        n_envs=args.n_envs,
+        seed=args.seed,
+        synthetic=args.backend == "synthetic",
+        **_cost_kwargs(args),
+    )
+    steps = 0
+    try:
+        _, _, avail = env.reset()
+        while steps < args.steps:
+            _, _, avail, _, terminated, _ = env.step(random_actions(avail, rng))
+            steps += args.n_envs
+            done = np.flatnonzero(terminated)
+            if done.size:
+                env.reset(env_ids=done)
+    finally:
+        env.close()
+    return steps
+
+
+def _cost_kwargs(args: argparse.Namespace) -> dict:
+    kwargs = {"call_timeout": args.call_timeout} if args.call_timeout else {}
+    if args.backend != "synthetic":
+        return kwargs
+    return {
+        **kwargs,
+        "step_latency_ms": args.step_latency_ms,
+        "unit_latency_ms": args.unit_latency_ms,
+        "reset_latency_ms": args.reset_latency_ms,
+        "stall_prob": args.stall_prob,
+        "crash_prob": args.crash_prob,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="SMACv2 래퍼 처리량 벤치마크")
+    parser.add_argument("--map", default="protoss_5_vs_5", help="configs/smacv2/ 아래 시나리오 이름")
+    parser.add_argument("--backend", choices=["synthetic", "sc2"], default="synthetic", help="SC2 또는 NumPy 합성 백엔드")
+    parser.add_argument("--steps", type=int, default=5000, help="측정할 총 env step 수")
+    parser.add_argument("--n-envs", type=int, default=1, help="1보다 크면 SMACv2VecEnv 사용")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--step-latency-ms", type=float, default=0.0, help="합성 백엔드: 스텝당 고정 지연")
+    parser.add_argument("--unit-latency-ms", type=float, default=0.0, help="합성 백엔드: 유닛당 추가 지연")
+    parser.add_argument("--reset-latency-ms", type=float, default=0.0, help="합성 백엔드: reset 지연")
+    parser.add_argument("--call-timeout", type=float, default=None, help="워치독: 백엔드 호출 제한 시간(초)")
+    parser.add_argument("--stall-prob", type=float, default=0.0, help="합성 백엔드: 호출이 멈출 확률 (워치독 테스트)")
+    parser.add_argument("--crash-prob", type=float, default=0.0, help="합성 백엔드: 프로세스가 죽을 확률 (워치독 테스트)")
+    parser.add_argument("--profile", action="store_true", help="cProfile 상위 25개 함수 출력")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    runner = run_vectorised if args.n_envs > 1 else run_single
+
+    profiler = cProfile.Profile() if args.profile else None
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    steps = runner(args, rng)
+    if profiler is not None:
+        profiler.disable()
+    elapsed = time.perf_counter() - start
+
+    print(f"map      : {args.map} ({args.backend}, n_envs={args.n_envs})")
+    print(f"steps    : {steps}")
+    print(f"elapsed  : {elapsed:.2f}s")
+    print(f"steps/sec: {steps / elapsed:.1f}")
+    if profiler is not None:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+
+if __name__ == "__main__":
+    main()
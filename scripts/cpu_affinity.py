@@ -0,0 +1,101 @@
+"""CPU core pinning and thread budgets for concurrent training runs.
+
+Launchers call :func:`apply_cpu_budget` before any heavy work: the core set is
+applied with ``sched_setaffinity`` (inherited by SC2/Ray children and across
+``exec``), and the thread budget is exported as ``OMP_NUM_THREADS`` /
+``MKL_NUM_THREADS`` (read by torch/NumPy in child processes) and applied with
+``torch.set_num_threads`` when torch is already loaded in this process.
+
+The seed scheduler hands each run a disjoint core set through
+``MARL_LAB_CPU_CORES`` / ``MARL_LAB_NUM_THREADS``, which the launchers use as
+defaults for ``--cpu-cores`` / ``--num-threads``.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from typing import Dict, Iterable, List, Sequence
+
+CORES_ENV = "MARL_LAB_CPU_CORES"
+THREADS_ENV = "MARL_LAB_NUM_THREADS"
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+def parse_core_list(spec: str | Sequence[int] | None) -> List[int]:
+    """``"0-3,8,10-11"`` (the ``taskset -c`` format) -> ``[0, 1, 2, 3, 8, 10, 11]``."""
+    if spec is None or spec == "":
+        return []
+    if not isinstance(spec, str):
+        return sorted({int(core) for core in spec})
+    cores = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            cores.update(range(int(lo), int(hi) + 1))
+        else:
+            cores.add(int(part))
+    return sorted(cores)
+
+
+def format_core_list(cores: Iterable[int]) -> str:
+    """Inverse of :func:`parse_core_list`, collapsing consecutive ids into ranges."""
+    ordered = sorted(set(cores))
+    parts: List[str] = []
+    start = prev = None
+    for core in ordered + [None]:
+        if start is not None and (core is None or core != prev + 1):
+            parts.append(str(start) if start == prev else f"{start}-{prev}")
+            start = None
+        if core is not None and start is None:
+            start = core
+        prev = core
+    return ",".join(parts)
+
+
+def available_core_ids() -> List[int]:
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - non-Linux
+        return list(range(os.cpu_count() or 1))
+
+
+def budget_env(cores: Sequence[int], num_threads: int | None = None) -> Dict[str, str]:
+    """Environment variables that hand a core set and thread budget to a child launcher."""
+    threads = num_threads or len(cores)
+    return {CORES_ENV: format_core_list(cores), THREADS_ENV: str(threads)}
+
+
+def add_cpu_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cpu-cores",
+        default=os.environ.get(CORES_ENV),
+        help=f"사용할 CPU 코어 (예: 0-7,16). 기본값은 ${CORES_ENV} (seed_scheduler가 지정)",
+    )
+    parser.add_argument(
+        "--num-threads",
+        type=int,
+        default=int(os.environ[THREADS_ENV]) if os.environ.get(THREADS_ENV) else None,
+        help=f"torch/OMP/MKL 스레드 수 (기본: 코어 수 또는 ${THREADS_ENV})",
+    )
+
+
+def apply_cpu_budget(cores: str | Sequence[int] | None, num_threads: int | None = None) -> None:
+    """Pin this process (and its future children) and cap math-library threads."""
+    core_ids = parse_core_list(cores)
+    if core_ids:
+        os.sched_setaffinity(0, core_ids)
+        os.environ[CORES_ENV] = format_core_list(core_ids)
+    threads = num_threads or len(core_ids)
+    if not threads:
+        return
+    os.environ[THREADS_ENV] = str(threads)
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+    print(f"[cpu] cores={format_core_list(core_ids) or '(unchanged)'} threads={threads}")
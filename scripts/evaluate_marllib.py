@@ -6,24 +6,13 @@ import argparse
 from pathlib import Path
 from typing import Dict
 
-import subprocess
-import sys
 
 ROOT = Path(__file__).resolve().parents[1]
-PATCH_SCRIPT = ROOT / "scripts" / "apply_marllib_patches.sh"
 
-def ensure_patches() -> None:
-    if PATCH_SCRIPT.exists() and PATCH_SCRIPT.is_file():
-        subprocess.run([str(PATCH_SCRIPT)], check=True, capture_output=True, text=True)
+# marllib (Ray, RLlib, torch) is imported only after the arguments and the
+# checkpoint have been checked; see run_marllib.import_marllib().
+from run_marllib import import_marllib, validate_algo, validate_map  # noqa: E402
 
-# Ensure patches are applied before any marllib code is imported
-ensure_patches()
-
-# external/marllib 디렉터리를 경로에 추가하여, 그 안의 'marllib' 패키지를 찾도록 합니다.
-sys.path.insert(0, str(ROOT / "external" / "marllib"))
-sys.path.insert(0, str(ROOT))
-
-from marllib.marl import api as marl
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Evaluate MARLlib checkpoints")
@@ -81,10 +70,13 @@ def build_restore_dict(trial_dir: Path, checkpoint_file: Path, render: bool) ->
 
 def main() -> None:
     args = parse_args()
+    validate_map(args)
+    validate_algo(args)
     trial_dir = Path(args.trial_dir).expanduser().resolve()
     checkpoint_file = locate_checkpoint(trial_dir, args.checkpoint)
     restore = build_restore_dict(trial_dir, checkpoint_file, args.render)
 
+    marl = import_marllib()
     env = marl.make_env(environment_name=args.env, map_name=args.map, force_coop=args.force_coop or args.env == "mpe")
     hyper_source = choose_hyperparam_source(args.env)
 
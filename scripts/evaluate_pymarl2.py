@@ -3,21 +3,23 @@
 from __future__ import annotations
 
 import argparse
-import os
-import subprocess
 import sys
 from pathlib import Path
 from typing import Iterable, List
 
 ROOT = Path(__file__).resolve().parents[1]
-PYMARL2_MAIN = ROOT / "external" / "pymarl2" / "src" / "main.py"
-PATCH_SCRIPT = ROOT / "scripts" / "apply_pymarl2_patches.sh"
+# run_smacv2.py registers sc2v2 and plugins.registry (buffer=, mac=packed_mac,
+# runner=shm_parallel, ...) before it runs PyMARL2's main.py.
+PYMARL2_LAUNCHER = ROOT / "scripts" / "run_smacv2.py"
+
+from fork_server import exec_or_call  # noqa: E402
+from patch_manager import ensure_patches  # noqa: E402
 
 
 def build_command(args: argparse.Namespace) -> List[str]:
     command: List[str] = [
         sys.executable,
-        str(PYMARL2_MAIN),
+        str(PYMARL2_LAUNCHER),
         f"--config={args.config}",
         f"--env-config={args.env_config}",
     ]
@@ -52,11 +54,10 @@ def parse_args() -> argparse.Namespace:
 
 def main() -> None:
     args = parse_args()
-    if PATCH_SCRIPT.exists():
-        subprocess.run([str(PATCH_SCRIPT)], check=True)
+    ensure_patches("pymarl2")
     command = build_command(args)
     print("실행할 명령어:\n", " ".join(command), "\n")
-    os.execvp(command[0], command)
+    exec_or_call(command)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""Fork-server that preloads torch, sacred, yaml and smacv2 for training launches.
+
+Every PyMARL2 run is a fresh interpreter that re-imports torch, sacred, yaml,
+numpy and smacv2 (and PyMARL2's own modules) before doing any work.  The
+server imports them once, applies the PyMARL2 patches once and then forks a
+child per request:
+
+* the client (``run_with_wandb.py``, ``evaluate_pymarl2.py``,
+  ``run_smacv2.py``) connects to a UNIX socket and passes its stdin/stdout/
+  stderr file descriptors (``SCM_RIGHTS``), argv, cwd, environment and CPU
+  affinity;
+* the server forks; the child starts a new session, takes over the client's
+  descriptors, environment and affinity and runs the script with ``runpy``;
+* the client waits for the child's exit code and forwards SIGINT/SIGTERM to
+  the child's process group.  If the client dies, the server terminates the
+  child.
+
+Launchers call :func:`call` and fall back to a normal subprocess/exec when no
+server is listening, so the server is purely an optimisation.  The server
+never touches CUDA (forking after CUDA initialisation is unsafe); restart it
+after changing ``patches/`` or the pre-imported packages.
+
+사용법:
+  python scripts/fork_server.py serve &          # 소켓: $MARL_LAB_FORK_SERVER 또는 /tmp/marl_lab_fork_<uid>.sock
+  python scripts/fork_server.py status
+  python scripts/fork_server.py stop
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import random
+import runpy
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from patch_manager import ensure_patches
+
+ROOT = Path(__file__).resolve().parents[1]
+PYMARL2_SRC = ROOT / "external" / "pymarl2" / "src"
+SOCKET_ENV = "MARL_LAB_FORK_SERVER"
+CHILD_ENV = "MARL_LAB_FORKED"
+PRELOAD = ("numpy", "yaml", "torch", "sacred", "sacred.observers", "smacv2", "wrappers.smacv2_env")
+# PyMARL2 modules pulled in by main.py; preloaded when the submodule is present.
+PYMARL2_PRELOAD = ("run", "utils.logging")
+
+
+def socket_path() -> str | None:
+    """Socket of the server, or ``None`` when disabled with ``MARL_LAB_FORK_SERVER=off``."""
+    value = os.environ.get(SOCKET_ENV, "")
+    if value.lower() in {"off", "0", "none"}:
+        return None
+    return value or f"/tmp/marl_lab_fork_{os.getuid()}.sock"
+
+
+def in_forked_child() -> bool:
+    return os.environ.get(CHILD_ENV) == "1"
+
+
+def _connect(timeout: float = 0.5) -> socket.socket | None:
+    path = socket_path()
+    if path is None or not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def available() -> bool:
+    sock = _connect()
+    if sock is None:
+        return False
+    sock.close()
+    return True
+
+
+def _send_request(sock: socket.socket, request: Dict[str, Any], fds: Sequence[int] = ()) -> None:
+    body = json.dumps(request).encode("utf-8")
+    socket.send_fds(sock, [len(body).to_bytes(8, "big")], list(fds))
+    sock.sendall(body)
+
+
+def _read_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("fork-server connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _read_line(handle) -> Dict[str, Any] | None:
+    line = handle.readline()
+    return json.loads(line) if line else None
+
+
+# --------------------------------------------------------------------------- client
+def call(command: Sequence[str]) -> int | None:
+    """Run ``[python, script.py, *args]`` through the server; ``None`` if it cannot.
+
+    Returns the exit code like :func:`subprocess.call` (``-N`` for signal N).
+    """
+    if len(command) < 2 or not str(command[1]).endswith(".py") or in_forked_child():
+        return None
+    if os.path.realpath(command[0]) != os.path.realpath(sys.executable):
+        return None
+    sock = _connect()
+    if sock is None:
+        return None
+
+    request = {
+        "op": "run",
+        "argv": [str(token) for token in command[1:]],
+        "cwd": os.getcwd(),
+        "env": dict(os.environ),
+        "affinity": sorted(os.sched_getaffinity(0)),
+    }
+    sys.stdout.flush()
+    sys.stderr.flush()
+    with sock, sock.makefile("r", encoding="utf-8") as replies:
+        _send_request(sock, request, [0, 1, 2])
+        started = _read_line(replies)
+        if not started or "pid" not in started:
+            print(f"[fork-server] 실행 실패: {started}", file=sys.stderr)
+            return None
+        pid = int(started["pid"])
+
+        def forward(signum, frame) -> None:
+            try:
+                os.killpg(pid, signum)
+            except ProcessLookupError:
+                pass
+
+        previous = {}
+        if threading.current_thread() is threading.main_thread():
+            previous = {sig: signal.signal(sig, forward) for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            finished = _read_line(replies)
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+    if not finished or "exit" not in finished:
+        return 1
+    return int(finished["exit"])
+
+
+def _exit_code(status: int) -> int:
+    """``os.waitstatus_to_exitcode`` for Python 3.8 (the MARLlib env): ``-signal`` when killed."""
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def exit_code_for_shell(code: int) -> int:
+    return 128 - code if code < 0 else code
+
+
+def exec_or_call(command: Sequence[str]) -> None:
+    """Replace this launcher with ``command``: via the server when available, else ``execvp``."""
+    code = call(command)
+    if code is None:
+        os.execvp(command[0], list(command))
+    sys.exit(exit_code_for_shell(code))
+
+
+def run_command(command: Sequence[str]) -> int:
+    """Like ``subprocess.run(command).returncode``, via the server when available."""
+    code = call(command)
+    if code is None:
+        return subprocess.run(list(command)).returncode
+    return code
+
+
+def delegate_script(script: str | Path) -> None:
+    """Re-run the current script inside a server child and exit with its code.
+
+    For launchers that do their heavy imports in-process (``run_smacv2.py``);
+    a no-op inside the child or without a server.
+    """
+    code = call([sys.executable, str(script), *sys.argv[1:]])
+    if code is not None:
+        sys.exit(exit_code_for_shell(code))
+
+
+# --------------------------------------------------------------------------- server
+def preload() -> None:
+    for path in (ROOT, PYMARL2_SRC):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+    modules = list(PRELOAD)
+    if PYMARL2_SRC.exists():
+        modules.extend(PYMARL2_PRELOAD)
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as exc:  # noqa: BLE001 - a missing optional package must not stop the server
+            print(f"[fork-server] preload 건너뜀: {name} ({exc.__class__.__name__}: {exc})", flush=True)
+            continue
+        print(f"[fork-server] preload {name} ({time.perf_counter() - start:.2f}s)", flush=True)
+
+
+def _run_child(request: Dict[str, Any], fds: List[int]) -> None:
+    """Body of a forked child; never returns."""
+    code = 1
+    try:
+        os.setsid()
+        for target, fd in enumerate(fds[:3]):
+            os.dup2(fd, target)
+        for fd in fds:
+            if fd > 2:
+                os.close(fd)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        os.environ[CHILD_ENV] = "1"
+        if request.get("affinity"):
+            os.sched_setaffinity(0, request["affinity"])
+        threads = os.environ.get("OMP_NUM_THREADS")
+        torch = sys.modules.get("torch")
+        if threads and torch is not None:
+            torch.set_num_threads(int(threads))
+
+        # Forked children share the server's RNG state; sacred draws unseeded runs' seeds from it.
+        random.seed()
+        numpy = sys.modules.get("numpy")
+        if numpy is not None:
+            numpy.random.seed()
+        for stream in (sys.stdout, sys.stderr):
+            stream.reconfigure(line_buffering=True)
+
+        argv = request["argv"]
+        script = os.path.abspath(argv[0])
+        sys.argv = [script, *argv[1:]]
+        sys.path.insert(0, os.path.dirname(script))
+        runpy.run_path(script, run_name="__main__")
+        code = 0
+    except SystemExit as exc:
+        if exc.code is None:
+            code = 0
+        elif isinstance(exc.code, int):
+            code = exc.code
+        else:
+            print(exc.code, file=sys.stderr)
+            code = 1
+    except BaseException:  # noqa: BLE001 - report like the interpreter would
+        traceback.print_exc()
+        code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code & 0xFF)
+
+
+class ForkServer:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.selector = selectors.DefaultSelector()
+        self.children: Dict[int, socket.socket] = {}
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.stopping = False
+
+    def serve(self) -> None:
+        if os.path.exists(self.path):
+            if available():
+                raise SystemExit(f"[fork-server] 이미 실행 중입니다: {self.path}")
+            os.unlink(self.path)
+        self.listener.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self.listener.listen(64)
+        self.selector.register(self.listener, selectors.EVENT_READ, None)
+        print(f"[fork-server] 대기 중: {self.path} (pid {os.getpid()})", flush=True)
+        signal.signal(signal.SIGTERM, self._on_stop)
+        try:
+            while not self.stopping or self.children:
+                for key, _ in self.selector.select(timeout=0.2):
+                    if key.data is None:
+                        self._accept()
+                    else:
+                        self._client_closed(key.fileobj, key.data)
+                self._reap()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for pid in list(self.children):
+                self._kill(pid)
+            self._on_stop(signal.SIGTERM, None)
+
+    def _on_stop(self, signum, frame) -> None:
+        # Stop accepting at once (new launches fall back to plain processes);
+        # running children are waited for.
+        if not self.stopping:
+            self.stopping = True
+            self.selector.unregister(self.listener)
+            self.listener.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def _accept(self) -> None:
+        conn, _ = self.listener.accept()
+        fds: List[int] = []
+        try:
+            conn.settimeout(5.0)
+            header, fds, _, _ = socket.recv_fds(conn, 8, 3)
+            if len(header) != 8:
+                raise ConnectionError("short header")
+            request = json.loads(_read_exact(conn, int.from_bytes(header, "big")))
+            conn.settimeout(None)
+        except (OSError, ValueError) as exc:
+            print(f"[fork-server] 잘못된 요청: {exc}", flush=True)
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+            return
+
+        op = request.get("op")
+        if op == "ping":
+            conn.sendall(json.dumps({"pid": os.getpid(), "children": len(self.children)}).encode() + b"\n")
+            conn.close()
+            return
+        if op == "stop":
+            conn.sendall(b'{"stopping": true}\n')
+            conn.close()
+            self._on_stop(signal.SIGTERM, None)
+            return
+        if op != "run" or len(fds) != 3:
+            conn.sendall(json.dumps({"error": f"unsupported request {op!r}"}).encode() + b"\n")
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+            return
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            self.listener.close()
+            conn.close()
+            _run_child(request, fds)
+        for fd in fds:
+            os.close(fd)
+        self.children[pid] = conn
+        self.selector.register(conn, selectors.EVENT_READ, pid)
+        conn.sendall(json.dumps({"pid": pid}).encode() + b"\n")
+        print(f"[fork-server] pid {pid}: {' '.join(request['argv'])}", flush=True)
+
+    def _client_closed(self, conn: socket.socket, pid: int) -> None:
+        # The client only reads; readability means it went away.
+        if conn.recv(1):
+            return
+        self.selector.unregister(conn)
+        print(f"[fork-server] pid {pid}: 클라이언트 종료 → 자식 종료", flush=True)
+        self._kill(pid)
+
+    def _kill(self, pid: int) -> None:
+        try:
+            os.killpg(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def _reap(self) -> None:
+        for pid in list(self.children):
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                # Reaped elsewhere; the status is lost.
+                code = 1
+            else:
+                if done == 0:
+                    continue
+                code = _exit_code(status)
+            conn = self.children.pop(pid)
+            try:
+                self.selector.unregister(conn)
+            except KeyError:
+                pass  # client already gone
+            try:
+                conn.sendall(json.dumps({"exit": code}).encode() + b"\n")
+            except OSError:
+                pass
+            conn.close()
+            print(f"[fork-server] pid {pid}: exit {code}", flush=True)
+
+
+def _control(op: str) -> Dict[str, Any] | None:
+    sock = _connect()
+    if sock is None:
+        return None
+    with sock, sock.makefile("r", encoding="utf-8") as replies:
+        _send_request(sock, {"op": op})
+        return _read_line(replies)
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="torch/sacred/smacv2를 미리 import한 fork-server")
+    parser.add_argument("command", choices=["serve", "status", "stop"])
+    parser.add_argument("--socket", default=None, help=f"소켓 경로 (기본: ${SOCKET_ENV} 또는 /tmp/marl_lab_fork_<uid>.sock)")
+    parser.add_argument("--no-patches", action="store_true", help="시작 시 PyMARL2 패치 적용을 건너뜀")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    if args.socket:
+        os.environ[SOCKET_ENV] = args.socket
+    path = socket_path()
+    if path is None:
+        print(f"${SOCKET_ENV}=off 입니다.", file=sys.stderr)
+        return 2
+    if args.command == "status":
+        reply = _control("ping")
+        print(f"실행 중: {reply}" if reply else f"실행 중인 fork-server가 없습니다: {path}")
+        return 0 if reply else 1
+    if args.command == "stop":
+        reply = _control("stop")
+        print("종료 요청을 보냈습니다." if reply else f"실행 중인 fork-server가 없습니다: {path}")
+        return 0 if reply else 1
+
+    if not args.no_patches:
+        try:
+            ensure_patches("pymarl2")
+        except subprocess.CalledProcessError:
+            print("[fork-server] PyMARL2 패치 적용에 실패했습니다. 자식 프로세스는 패치 없이 실행됩니다.", file=sys.stderr)
+    preload()
+    ForkServer(path).serve()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Fingerprinted, lock-protected application of submodule patches.
+
+``ensure_patches(framework)`` hashes ``patches/<framework>/*.patch`` together
+with the current contents of every file those patches touch and compares the
+digest with the stamp written after the last successful application
+(``results/.patch_state/<framework>.json``).  A match — the common case on warm
+launches — costs a few small file reads.  Otherwise the caller takes an
+exclusive ``fcntl`` lock, re-checks the stamp (another launch may have just
+finished), runs ``scripts/apply_<framework>_patches.sh`` and writes a new
+stamp, so parallel seeds never apply patches to the same files concurrently.
+
+사용법:
+  python scripts/patch_manager.py              # pymarl2, marllib 모두 확인/적용
+  python scripts/patch_manager.py pymarl2 --force
+  python scripts/patch_manager.py --status
+"""
+from __future__ import annotations
+
+import argparse
+import fcntl
+import hashlib
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+ROOT = Path(__file__).resolve().parents[1]
+STATE_DIR = ROOT / "results" / ".patch_state"
+FRAMEWORKS = {
+    "pymarl2": (ROOT / "patches" / "pymarl2", ROOT / "external" / "pymarl2", ROOT / "scripts" / "apply_pymarl2_patches.sh"),
+    "marllib": (ROOT / "patches" / "marllib", ROOT / "external" / "marllib", ROOT / "scripts" / "apply_marllib_patches.sh"),
+}
+_TARGET_RE = re.compile(r"^\+\+\+ b/(\S+)", re.MULTILINE)
+
+
+def patch_files(framework: str) -> List[Path]:
+    patch_dir = FRAMEWORKS[framework][0]
+    return sorted(list(patch_dir.glob("*.patch")) + list(patch_dir.glob("*.diff")))
+
+
+def target_files(patches: Sequence[Path]) -> List[str]:
+    targets = set()
+    for patch in patches:
+        targets.update(_TARGET_RE.findall(patch.read_text(encoding="utf-8", errors="replace")))
+    return sorted(targets)
+
+
+def fingerprint(framework: str) -> str:
+    """Digest of the patch set and the current state of the files it modifies."""
+    _, submodule, _ = FRAMEWORKS[framework]
+    patches = patch_files(framework)
+    digest = hashlib.sha256()
+    for patch in patches:
+        digest.update(patch.name.encode())
+        digest.update(patch.read_bytes())
+    for target in target_files(patches):
+        path = submodule / target
+        digest.update(target.encode())
+        digest.update(path.read_bytes() if path.exists() else b"<missing>")
+    return digest.hexdigest()
+
+
+def _stamp_path(framework: str) -> Path:
+    return STATE_DIR / f"{framework}.json"
+
+
+def read_stamp(framework: str) -> Dict[str, object]:
+    path = _stamp_path(framework)
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_stamp(framework: str, digest: str) -> None:
+    path = _stamp_path(framework)
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(
+        json.dumps(
+            {"fingerprint": digest, "patches": [p.name for p in patch_files(framework)], "applied_at": time.time()},
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    tmp.replace(path)
+
+
+def is_current(framework: str) -> bool:
+    return read_stamp(framework).get("fingerprint") == fingerprint(framework)
+
+
+def ensure_patches(framework: str, quiet: bool = False, force: bool = False) -> bool:
+    """Apply ``framework``'s patches unless the stamp says they already are.
+
+    Returns ``True`` if the apply script ran.  Raises
+    :class:`subprocess.CalledProcessError` when it fails, like the
+    ``check=True`` calls it replaces.
+    """
+    _, _, script = FRAMEWORKS[framework]
+    if not script.exists():
+        return False
+    if not force and is_current(framework):
+        return False
+
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    with (STATE_DIR / f"{framework}.lock").open("w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if not force and is_current(framework):
+            return False
+        subprocess.run([str(script)], check=True, capture_output=quiet, text=True)
+        _write_stamp(framework, fingerprint(framework))
+    return True
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="서브모듈 패치 적용 (지문 + 파일 잠금)")
+    parser.add_argument("frameworks", nargs="*", help=f"대상 ({', '.join(FRAMEWORKS)}; 기본: 전부)")
+    parser.add_argument("--force", action="store_true", help="stamp가 최신이어도 적용 스크립트를 실행")
+    parser.add_argument("--quiet", action="store_true", help="적용 스크립트 출력을 숨김")
+    parser.add_argument("--status", action="store_true", help="stamp 상태만 출력")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    frameworks = args.frameworks or list(FRAMEWORKS)
+    unknown = [name for name in frameworks if name not in FRAMEWORKS]
+    if unknown:
+        print(f"알 수 없는 대상: {unknown}. 사용 가능: {list(FRAMEWORKS)}", file=sys.stderr)
+        return 2
+    if args.status:
+        for framework in frameworks:
+            stamp = read_stamp(framework)
+            state = "최신" if stamp and is_current(framework) else "적용 필요"
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(stamp["applied_at"])) if stamp else "-"
+            print(f"{framework:<8} {state} (마지막 적용: {when})")
+        return 0
+    for framework in frameworks:
+        if ensure_patches(framework, quiet=args.quiet, force=args.force):
+            print(f"[patch] {framework}: 패치를 적용했습니다.")
+        else:
+            print(f"[patch] {framework}: 이미 최신입니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Checkpoint discovery for ``--resume auto``.
+
+With ``--resume auto`` a launcher writes every checkpoint of a run under
+``<results>/runs/<fingerprint>/`` (the fingerprint of ``run_cache.py``: the
+resolved config including the seed), so a restarted run finds its own
+checkpoints and nothing else:
+
+* PyMARL2 saves ``models/<unique_token>/<t_env>/`` (``agent.th``, ``opt.th``,
+  mixer weights); the newest complete step is passed back as
+  ``checkpoint_path`` / ``load_step``, which restores the networks, the
+  optimiser and ``t_env``.  The replay buffer is not part of PyMARL2
+  checkpoints and refills from scratch, except ``buffer=memmap``, which gets
+  a per-fingerprint ``memmap_dir`` and ``memmap_resume=True``.  Any other
+  buffer is warned about at launch and again inside the run
+  (``plugins/registry.py``), since the resumed learner starts from an empty
+  buffer.
+* MARLlib/Ray Tune saves ``<exp>/<trial>/checkpoint_<iter>/``; the newest one
+  is passed as ``restore_path`` so the trainer state and timestep counters
+  continue.
+
+The W&B run id is kept in ``wandb_run_id`` next to the checkpoints and
+exported with ``WANDB_RESUME=allow`` so a resumed run keeps logging into the
+same W&B run.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import secrets
+import time
+import zipfile
+from pathlib import Path
+from typing import List, Tuple
+
+RESUME_MODES = ("off", "auto")
+PYMARL2_REQUIRED_FILES = ("agent.th",)
+
+
+def add_resume_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--resume",
+        choices=RESUME_MODES,
+        default="off",
+        help="auto: 같은 설정·seed의 마지막 체크포인트에서 이어서 학습 (results/.../runs/<지문>/)",
+    )
+
+
+def resume_root(base: str | Path, key: str) -> Path:
+    return (Path(base) / "runs" / key[:16]).resolve()
+
+
+def retire(root: Path) -> None:
+    """Move an old resume directory aside so a forced rerun starts from step 0."""
+    if root.exists():
+        target = root.with_name(f"{root.name}.{time.strftime('%Y%m%d-%H%M%S')}")
+        root.rename(target)
+        print(f"[resume] 이전 체크포인트를 보관했습니다: {target}")
+
+
+def wandb_run_id(root: Path) -> str:
+    """Stable W&B run id for this resume directory, created on first use."""
+    path = root / "wandb_run_id"
+    if path.exists():
+        return path.read_text(encoding="utf-8").strip()
+    root.mkdir(parents=True, exist_ok=True)
+    run_id = secrets.token_hex(4)
+    path.write_text(run_id + "\n", encoding="utf-8")
+    return run_id
+
+
+def export_wandb_resume(root: Path) -> str:
+    run_id = wandb_run_id(root)
+    os.environ["WANDB_RUN_ID"] = run_id
+    os.environ["WANDB_RESUME"] = "allow"
+    return run_id
+
+
+def _complete_torch_file(path: Path) -> bool:
+    # torch.save writes a zip whose central directory comes last, so a file cut
+    # short by a kill fails is_zipfile; legacy (non-zip) files only get a size check.
+    if path.stat().st_size == 0:
+        return False
+    with path.open("rb") as handle:
+        is_zip_format = handle.read(4) == b"PK\x03\x04"
+    return zipfile.is_zipfile(path) if is_zip_format else True
+
+
+def latest_pymarl2_checkpoint(root: Path) -> Tuple[Path, int] | None:
+    """``(checkpoint_path, t_env)`` of the newest complete ``models/*/<t_env>/``."""
+    candidates: List[Tuple[int, float, Path]] = []
+    for step_dir in root.glob("models/*/*"):
+        if not step_dir.is_dir() or not step_dir.name.isdigit():
+            continue
+        files = list(step_dir.glob("*.th"))
+        names = {path.name for path in files}
+        if not all(required in names for required in PYMARL2_REQUIRED_FILES):
+            continue
+        if not all(_complete_torch_file(path) for path in files):
+            print(f"[resume] 불완전한 체크포인트를 건너뜁니다: {step_dir}")
+            continue
+        candidates.append((int(step_dir.name), step_dir.stat().st_mtime, step_dir))
+    if not candidates:
+        return None
+    step, _, step_dir = max(candidates)
+    return step_dir.parent, step
+
+
+def _checkpoint_iteration(path: Path) -> int:
+    digits = path.name.rsplit("_", 1)[-1].rsplit("-", 1)[-1]
+    return int(digits) if digits.isdigit() else -1
+
+
+def latest_marllib_checkpoint(root: Path) -> Tuple[Path, Path] | None:
+    """``(trial_dir, checkpoint)`` of the newest complete Ray Tune checkpoint.
+
+    Ray 1.x writes ``checkpoint_<n>/checkpoint-<n>`` followed by its
+    ``.tune_metadata``; Ray 2.x writes ``rllib_checkpoint.json`` last.
+    """
+    candidates: List[Tuple[int, float, Path, Path]] = []
+    for params in root.glob("**/params.json"):
+        trial_dir = params.parent
+        for ckpt_dir in trial_dir.glob("checkpoint_*"):
+            if not ckpt_dir.is_dir():
+                continue
+            iteration = _checkpoint_iteration(ckpt_dir)
+            legacy = [
+                path for path in ckpt_dir.glob("checkpoint-*")
+                if path.suffix != ".tune_metadata" and path.with_name(path.name + ".tune_metadata").exists()
+            ]
+            if legacy:
+                target = max(legacy, key=_checkpoint_iteration)
+            elif (ckpt_dir / "rllib_checkpoint.json").exists():
+                target = ckpt_dir
+            else:
+                continue
+            candidates.append((iteration, ckpt_dir.stat().st_mtime, trial_dir, target))
+    if not candidates:
+        return None
+    _, _, trial_dir, target = max(candidates)
+    return trial_dir, target
@@ -0,0 +1,246 @@
+"""Content-addressed index of launched PyMARL2 runs.
+
+A run is identified by a fingerprint of its fully resolved configuration:
+algorithm, env-config, the merged ``with`` arguments (exp YAML + W&B
+overrides + CLI, normalised and sorted), the contents of the YAML files those
+names resolve to (``default.yaml``, ``algs/<algo>.yaml``, ``envs/<env>.yaml``
+in PyMARL2 and ``configs/envs/``), the PyMARL2 submodule commit and the
+contents of ``patches/pymarl2/*.patch``.  The index lives in
+``results/run_cache/<fingerprint>.json``; launchers consult it to skip runs
+that already completed and to report runs that were interrupted.  A finished
+record lists the output directories the run created (``outputs``), so a
+skipped launch can point at the earlier result.  Check-and-mark happens under
+an ``fcntl`` lock per fingerprint, so two launchers cannot both start a run.
+
+Runs without an explicit ``seed`` are never cached: PyMARL2 draws a random
+seed, so two such launches are not the same experiment.
+
+A ``running`` record on this host is checked by its pid.  Records from other
+hosts carry a heartbeat refreshed every ``HEARTBEAT_INTERVAL`` seconds while
+the run lives; one older than ``HEARTBEAT_TTL`` counts as interrupted, so a
+job preempted on one node can be rescheduled on another.  A launcher that
+finds a live duplicate exits with ``ALREADY_RUNNING_EXIT`` (``EX_TEMPFAIL``),
+not 0, so schedulers do not record the skipped launch as done.
+"""
+from __future__ import annotations
+
+import ast
+import fcntl
+import hashlib
+import json
+import os
+import socket
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = ROOT / "results" / "run_cache"
+SUBMODULE_DIRS = {"pymarl2": ROOT / "external" / "pymarl2", "marllib": ROOT / "external" / "marllib"}
+PYMARL2_CONFIG_DIR = SUBMODULE_DIRS["pymarl2"] / "src" / "config"
+# Output directories PyMARL2 creates per run under local_results_path.
+OUTPUT_SUBDIRS = ("models", "tb_logs", "sacred")
+PATCH_DIRS = {"pymarl2": ROOT / "patches" / "pymarl2", "marllib": ROOT / "patches" / "marllib"}
+ALREADY_RUNNING_EXIT = 75  # EX_TEMPFAIL
+HEARTBEAT_INTERVAL = 60.0
+HEARTBEAT_TTL = 600.0
+
+
+def _normalise_value(raw: str) -> Any:
+    value = raw.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    # sacred parses ``with`` values with ast.literal_eval, which (unlike YAML
+    # 1.1) reads ``5e-4`` as a float; fall back to YAML for ``true``/``null``.
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        pass
+    try:
+        return yaml.safe_load(value)
+    except yaml.YAMLError:
+        return value
+
+
+def canonical_with_args(with_args: Iterable[str]) -> Dict[str, Any]:
+    """``key=value`` tokens -> ``{key: parsed value}``; later tokens win, like sacred."""
+    resolved: Dict[str, Any] = {}
+    for token in with_args:
+        if not token or token == "with":
+            continue
+        key, sep, value = token.partition("=")
+        resolved[key.strip()] = _normalise_value(value) if sep else True
+    return dict(sorted(resolved.items()))
+
+
+def submodule_commit(framework: str = "pymarl2") -> str:
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(SUBMODULE_DIRS[framework]), "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return result.stdout.strip()
+
+
+def patch_digests(framework: str = "pymarl2") -> Dict[str, str]:
+    patch_dir = PATCH_DIRS[framework]
+    return {
+        path.name: hashlib.sha256(path.read_bytes()).hexdigest()
+        for path in sorted(patch_dir.glob("*.patch"))
+    }
+
+
+def config_digests(algo: str, env_config: str) -> Dict[str, str]:
+    """Digests of the YAML files ``--config``/``--env-config`` resolve to, so edits invalidate the cache."""
+    candidates = [
+        PYMARL2_CONFIG_DIR / "default.yaml",
+        PYMARL2_CONFIG_DIR / "algs" / f"{algo}.yaml",
+        PYMARL2_CONFIG_DIR / "envs" / f"{env_config}.yaml",
+        ROOT / "configs" / "envs" / f"{env_config}.yaml",
+    ]
+    return {
+        str(path.relative_to(ROOT)): hashlib.sha256(path.read_bytes()).hexdigest()
+        for path in candidates
+        if path.exists()
+    }
+
+
+def resolved_config(algo: str, env_config: str, with_args: Iterable[str], framework: str = "pymarl2") -> Dict[str, Any]:
+    return {
+        "framework": framework,
+        "algo": algo,
+        "env_config": env_config,
+        "with": canonical_with_args(with_args),
+        "config_files": config_digests(algo, env_config),
+        "submodule_commit": submodule_commit(framework),
+        "patches": patch_digests(framework),
+    }
+
+
+def output_dirs(results_path: str | Path) -> List[str]:
+    """Per-run directories under ``results_path`` (``models/<token>``, ``sacred/<id>``, ...)."""
+    root = Path(results_path)
+    found: List[str] = []
+    for sub in OUTPUT_SUBDIRS:
+        if (root / sub).is_dir():
+            found.extend(str(path) for path in (root / sub).iterdir() if path.is_dir())
+    return sorted(found)
+
+
+def fingerprint(config: Dict[str, Any]) -> str:
+    payload = json.dumps(config, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class RunCache:
+    """One JSON record per fingerprint: ``running`` -> ``done`` / ``failed``."""
+
+    def __init__(self, root: str | Path = CACHE_DIR) -> None:
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    @contextmanager
+    def locked(self, key: str) -> Iterator[None]:
+        """Exclusive lock for ``key``; hold it across lookup and :meth:`mark_running`."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with (self.root / f"{key}.lock").open("w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def lookup(self, key: str) -> Dict[str, Any] | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        with path.open("r", encoding="utf-8") as handle:
+            entry = json.load(handle)
+        if entry.get("status") == "running" and not self._still_running(entry):
+            entry["status"] = "interrupted"
+        return entry
+
+    def _still_running(self, entry: Dict[str, Any]) -> bool:
+        if entry.get("host") != socket.gethostname():
+            # Cannot check another machine's pid; trust only a recent heartbeat.
+            beat = entry.get("heartbeat_at") or entry.get("started_at") or 0.0
+            return time.time() - float(beat) < HEARTBEAT_TTL
+        return _pid_alive(int(entry.get("pid", -1)))
+
+    def _write(self, key: str, entry: Dict[str, Any]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self._path(key).with_suffix(".json.tmp")
+        with tmp.open("w", encoding="utf-8") as handle:
+            json.dump(entry, handle, indent=2, default=str)
+        os.replace(tmp, self._path(key))
+
+    def mark_running(self, key: str, config: Dict[str, Any], command: List[str]) -> Dict[str, Any]:
+        previous = self.lookup(key) or {}
+        entry = {
+            "fingerprint": key,
+            "status": "running",
+            "config": config,
+            "command": command,
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "started_at": time.time(),
+            "heartbeat_at": time.time(),
+            "attempts": int(previous.get("attempts", 0)) + 1,
+        }
+        self._write(key, entry)
+        return entry
+
+    @contextmanager
+    def heartbeat(self, key: str, entry: Dict[str, Any], interval: float = HEARTBEAT_INTERVAL) -> Iterator[None]:
+        """Refresh ``entry["heartbeat_at"]`` every ``interval`` seconds while the block runs."""
+        stop = threading.Event()
+
+        def beat() -> None:
+            while not stop.wait(interval):
+                entry["heartbeat_at"] = time.time()
+                self._write(key, entry)
+
+        thread = threading.Thread(target=beat, name="run-cache-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def mark_finished(self, key: str, entry: Dict[str, Any], exit_code: int, outputs: List[str] | None = None) -> None:
+        entry = {**entry, "status": "done" if exit_code == 0 else "failed", "exit_code": exit_code, "finished_at": time.time()}
+        if outputs is not None:
+            entry["outputs"] = outputs
+        self._write(key, entry)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        return [self.lookup(path.stem) for path in sorted(self.root.glob("*.json"))]
+
+
+def describe(entry: Dict[str, Any]) -> str:
+    stamp = entry.get("finished_at") or entry.get("started_at")
+    when = time.strftime("%Y-%m-%d %H:%M", time.localtime(stamp)) if stamp else "?"
+    results = entry.get("config", {}).get("with", {}).get("local_results_path", "")
+    text = f"{entry['status']} ({when}, host={entry.get('host')}, 결과={results}, fingerprint={entry['fingerprint'][:12]})"
+    for output in entry.get("outputs") or []:
+        text += f"\n    -> {output}"
+    return text
@@ -6,32 +6,19 @@ import argparse
 import sys
 import os
 from pathlib import Path
-from typing import List
-
-import subprocess
+from typing import Any, Dict, List
 
 
 ROOT = Path(__file__).resolve().parents[1]
-PATCH_SCRIPT = ROOT / "scripts" / "apply_marllib_patches.sh"
-
-def ensure_patches() -> None:
-    if PATCH_SCRIPT.exists() and PATCH_SCRIPT.is_file():
-        # Run and capture output to prevent it from cluttering the main output
-        subprocess.run([str(PATCH_SCRIPT)], check=True, capture_output=True, text=True)
-
-# Ensure patches are applied before any marllib code is imported
-ensure_patches()
 
-# external/marllib 디렉터리를 경로에 추가하여, 그 안의 'marllib' 패키지를 찾도록 합니다.
-sys.path.insert(0, str(ROOT / "external" / "marllib"))
-sys.path.insert(0, str(ROOT))
-
-from marllib.marl import api as marl
+# Only light modules at import time: marllib pulls in Ray, RLlib and torch, so
+# it is imported by import_marllib() after arguments, maps, W&B config and
+# checkpoints have been checked.
+from cpu_affinity import add_cpu_arguments, apply_cpu_budget  # noqa: E402
+from patch_manager import ensure_patches  # noqa: E402
+from resume import add_resume_argument, export_wandb_resume, latest_marllib_checkpoint, resume_root  # noqa: E402
+from run_cache import fingerprint, patch_digests, submodule_commit  # noqa: E402
 from wandb_utils import apply_wandb_env, load_wandb_config  # noqa: E402
-try:
-    from ray.tune.integration.wandb import WandbLoggerCallback
-except ImportError:  # pragma: no cover
-    WandbLoggerCallback = None
 
 DEFAULT_LOCAL_DIR = ROOT / "results" / "marllib"
 DEFAULT_TIMESTEPS = 2_000_000
@@ -49,6 +36,13 @@ MPE_MAPS = {
     "simple_speaker_listener",
 }
 
+# marllib.marl.algos builders, checked before the heavy import.
+MARLLIB_ALGOS = {
+    "iql", "ia2c", "iddpg", "ippo", "itrpo",
+    "maa2c", "maddpg", "mappo", "matrpo", "coma", "happo", "hatrpo",
+    "vdn", "qmix", "facmac", "vda2c", "vdppo",
+}
+
 OVERCooked_MAPS = {
     "cramped_room",
     "asymmetric_advantages",
@@ -91,6 +85,11 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--num-workers", type=int, default=4, help="Number of rollout workers")
     parser.add_argument("--num-gpus", type=int, default=0, help="GPUs for training")
     parser.add_argument("--local-mode", action="store_true", help="Run Ray in local debug mode")
+    parser.add_argument(
+        "--ray-address",
+        default=os.environ.get("RAY_ADDRESS"),
+        help="Connect to a running Ray head (host:port) instead of starting one (default: $RAY_ADDRESS)",
+    )
     parser.add_argument("--local-dir", default=str(DEFAULT_LOCAL_DIR), help="Ray results directory")
     parser.add_argument("--checkpoint-freq", type=int, default=DEFAULT_CHECKPOINT_FREQ, help="Checkpoint frequency (training iterations)")
     parser.add_argument("--core-arch", default="mlp", help="Model core architecture (mlp or rnn)")
@@ -98,6 +97,8 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--force-coop", action="store_true", help="Force global reward for PettingZoo envs")
     parser.add_argument("--seed", type=int, default=0, help="Random seed for the run (0이면 기본값 사용)")
     parser.add_argument("--wandb-config", default=None, help="configs/wandb/ 아래 설정 파일 이름")
+    add_cpu_arguments(parser)
+    add_resume_argument(parser)
     return parser.parse_args()
 
 
@@ -108,7 +109,33 @@ def validate_map(args: argparse.Namespace) -> None:
         raise SystemExit(f"지원하지 않는 Overcooked 레이아웃입니다: {args.map}. 사용 가능: {sorted(OVERCooked_MAPS)}")
 
 
-def make_environment(args: argparse.Namespace):
+def validate_algo(args: argparse.Namespace) -> None:
+    if args.algo not in MARLLIB_ALGOS:
+        raise SystemExit(f"알 수 없는 알고리즘입니다: {args.algo}. 사용 가능: {sorted(MARLLIB_ALGOS)}")
+
+
+def import_marllib():
+    """Apply the MARLlib patches and import ``marllib.marl.api`` (Ray, RLlib, torch)."""
+    # Ensure patches are applied before any marllib code is imported
+    ensure_patches("marllib", quiet=True)
+    # external/marllib 디렉터리를 경로에 추가하여, 그 안의 'marllib' 패키지를 찾도록 합니다.
+    for path in (ROOT / "external" / "marllib", ROOT):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+    from marllib.marl import api as marl
+
+    return marl
+
+
+def load_wandb_callback():
+    try:
+        from ray.tune.integration.wandb import WandbLoggerCallback
+    except ImportError:  # pragma: no cover
+        return None
+    return WandbLoggerCallback
+
+
+def make_environment(marl, args: argparse.Namespace):
     force_flag = args.force_coop or args.env == "mpe"
     env = marl.make_env(
         environment_name=args.env,
@@ -124,9 +151,78 @@ def choose_hyperparam_source(env_name: str) -> str:
     return "common"
 
 
+def resolved_marllib_config(args: argparse.Namespace) -> Dict[str, Any]:
+    """Everything that changes what is trained; worker/GPU/path settings are left out."""
+    return {
+        "framework": "marllib",
+        "env": args.env,
+        "map": args.map,
+        "algo": args.algo,
+        "share_policy": args.share_policy,
+        "core_arch": args.core_arch,
+        "encode_layer": args.encode_layer,
+        "force_coop": args.force_coop,
+        "timesteps": args.timesteps,
+        "stop_reward": args.stop_reward,
+        "seed": int(args.seed),
+        "submodule_commit": submodule_commit("marllib"),
+        "patches": patch_digests("marllib"),
+    }
+
+
+def prepare_resume(args: argparse.Namespace) -> tuple[Path, Dict[str, str] | None, str]:
+    """Per-config Ray results directory, ``restore_path`` of its newest checkpoint and the W&B run id."""
+    root = resume_root(args.local_dir, fingerprint(resolved_marllib_config(args)))
+    found = latest_marllib_checkpoint(root)
+    restore_path = None
+    if found is None:
+        print(f"[resume] 체크포인트가 없어 처음부터 학습합니다: {root}")
+    else:
+        trial_dir, checkpoint = found
+        print(f"[resume] 마지막 체크포인트에서 이어서 학습합니다: {checkpoint}")
+        restore_path = {"model_path": str(checkpoint), "params_path": str(trial_dir / "params.json")}
+    return root, restore_path, export_wandb_resume(root)
+
+
+def connect_only_ray_init() -> None:
+    """Make ``ray.init`` drop ``num_cpus``/``num_gpus`` so it can join the shared head.
+
+    The head was started with the machine's resources; per-trial GPUs still
+    come from ``num_gpus`` in the run config.
+    """
+    import ray
+
+    original = ray.init
+    if getattr(original, "_connect_only", False):
+        return
+
+    def init(*args: Any, **kwargs: Any):
+        dropped = [key for key in ("num_cpus", "num_gpus") if kwargs.pop(key, None) is not None]
+        if dropped:
+            print(f"[ray] 공유 head에 접속하므로 ray.init의 {', '.join(dropped)}를 무시합니다.")
+        return original(*args, **kwargs)
+
+    init._connect_only = True
+    ray.init = init
+
+
 def main() -> None:
     args = parse_args()
     validate_map(args)
+    validate_algo(args)
+    if args.ray_address:
+        # marllib's fit calls ray.init() without an address, which honours
+        # RAY_ADDRESS; the shared head owns the CPUs, so local mode is moot.
+        # It also passes num_gpus, which Ray rejects when connecting to a
+        # cluster; see connect_only_ray_init.
+        os.environ["RAY_ADDRESS"] = args.ray_address
+        if args.local_mode:
+            print("[ray] --ray-address가 지정되어 --local-mode를 무시합니다.")
+            args.local_mode = False
+    # Before Ray starts so rollout workers inherit the core set and thread limits.
+    # With a shared head the workers are spawned by its raylet and only the
+    # driver is pinned here.
+    apply_cpu_budget(args.cpu_cores, args.num_threads)
 
     wandb_settings, wandb_overrides = load_wandb_config(args.wandb_config)
     apply_wandb_env(wandb_settings)
@@ -140,7 +236,17 @@ def main() -> None:
     if "local_dir" in wandb_overrides and args.local_dir == str(DEFAULT_LOCAL_DIR):
         args.local_dir = wandb_overrides["local_dir"]
 
-    env = make_environment(args)
+    restore_path = None
+    wandb_run_id = None
+    if args.resume == "auto":
+        local_dir, restore_path, wandb_run_id = prepare_resume(args)
+        args.local_dir = str(local_dir)
+    Path(args.local_dir).mkdir(parents=True, exist_ok=True)
+
+    marl = import_marllib()
+    if args.ray_address:
+        connect_only_ray_init()
+    env = make_environment(marl, args)
     hyper_source = choose_hyperparam_source(args.env)
 
     algo_builder = getattr(marl.algos, args.algo, None)
@@ -162,8 +268,6 @@ def main() -> None:
         "episode_reward_mean": args.stop_reward,
     }
 
-    Path(args.local_dir).mkdir(parents=True, exist_ok=True)
-
     run_kwargs = {
         "share_policy": args.share_policy,
         "num_workers": args.num_workers,
@@ -174,20 +278,25 @@ def main() -> None:
         "checkpoint_end": True,
         "seed": int(args.seed),
     }
+    if restore_path is not None:
+        run_kwargs["restore_path"] = restore_path
 
     tune_callbacks: List = []
+    WandbLoggerCallback = load_wandb_callback() if wandb_settings.project else None
     if wandb_settings.project and WandbLoggerCallback is not None:
         tags = list(wandb_settings.tags or [])
         tags.extend(
             [f"env:{args.env}", f"map:{args.map}", f"algo:{args.algo}"]
         )
         group_name = f"{args.env}:{args.map}"
+        resume_kwargs = {"id": wandb_run_id, "resume": "allow"} if wandb_run_id else {}
         wandb_callback = WandbLoggerCallback(
             project=wandb_settings.project,
             entity=wandb_settings.entity,
             group=group_name,
             tags=tags,
             log_config=True,
+            **resume_kwargs,
         )
         tune_callbacks.append(wandb_callback)
     elif wandb_settings.project and WandbLoggerCallback is None:
@@ -198,6 +307,8 @@ def main() -> None:
     print(f" algo     : {args.algo} (hyper params: {hyper_source})")
     print(f" timesteps: {args.timesteps}")
     print(f" results  : {run_kwargs['local_dir']}")
+    if args.ray_address:
+        print(f" ray      : {args.ray_address} (shared head, {args.num_workers + 1} CPUs/trial)")
     if wandb_settings.project:
         ent = wandb_settings.entity or os.getenv("WANDB_ENTITY", "(unset)")
         mode = wandb_settings.mode or os.getenv("WANDB_MODE", "online")
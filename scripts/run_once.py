@@ -8,12 +8,12 @@ from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 PYMARL2_MAIN = ROOT / "external" / "pymarl2" / "src" / "main.py"
-PATCH_SCRIPT = ROOT / "scripts" / "apply_pymarl2_patches.sh"
+
+from patch_manager import ensure_patches  # noqa: E402
 
 
 def run(algo: str = "qmix", env_config: str = "sc2", with_args: list[str] | None = None) -> None:
-    if PATCH_SCRIPT.exists():
-        subprocess.run([str(PATCH_SCRIPT)], check=True)
+    ensure_patches("pymarl2")
 
     command: list[str] = [
         sys.executable,
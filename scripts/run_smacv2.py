@@ -3,13 +3,11 @@
 from __future__ import annotations
 
 import runpy
-import subprocess
 import sys
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 PYMARL2_SRC = PROJECT_ROOT / "external" / "pymarl2" / "src"
-PATCH_SCRIPT = PROJECT_ROOT / "scripts" / "apply_pymarl2_patches.sh"
 
 # Ensure local packages and PyMARL2 are importable
 for path in (PROJECT_ROOT, PYMARL2_SRC):
@@ -17,13 +15,22 @@ for path in (PROJECT_ROOT, PYMARL2_SRC):
     if path_str not in sys.path:
         sys.path.insert(0, path_str)
 
+from fork_server import delegate_script  # noqa: E402
+from patch_manager import ensure_patches  # noqa: E402
+
+if __name__ == "__main__":
+    # Hand the run to a fork-server child that already imported torch/sacred/smacv2.
+    delegate_script(__file__)
+
 from wrappers.smacv2_env import register_smacv2_env
 
-if PATCH_SCRIPT.exists():
-    subprocess.run([str(PATCH_SCRIPT)], check=True)
+ensure_patches("pymarl2")
 
 register_smacv2_env()
 
+# Plugin MACs/learners/runners (e.g. ``runner=shm_parallel``).
+import plugins.registry  # noqa: E402,F401
+
 MAIN_PATH = PYMARL2_SRC / "main.py"
 
 if __name__ == "__main__":
@@ -4,7 +4,6 @@ from __future__ import annotations
 
 import argparse
 import os
-import subprocess
 import sys
 from pathlib import Path
 from typing import Any, Dict, Iterable, List
@@ -12,9 +11,28 @@ from typing import Any, Dict, Iterable, List
 import yaml
 
 ROOT = Path(__file__).resolve().parents[1]
-PYMARL2_MAIN = ROOT / "external" / "pymarl2" / "src" / "main.py"
-PATCH_SCRIPT = ROOT / "scripts" / "apply_pymarl2_patches.sh"
-
+# run_smacv2.py registers sc2v2 and plugins.registry (buffer=, mac=packed_mac,
+# runner=shm_parallel, ...) before it runs PyMARL2's main.py.
+PYMARL2_LAUNCHER = ROOT / "scripts" / "run_smacv2.py"
+
+from cpu_affinity import add_cpu_arguments, apply_cpu_budget  # noqa: E402
+from fork_server import exec_or_call, run_command  # noqa: E402
+from patch_manager import ensure_patches  # noqa: E402
+from resume import (  # noqa: E402
+    add_resume_argument,
+    export_wandb_resume,
+    latest_pymarl2_checkpoint,
+    resume_root,
+    retire,
+)
+from run_cache import (  # noqa: E402
+    ALREADY_RUNNING_EXIT,
+    RunCache,
+    describe,
+    fingerprint,
+    output_dirs,
+    resolved_config,
+)
 from wandb_utils import apply_wandb_env, format_overrides, load_wandb_config  # noqa: E402
 
 
@@ -40,11 +58,6 @@ def login_to_wandb_if_possible() -> None:
         print(f"[wandb] 자동 로그인에 실패했습니다: {exc}", file=sys.stderr)
 
 
-def ensure_patches() -> None:
-    if PATCH_SCRIPT.exists():
-        subprocess.run([str(PATCH_SCRIPT)], check=True)
-
-
 def resolve_exp_config_path(name: str) -> Path:
     candidate = Path(name)
     if candidate.is_file():
@@ -104,7 +117,7 @@ def build_pymarl2_command(
 ) -> List[str]:
     cmd_parts = [
         sys.executable,
-        str(PYMARL2_MAIN),
+        str(PYMARL2_LAUNCHER),
         f"--config={args.config}",
         f"--env-config={args.env_config}",
     ]
@@ -129,12 +142,18 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--env-config", required=False, help="PyMARL2 환경 설정 이름")
     parser.add_argument("--wandb-config", default=None, help="configs/wandb/ 아래 설정 파일 이름")
     parser.add_argument("--exp-config", help="configs/exp/ 아래 실험 설정 YAML 이름 또는 경로")
-    parser.add_argument("extra_args", nargs="*", help="PyMARL2 main.py에 전달할 추가 인자 (key=value)")
+    add_cpu_arguments(parser)
+    parser.add_argument("--force", action="store_true", help="실행 캐시에 완료 기록이 있어도 다시 실행")
+    parser.add_argument("--no-run-cache", action="store_true", help="실행 캐시(results/run_cache/)를 사용하지 않음")
+    add_resume_argument(parser)
+    parser.add_argument("extra_args", nargs="*", help="PyMARL2 main.py(run_smacv2.py 경유)에 전달할 추가 인자 (key=value)")
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
+    # Affinity and OMP/MKL limits are inherited by the launcher (exec) and its SC2 children.
+    apply_cpu_budget(args.cpu_cores, args.num_threads)
     exp_cfg = load_exp_config(args.exp_config)
 
     algo_from_cfg = exp_cfg.get("algo") or exp_cfg.get("config")
@@ -163,7 +182,7 @@ def main() -> None:
         exp_with_args.extend(token for token in exp_cfg["with_args"] if isinstance(token, str))
     args.exp_with_args = exp_with_args
 
-    ensure_patches()
+    ensure_patches("pymarl2")
 
     wandb_settings, wandb_overrides = load_wandb_config(args.wandb_config)
     apply_wandb_env(wandb_settings)
@@ -180,6 +199,17 @@ def main() -> None:
         "t_max",
         "batch_size_run",
         "buffer_cpu_only",
+        "buffer",
+        "per_alpha",
+        "per_beta",
+        "per_priority",
+        "compact_obs_dtype",
+        "memmap_dir",
+        "memmap_prefetch",
+        "memmap_resume",
+        "packed_max_steps",
+        "packed_bucket_factor",
+        "packed_inner_mac",
         "use_cuda",
         "local_results_path",
     }
@@ -194,6 +224,9 @@ def main() -> None:
     )
 
     command = build_pymarl2_command(args, combined_with_args)
+    if args.resume == "auto":
+        # Appended after the config's own keys: sacred keeps the last value.
+        command.extend(resume_with_args(args, combined_with_args))
 
     if wandb_settings.project:
         ent = wandb_settings.entity or os.getenv("WANDB_ENTITY", "(unset)")
@@ -201,7 +234,99 @@ def main() -> None:
         print(f"W&B 설정  : {ent}/{wandb_settings.project} (mode={mode})")
 
     print("실행할 명령어:\n", " ".join(command), "\n")
-    os.execvp(command[0], command)
+    if args.no_run_cache:
+        exec_or_call(command)
+    sys.exit(run_cached(args, combined_with_args, command))
+
+
+def resume_with_args(args: argparse.Namespace, with_args: List[str]) -> List[str]:
+    """Point checkpoints at a per-config directory and continue from the newest one."""
+    config = resolved_config(args.config, args.env_config, with_args)
+    if "seed" not in config["with"]:
+        print("[resume] seed가 지정되지 않아 --resume auto를 사용하지 않습니다.")
+        return []
+    base = config["with"].get("local_results_path") or "results/pymarl2"
+    root = resume_root(base, fingerprint(config))
+    if args.force:
+        retire(root)
+    resume_args = [f'local_results_path="{root}"']
+    if config["with"].get("save_model") is not True:
+        print("[resume] 체크포인트를 남기도록 save_model=True로 설정합니다.")
+        resume_args.append("save_model=True")
+
+    memmap = config["with"].get("buffer") == "memmap"
+    if memmap:
+        # One buffer directory per config, so only this run's own episodes are reused.
+        memmap_base = config["with"].get("memmap_dir")
+        memmap_dir = Path(memmap_base) / root.name if memmap_base else root / "replay_buffer"
+        # --force starts over: the old files are moved aside instead of reused.
+        resume_args.extend([f'memmap_dir="{memmap_dir}"', f"memmap_resume={not args.force}"])
+
+    checkpoint = latest_pymarl2_checkpoint(root)
+    if checkpoint is None:
+        print(f"[resume] 체크포인트가 없어 처음부터 학습합니다: {root}")
+    else:
+        checkpoint_path, step = checkpoint
+        print(f"[resume] t_env={step}부터 이어서 학습합니다: {checkpoint_path}")
+        if memmap:
+            print(f"[resume] memmap replay buffer를 이어서 사용합니다: {memmap_dir}")
+        else:
+            print(
+                "[resume] 경고: replay buffer는 체크포인트에 포함되지 않아 비어 있는 상태로 시작합니다 "
+                "(buffer=memmap이면 이어서 사용).",
+                file=sys.stderr,
+            )
+        resume_args.extend([f'checkpoint_path="{checkpoint_path}"', f"load_step={step}"])
+    run_id = export_wandb_resume(root)
+    print(f"[resume] W&B run id: {run_id}")
+    return resume_args
+
+
+def run_cached(args: argparse.Namespace, with_args: List[str], command: List[str]) -> int:
+    """Skip runs whose resolved config already completed; record the outcome otherwise."""
+    config = resolved_config(args.config, args.env_config, with_args)
+    if "seed" not in config["with"]:
+        print("[run-cache] seed가 지정되지 않아 캐시를 사용하지 않습니다.")
+        return run_command(command)
+
+    key = fingerprint(config)
+    cache = RunCache()
+    with cache.locked(key):
+        entry = cache.lookup(key)
+        if entry is not None and not args.force:
+            if entry["status"] == "done":
+                print(f"[run-cache] 동일한 설정이 이미 완료되어 건너뜁니다: {describe(entry)}")
+                print("[run-cache] 다시 실행하려면 --force를 사용하세요.")
+                return 0
+            if entry["status"] == "running":
+                if args.resume != "auto":
+                    print(f"[run-cache] 동일한 설정이 실행 중입니다: {describe(entry)}")
+                    print(f"[run-cache] 실행하지 않고 exit {ALREADY_RUNNING_EXIT}로 종료합니다 (--resume auto면 이어서 실행).")
+                    return ALREADY_RUNNING_EXIT
+                print(f"[run-cache] 실행 중 기록이 있지만 --resume auto이므로 체크포인트에서 이어서 실행합니다: {describe(entry)}")
+            else:
+                print(f"[run-cache] 이전 실행이 끝나지 않았습니다: {describe(entry)} — 다시 실행합니다.")
+        entry = cache.mark_running(key, config, command)
+
+    results_path = command_results_path(command)
+    before = set(output_dirs(results_path))
+    exit_code = 130
+    try:
+        with cache.heartbeat(key, entry):
+            exit_code = run_command(command)
+    finally:
+        # Directories that appeared during the run; another run sharing the path may add some too.
+        outputs = sorted(set(output_dirs(results_path)) - before)
+        cache.mark_finished(key, entry, exit_code, outputs)
+    if outputs:
+        print("[run-cache] 결과: " + ", ".join(outputs))
+    return exit_code
+
+
+def command_results_path(command: List[str]) -> str:
+    """The last ``local_results_path=`` in ``command`` (sacred keeps the last value)."""
+    values = [token.partition("=")[2].strip("\"'") for token in command if token.startswith("local_results_path=")]
+    return values[-1] if values else "results/pymarl2"
 
 
 if __name__ == "__main__":
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""Resource-aware multi-seed job scheduler.
+
+Each job declares the CPU cores, memory (GiB) and environment processes
+(e.g. SC2 instances) it needs.  A job starts as soon as enough of every
+resource is free, regardless of its position in the queue, so one slow seed
+no longer keeps finished slots idle.  Exit codes are tracked per job.
+
+A job with an explicit core count (``--job-cores`` / ``cores:``) also gets a
+disjoint set of core ids unless ``--no-pin-cores`` is given: the child is
+pinned with ``sched_setaffinity`` and receives ``MARL_LAB_CPU_CORES`` /
+``MARL_LAB_NUM_THREADS`` so the launchers cap torch/OMP/MKL threads to its
+share (see ``cpu_affinity.py``).  Jobs without one are counted as an even
+share of the cores per worker (``cores // workers``) and are not pinned, so
+a trainer, its env workers and SC2 never end up squeezed onto one core.
+
+사용법:
+  # 시드 1000~1004, 작업당 2코어/8GiB/SC2 1개, 동시 실행 수는 자원으로만 제한
+  python scripts/seed_scheduler.py --seeds 1000-1004 --job-cores 2 --job-mem-gb 8 --job-env-procs 1 -- \\
+      python scripts/run_with_wandb.py --config=qmix --env-config=sc2v2 with seed={seed}
+
+  # pymarl2/marllib 혼합 작업 파일 (YAML/JSON)
+  python scripts/seed_scheduler.py --jobs jobs.yaml --cores 64 --mem-gb 240 --env-procs 48
+
+작업 파일 형식::
+
+    resources: {cores: 64, mem_gb: 240, env_procs: 48}   # 선택, CLI 값이 우선
+    jobs:
+      - name: qmix-protoss
+        command: python scripts/run_with_wandb.py --config=qmix --env-config=sc2v2 with seed={seed}
+        seeds: 1000-1004          # 또는 [1000, 1001]
+        cores: 2
+        mem_gb: 8
+        env_procs: 1
+      - name: mappo-mpe
+        command: [python, scripts/run_marllib.py, --algo=mappo, --env=mpe, --map=simple_tag, "--seed={seed}"]
+        seeds: [1, 2]
+        cores: 9
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shlex
+import signal
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+import yaml
+
+from cpu_affinity import CORES_ENV, available_core_ids, budget_env, format_core_list
+
+ROOT = Path(__file__).resolve().parents[1]
+SEED_PLACEHOLDER = "{seed}"
+REAP_INTERVAL = 0.5  # seconds between polls of the running jobs
+
+
+@dataclass
+class Job:
+    name: str
+    command: List[str]
+    # ``None``: not given; run_jobs counts an even share and does not pin.
+    cores: int | None = None
+    mem_gb: float = 0.0
+    env_procs: int = 0
+    seed: int | None = None
+    env: Dict[str, str] = field(default_factory=dict)
+    pin: bool = True
+    assigned_cores: List[int] = field(default_factory=list)
+
+
+@dataclass
+class Resources:
+    cores: int
+    mem_gb: float
+    env_procs: int | None = None
+    # Free core ids when pinning; ``None`` only counts cores.
+    core_ids: List[int] | None = None
+
+    def fits(self, job: Job) -> bool:
+        if job.cores > self.cores or job.mem_gb > self.mem_gb + 1e-9:
+            return False
+        return self.env_procs is None or job.env_procs <= self.env_procs
+
+    def take(self, job: Job) -> None:
+        self.cores -= job.cores
+        self.mem_gb -= job.mem_gb
+        if self.env_procs is not None:
+            self.env_procs -= job.env_procs
+        if self.core_ids is not None and job.pin:
+            job.assigned_cores, self.core_ids = self.core_ids[: job.cores], self.core_ids[job.cores :]
+
+    def give_back(self, job: Job) -> None:
+        self.cores += job.cores
+        self.mem_gb += job.mem_gb
+        if self.env_procs is not None:
+            self.env_procs += job.env_procs
+        if self.core_ids is not None and job.assigned_cores:
+            self.core_ids = sorted(self.core_ids + job.assigned_cores)
+            job.assigned_cores = []
+
+
+def available_cores() -> int:
+    return len(available_core_ids())
+
+
+def default_job_cores(workers: int | None, cores: int | None = None) -> int:
+    """Cores counted per job without an explicit core count: an even share per worker."""
+    total = cores or available_cores()
+    return max(total // workers, 1) if workers and workers > 0 else 1
+
+
+def total_memory_gb() -> float:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024**3
+    except (ValueError, OSError, AttributeError):  # pragma: no cover - non-POSIX
+        return float("inf")
+
+
+def parse_seeds(spec: Any) -> List[int]:
+    """``1000-1004``, ``1,2,5``, ``[1, 2]`` or a single int."""
+    if isinstance(spec, int):
+        return [spec]
+    if isinstance(spec, (list, tuple)):
+        return [int(seed) for seed in spec]
+    seeds: List[int] = []
+    for part in str(spec).split(","):
+        part = part.strip()
+        if "-" in part[1:]:
+            lo, hi = part.rsplit("-", 1)
+            seeds.extend(range(int(lo), int(hi) + 1))
+        elif part:
+            seeds.append(int(part))
+    return seeds
+
+
+def expand_command(command: Sequence[str] | str, seed: int | None) -> List[str]:
+    tokens = shlex.split(command) if isinstance(command, str) else [str(token) for token in command]
+    if seed is None:
+        return tokens
+    return [token.replace(SEED_PLACEHOLDER, str(seed)) for token in tokens]
+
+
+def expand_jobs(entries: Sequence[Dict[str, Any]]) -> List[Job]:
+    """One :class:`Job` per (entry, seed); entries without ``seeds`` run once."""
+    jobs: List[Job] = []
+    for idx, entry in enumerate(entries):
+        if "command" not in entry:
+            raise ValueError(f"jobs[{idx}]에 command가 없습니다.")
+        base = entry.get("name") or f"job{idx}"
+        seeds: List[int | None] = parse_seeds(entry["seeds"]) if "seeds" in entry else [None]
+        for seed in seeds:
+            jobs.append(
+                Job(
+                    name=base if seed is None else f"{base}/seed={seed}",
+                    command=expand_command(entry["command"], seed),
+                    cores=int(entry["cores"]) if entry.get("cores") is not None else None,
+                    mem_gb=float(entry.get("mem_gb", 0.0)),
+                    env_procs=int(entry.get("env_procs", 0)),
+                    seed=seed,
+                    env={str(k): str(v) for k, v in (entry.get("env") or {}).items()},
+                )
+            )
+    return jobs
+
+
+def load_jobs_file(path: str | Path) -> tuple[List[Job], Dict[str, Any]]:
+    with Path(path).open("r", encoding="utf-8") as handle:
+        spec = yaml.safe_load(handle) or {}
+    if isinstance(spec, list):
+        spec = {"jobs": spec}
+    return expand_jobs(spec.get("jobs", [])), spec.get("resources", {}) or {}
+
+
+class Scheduler:
+    """Start queued jobs whenever their resources are free; poll the jobs it started."""
+
+    def __init__(
+        self,
+        jobs: Sequence[Job],
+        resources: Resources,
+        max_jobs: int | None = None,
+        log_dir: str | Path | None = None,
+        on_start: Callable[[Job], None] | None = None,
+        on_finish: Callable[[Job, int], None] | None = None,
+    ) -> None:
+        self.queue = list(jobs)
+        self.on_start = on_start
+        self.on_finish = on_finish
+        self.free = resources
+        self.max_jobs = max_jobs if max_jobs and max_jobs > 0 else None
+        self.log_dir = Path(log_dir) if log_dir else None
+        self.running: Dict[int, tuple[Job, subprocess.Popen]] = {}
+        self.exit_codes: Dict[str, int] = {}
+
+        for job in self.queue:
+            if not resources.fits(job):
+                # Larger than the whole machine: run it alone instead of never starting it.
+                print(
+                    f"[{job.name}] 요청 자원(cores={job.cores}, mem_gb={job.mem_gb}, env_procs={job.env_procs})이 "
+                    f"전체 자원(cores={resources.cores}, mem_gb={resources.mem_gb:.1f}, "
+                    f"env_procs={resources.env_procs})보다 커서 전체 자원으로 줄입니다.",
+                    file=sys.stderr,
+                )
+                job.cores = min(job.cores, resources.cores)
+                job.mem_gb = min(job.mem_gb, resources.mem_gb)
+                if resources.env_procs is not None:
+                    job.env_procs = min(job.env_procs, resources.env_procs)
+
+    def run(self) -> Dict[str, int]:
+        previous = signal.signal(signal.SIGTERM, self._on_sigterm)
+        try:
+            while self.queue or self.running:
+                self._start_ready()
+                if self.running:
+                    self._reap_one()
+        except KeyboardInterrupt:
+            self._terminate_all()
+            raise
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+        return self.exit_codes
+
+    def _start_ready(self) -> None:
+        for job in list(self.queue):
+            if self.max_jobs is not None and len(self.running) >= self.max_jobs:
+                return
+            if not self.free.fits(job):
+                continue
+            self.queue.remove(job)
+            self.free.take(job)
+            proc = self._launch(job)
+            self.running[proc.pid] = (job, proc)
+            if self.on_start is not None:
+                self.on_start(job)
+
+    def _launch(self, job: Job) -> subprocess.Popen:
+        env = dict(os.environ)
+        preexec_fn = None
+        if job.assigned_cores and CORES_ENV not in job.env:
+            cores = list(job.assigned_cores)
+            env.update(budget_env(cores))
+            preexec_fn = lambda: os.sched_setaffinity(0, cores)  # noqa: E731
+            print(f"[{job.name}] cores={format_core_list(cores)}", flush=True)
+        env.update(job.env)
+        print(f"[{job.name}] {' '.join(job.command)}", flush=True)
+        stdout = None
+        if self.log_dir is not None:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            stdout = (self.log_dir / f"{job.name.replace('/', '_')}.log").open("ab")
+        try:
+            return subprocess.Popen(
+                job.command,
+                cwd=ROOT,
+                env=env,
+                stdout=stdout,
+                stderr=subprocess.STDOUT if stdout else None,
+                preexec_fn=preexec_fn,
+            )
+        finally:
+            if stdout is not None:
+                stdout.close()
+
+    def _reap_one(self) -> None:
+        """Wait until at least one of this scheduler's own jobs exits (other children are left alone)."""
+        while True:
+            finished = [pid for pid, (_, proc) in self.running.items() if proc.poll() is not None]
+            if finished:
+                break
+            time.sleep(REAP_INTERVAL)
+        for pid in finished:
+            job, proc = self.running.pop(pid)
+            code = proc.returncode
+            self.free.give_back(job)
+            self.exit_codes[job.name] = code
+            if self.on_finish is not None:
+                self.on_finish(job, code)
+            state = "완료" if code == 0 else f"실패 (exit {code})"
+            print(f"[{job.name}] {state} — 남은 작업 {len(self.queue)}, 실행 중 {len(self.running)}", flush=True)
+
+    def _terminate_all(self) -> None:
+        for job, proc in self.running.values():
+            proc.terminate()
+        deadline = time.monotonic() + 10
+        for job, proc in self.running.values():
+            try:
+                proc.wait(timeout=max(deadline - time.monotonic(), 0.1))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+            self.exit_codes[job.name] = proc.returncode if proc.returncode is not None else -signal.SIGKILL
+        self.running.clear()
+
+    def _on_sigterm(self, signum, frame) -> None:
+        raise KeyboardInterrupt
+
+
+def run_jobs(
+    jobs: Sequence[Job],
+    cores: int | None = None,
+    mem_gb: float | None = None,
+    env_procs: int | None = None,
+    max_jobs: int | None = None,
+    log_dir: str | Path | None = None,
+    pin_cores: bool = True,
+    **callbacks: Any,
+) -> Dict[str, int]:
+    """Run ``jobs`` on this machine and return ``{job name: exit code}``.
+
+    Only jobs with an explicit ``cores`` are pinned (when ``pin_cores``);
+    the others count ``default_job_cores(max_jobs, cores)``.
+    ``callbacks`` (``on_start``, ``on_finish``) are forwarded to :class:`Scheduler`.
+    """
+    core_ids = available_core_ids()
+    cores = cores if cores else len(core_ids)
+    for job in jobs:
+        if job.cores is None:
+            job.cores = default_job_cores(max_jobs, cores)
+            job.pin = False
+    resources = Resources(
+        cores=cores,
+        mem_gb=mem_gb if mem_gb else total_memory_gb(),
+        env_procs=env_procs,
+        # Pinning needs real ids; an oversubscribed --cores only counts.
+        core_ids=core_ids[:cores] if pin_cores and cores <= len(core_ids) else None,
+    )
+    return Scheduler(jobs, resources, max_jobs=max_jobs, log_dir=log_dir, **callbacks).run()
+
+
+def summarize(exit_codes: Dict[str, int]) -> bool:
+    failed = {name: code for name, code in exit_codes.items() if code != 0}
+    print("=== 작업 결과 ===")
+    for name, code in exit_codes.items():
+        print(f"  {name:<40} {'OK' if code == 0 else f'exit {code}'}")
+    if failed:
+        print(f"{len(failed)}/{len(exit_codes)}개 작업이 실패했습니다.", file=sys.stderr)
+    return not failed
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="자원 기반 멀티 시드 스케줄러")
+    parser.add_argument("--jobs", help="작업 목록 YAML/JSON 파일")
+    parser.add_argument("--seeds", help="명령 템플릿용 시드 (예: 1000-1004 또는 1,2,3)")
+    parser.add_argument("--name", default="run", help="명령 템플릿 작업 이름")
+    parser.add_argument(
+        "--job-cores", type=int, default=None, help="명령 템플릿: 작업당 CPU 코어 (지정 시 코어 고정, 기본: 총 코어 // workers, 고정 안 함)"
+    )
+    parser.add_argument("--job-mem-gb", type=float, default=0.0, help="명령 템플릿: 작업당 메모리(GiB)")
+    parser.add_argument("--job-env-procs", type=int, default=0, help="명령 템플릿: 작업당 env 프로세스(SC2 등)")
+    parser.add_argument("--cores", type=int, default=None, help="사용할 총 코어 수 (기본: 현재 affinity)")
+    parser.add_argument("--mem-gb", type=float, default=None, help="사용할 총 메모리 (기본: 물리 메모리)")
+    parser.add_argument("--env-procs", type=int, default=None, help="동시에 띄울 env 프로세스 상한 (기본: 무제한)")
+    parser.add_argument("--no-pin-cores", action="store_true", help="작업별 CPU 코어 고정(affinity)과 스레드 제한을 끄기")
+    parser.add_argument("--workers", type=int, default=0, help="동시 작업 수 상한 (0: 자원으로만 제한)")
+    parser.add_argument("--log-dir", default=None, help="작업별 로그 파일 디렉터리 (기본: 터미널 출력)")
+    parser.add_argument("--summary", default=None, help="작업별 exit code를 JSON으로 저장할 경로")
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="-- 뒤의 명령 템플릿 ({seed} 치환)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+
+    jobs: List[Job] = []
+    file_resources: Dict[str, Any] = {}
+    if args.jobs:
+        jobs, file_resources = load_jobs_file(args.jobs)
+    if command:
+        entry: Dict[str, Any] = {
+            "name": args.name,
+            "command": command,
+            "cores": args.job_cores,
+            "mem_gb": args.job_mem_gb,
+            "env_procs": args.job_env_procs,
+        }
+        if args.seeds:
+            entry["seeds"] = args.seeds
+        jobs.extend(expand_jobs([entry]))
+    if not jobs:
+        print("실행할 작업이 없습니다. --jobs 또는 -- <명령>을 지정하세요.", file=sys.stderr)
+        return 2
+
+    env_procs = args.env_procs if args.env_procs is not None else file_resources.get("env_procs")
+    try:
+        exit_codes = run_jobs(
+            jobs,
+            cores=args.cores or file_resources.get("cores"),
+            mem_gb=args.mem_gb or file_resources.get("mem_gb"),
+            env_procs=env_procs,
+            max_jobs=args.workers,
+            log_dir=args.log_dir,
+            pin_cores=not args.no_pin_cores,
+        )
+    except KeyboardInterrupt:
+        print("중단되었습니다. 실행 중인 작업을 종료했습니다.", file=sys.stderr)
+        return 130
+
+    if args.summary:
+        Path(args.summary).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.summary, "w", encoding="utf-8") as handle:
+            json.dump(exit_codes, handle, indent=2)
+    return 0 if summarize(exit_codes) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Run a command against one shared local Ray head.
+
+Every ``run_marllib.py`` seed normally starts its own Ray runtime in
+``algo.fit`` (raylet, object store, worker pool).  This wrapper starts a
+single head node (``ray start --head --block``) on a free port, exports
+``RAY_ADDRESS`` and runs the given command — typically ``seed_scheduler.py``
+launching the seeds.  Each seed then connects as its own driver and its Tune
+trial requests ``num_workers + 1`` CPUs from the shared head, so seeds share
+one object store and Ray queues trials that do not fit instead of
+oversubscribing.  The head is stopped when the command exits.
+
+사용법:
+  python scripts/shared_ray.py --num-cpus 32 -- \\
+      python scripts/seed_scheduler.py --seeds 1-4 --no-pin-cores -- \\
+      python scripts/run_marllib.py --env mpe --map simple_tag --algo mappo --seed {seed}
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Sequence, Tuple
+
+from cpu_affinity import available_core_ids
+
+HEAD_START_TIMEOUT_S = 120.0
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _port_open(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(0.5)
+        return sock.connect_ex(("127.0.0.1", port)) == 0
+
+
+def start_head(
+    num_cpus: int,
+    num_gpus: int | None = None,
+    object_store_gb: float | None = None,
+) -> Tuple[subprocess.Popen, str, str]:
+    """Start a blocking Ray head in its own session; returns ``(process, address, temp_dir)``."""
+    if shutil.which("ray") is None:
+        raise SystemExit("ray CLI를 찾을 수 없습니다. MARLlib 환경(ray 설치)을 활성화하세요.")
+    port = _free_port()
+    # Short path: Ray's UNIX sockets live under the temp dir.
+    temp_dir = tempfile.mkdtemp(prefix="ray_", dir="/tmp")
+    command: List[str] = [
+        "ray", "start", "--head", "--block",
+        f"--port={port}",
+        f"--num-cpus={num_cpus}",
+        f"--temp-dir={temp_dir}",
+        "--include-dashboard=false",
+    ]
+    if num_gpus is not None:
+        command.append(f"--num-gpus={num_gpus}")
+    if object_store_gb:
+        command.append(f"--object-store-memory={int(object_store_gb * 1024**3)}")
+    print(f"[shared-ray] {' '.join(command)}", flush=True)
+    proc = subprocess.Popen(command, start_new_session=True)
+    deadline = time.monotonic() + HEAD_START_TIMEOUT_S
+    while not _port_open(port):
+        if proc.poll() is not None:
+            raise SystemExit(f"Ray head가 시작되지 않았습니다 (exit {proc.returncode}).")
+        if time.monotonic() > deadline:
+            stop_head(proc, temp_dir)
+            raise SystemExit(f"Ray head가 {HEAD_START_TIMEOUT_S:.0f}초 안에 준비되지 않았습니다.")
+        time.sleep(0.5)
+    address = f"127.0.0.1:{port}"
+    print(f"[shared-ray] head ready: RAY_ADDRESS={address} (cpus={num_cpus}, gpus={'auto' if num_gpus is None else num_gpus})", flush=True)
+    return proc, address, temp_dir
+
+
+def stop_head(proc: subprocess.Popen, temp_dir: str | None = None) -> None:
+    if proc.poll() is None:
+        try:
+            os.killpg(proc.pid, signal.SIGTERM)
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+            proc.wait()
+        except ProcessLookupError:
+            pass
+    if temp_dir:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    print("[shared-ray] head stopped", flush=True)
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="공유 Ray head 위에서 명령 실행")
+    parser.add_argument("--num-cpus", type=int, default=None, help="head에 등록할 CPU 수 (기본: 현재 affinity 코어 수)")
+    parser.add_argument("--num-gpus", type=int, default=None, help="head에 등록할 GPU 수 (기본: Ray 자동 감지)")
+    parser.add_argument("--object-store-gb", type=float, default=None, help="공유 object store 크기(GiB)")
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="-- 뒤에 실행할 명령")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not command:
+        print("실행할 명령이 없습니다. -- <명령>을 지정하세요.", file=sys.stderr)
+        return 2
+
+    proc, address, temp_dir = start_head(args.num_cpus or len(available_core_ids()), args.num_gpus, args.object_store_gb)
+    env = dict(os.environ, RAY_ADDRESS=address)
+    try:
+        return subprocess.run(command, env=env).returncode
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        stop_head(proc, temp_dir)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
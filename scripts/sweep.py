@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""Parallel, resumable experiment sweeps.
+
+Algorithms × environments (``configs/python/environments.py``) × seeds ×
+hyperparameter grids are expanded into PyMARL2 runs and executed through the
+resource-aware pool of ``seed_scheduler.py``.  Every job is recorded in a
+SQLite ledger (``results/sweeps/<name>.sqlite``) keyed by a hash of its
+definition, so re-running the same command after a crash or Ctrl-C skips the
+jobs that already finished.
+
+사용법:
+  python scripts/sweep.py --name protoss_cmp --envs smac2_protoss --algorithms qmix vdn qplex \\
+      --seeds 5 --grid lr=0.0005,0.001 --workers 4
+  python scripts/sweep.py --name protoss_cmp --status        # 진행 상황만 출력
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import itertools
+import json
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from configs.python.environments import ENVIRONMENTS, EnvironmentConfig  # noqa: E402
+from seed_scheduler import Job, run_jobs, summarize  # noqa: E402
+
+SWEEP_ROOT = ROOT / "results" / "sweeps"
+RUN_SCRIPT = ROOT / "scripts" / "run_with_wandb.py"
+DEFAULT_START_SEED = 1001
+
+
+@dataclass(frozen=True)
+class SweepJob:
+    algorithm: str
+    environment: str
+    seed: int
+    overrides: Dict[str, str] = field(default_factory=dict)
+    extra_args: tuple = ()
+
+    @property
+    def job_id(self) -> str:
+        payload = json.dumps(
+            [self.algorithm, self.environment, self.seed, sorted(self.overrides.items()), list(self.extra_args)]
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def name(self) -> str:
+        name = f"{self.algorithm}/{self.environment}/seed={self.seed}"
+        if self.overrides:
+            name += "/" + ",".join(f"{k}={v}" for k, v in sorted(self.overrides.items()))
+        return name
+
+
+def parse_grid(items: Iterable[str]) -> Dict[str, List[str]]:
+    """``["lr=0.0005,0.001", "batch_size=32"]`` -> ``{"lr": [...], "batch_size": [...]}``."""
+    grid: Dict[str, List[str]] = {}
+    for item in items:
+        key, sep, values = item.partition("=")
+        if not sep or not values:
+            raise SystemExit(f"--grid 형식이 잘못되었습니다: {item} (예: lr=0.0005,0.001)")
+        grid[key.strip()] = [value.strip() for value in values.split(",") if value.strip()]
+    return grid
+
+
+def expand_sweep(
+    algorithms: Sequence[str],
+    environments: Sequence[str],
+    seeds: Sequence[int],
+    grid: Dict[str, List[str]] | None = None,
+    extra_args: Sequence[str] = (),
+) -> List[SweepJob]:
+    unknown = [env for env in environments if env not in ENVIRONMENTS]
+    if unknown:
+        raise SystemExit(f"알 수 없는 환경: {unknown}. 사용 가능: {sorted(ENVIRONMENTS)}")
+    grid = grid or {}
+    keys = sorted(grid)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))] or [{}]
+    return [
+        SweepJob(algorithm, environment, seed, overrides, tuple(extra_args))
+        for environment in environments
+        for algorithm in algorithms
+        for overrides in combos
+        for seed in seeds
+    ]
+
+
+def build_command(job: SweepJob, wandb_config: str | None = None) -> List[str]:
+    env_config: EnvironmentConfig = ENVIRONMENTS[job.environment]
+    cmd = [
+        sys.executable,
+        str(RUN_SCRIPT),
+        f"--config={job.algorithm}",
+        f"--env-config={env_config.env_config}",
+        f"--wandb-config={wandb_config or env_config.wandb_config}",
+        f"env_args.key={env_config.key}" if env_config.env_config == "gymma" else f"env_args.map_name={env_config.key}",
+    ]
+    with_args = env_config.default_args.split() if env_config.default_args else []
+    if env_config.t_max:
+        with_args.append(f"t_max={env_config.t_max}")
+    with_args.extend(f"{key}={value}" for key, value in sorted(job.overrides.items()))
+    with_args.extend(job.extra_args)
+    with_args.append(f"seed={job.seed}")
+    # run_with_wandb.py keeps the last value of repeated keys.
+    return cmd + with_args
+
+
+class SweepLedger:
+    """SQLite record of every job in a sweep and its last outcome."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id      TEXT PRIMARY KEY,
+            name        TEXT NOT NULL,
+            algorithm   TEXT NOT NULL,
+            environment TEXT NOT NULL,
+            seed        INTEGER NOT NULL,
+            overrides   TEXT NOT NULL,
+            command     TEXT NOT NULL,
+            status      TEXT NOT NULL DEFAULT 'pending',
+            exit_code   INTEGER,
+            attempts    INTEGER NOT NULL DEFAULT 0,
+            started_at  REAL,
+            finished_at REAL
+        )
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(self.SCHEMA)
+        self.conn.commit()
+
+    def register(self, jobs: Sequence[SweepJob], commands: Sequence[List[str]]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO jobs (job_id, name, algorithm, environment, seed, overrides, command) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (job.job_id, job.name, job.algorithm, job.environment, job.seed,
+                     json.dumps(job.overrides, sort_keys=True), json.dumps(cmd))
+                    for job, cmd in zip(jobs, commands)
+                ],
+            )
+            # Jobs left 'running' belong to a sweep that was killed.
+            self.conn.execute("UPDATE jobs SET status = 'pending' WHERE status = 'running'")
+
+    def statuses(self) -> Dict[str, str]:
+        return dict(self.conn.execute("SELECT job_id, status FROM jobs"))
+
+    def mark_started(self, job_id: str) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, "
+                "finished_at = NULL, exit_code = NULL WHERE job_id = ?",
+                (time.time(), job_id),
+            )
+
+    def mark_finished(self, job_id: str, exit_code: int) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, exit_code = ?, finished_at = ? WHERE job_id = ?",
+                ("done" if exit_code == 0 else "failed", exit_code, time.time(), job_id),
+            )
+
+    def mark_pending(self, job_ids: Iterable[str]) -> None:
+        with self.conn:
+            self.conn.executemany("UPDATE jobs SET status = 'pending' WHERE job_id = ?", [(i,) for i in job_ids])
+
+    def summary(self) -> Dict[str, int]:
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+
+    def rows(self) -> List[tuple]:
+        return list(self.conn.execute("SELECT name, status, exit_code, attempts FROM jobs ORDER BY name"))
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def ledger_path(name: str) -> Path:
+    return SWEEP_ROOT / f"{name}.sqlite"
+
+
+def run_sweep(
+    name: str,
+    jobs: Sequence[SweepJob],
+    workers: int = 1,
+    job_cores: int | None = None,
+    job_mem_gb: float = 0.0,
+    wandb_config: str | None = None,
+    retry_failed: bool = False,
+    log_dir: str | Path | None = None,
+) -> bool:
+    """Run the jobs not yet finished in the ledger; returns ``True`` if none failed."""
+    ledger = SweepLedger(ledger_path(name))
+    try:
+        commands = [build_command(job, wandb_config) for job in jobs]
+        ledger.register(jobs, commands)
+        statuses = ledger.statuses()
+        skip = {"done", "failed"} if not retry_failed else {"done"}
+        todo = [(job, cmd) for job, cmd in zip(jobs, commands) if statuses.get(job.job_id) not in skip]
+        print(f"[sweep {name}] 전체 {len(jobs)}개 중 {len(jobs) - len(todo)}개 완료/건너뜀, {len(todo)}개 실행")
+        if not todo:
+            return all(statuses.get(job.job_id) == "done" for job in jobs)
+
+        ids_by_name = {job.name: job.job_id for job, _ in todo}
+        scheduler_jobs = [
+            Job(
+                name=job.name,
+                command=cmd,
+                cores=job_cores,
+                mem_gb=job_mem_gb,
+                env_procs=1 if ENVIRONMENTS[job.environment].env_config.startswith("sc2") else 0,
+                seed=job.seed,
+            )
+            for job, cmd in todo
+        ]
+        started: set = set()
+
+        def on_start(job: Job) -> None:
+            started.add(job.name)
+            ledger.mark_started(ids_by_name[job.name])
+
+        def on_finish(job: Job, code: int) -> None:
+            started.discard(job.name)
+            ledger.mark_finished(ids_by_name[job.name], code)
+
+        try:
+            exit_codes = run_jobs(
+                scheduler_jobs,
+                max_jobs=workers,
+                log_dir=log_dir or SWEEP_ROOT / name / "logs",
+                on_start=on_start,
+                on_finish=on_finish,
+            )
+        except KeyboardInterrupt:
+            # Interrupted jobs are rerun on the next invocation.
+            ledger.mark_pending(ids_by_name[job_name] for job_name in started)
+            print(f"[sweep {name}] 중단됨. 같은 명령으로 다시 실행하면 이어서 진행합니다.", file=sys.stderr)
+            raise
+        ok = summarize(exit_codes)
+        print(f"[sweep {name}] ledger: {ledger.path} {ledger.summary()}")
+        return ok
+    finally:
+        ledger.close()
+
+
+def print_status(name: str) -> None:
+    path = ledger_path(name)
+    if not path.exists():
+        raise SystemExit(f"sweep 기록이 없습니다: {path}")
+    ledger = SweepLedger(path)
+    try:
+        for job_name, status, exit_code, attempts in ledger.rows():
+            code = "" if exit_code is None else f"exit {exit_code}"
+            print(f"  {job_name:<60} {status:<8} {code:<8} attempts={attempts}")
+        print(f"요약: {ledger.summary()}")
+    finally:
+        ledger.close()
+
+
+def add_sweep_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--workers", type=int, default=1, help="동시에 실행할 작업 수 (0: 코어/메모리로만 제한)")
+    parser.add_argument(
+        "--job-cores", type=int, default=None, help="작업당 CPU 코어 (지정 시 코어 고정, 기본: 총 코어 // workers, 고정 안 함)"
+    )
+    parser.add_argument("--job-mem-gb", type=float, default=0.0, help="작업당 메모리(GiB)")
+    parser.add_argument("--grid", action="append", default=[], help="하이퍼파라미터 그리드 (예: lr=0.0005,0.001), 반복 가능")
+    parser.add_argument("--retry-failed", action="store_true", help="이전에 실패한 작업도 다시 실행")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="병렬·재개 가능한 실험 스윕")
+    parser.add_argument("--name", required=True, help="스윕 이름 (results/sweeps/<name>.sqlite)")
+    parser.add_argument("--envs", nargs="+", help="configs/python/environments.py의 환경 이름")
+    parser.add_argument("--algorithms", nargs="+", help="알고리즘 이름들")
+    parser.add_argument("--seeds", type=int, default=3, help="조합당 시드 개수")
+    parser.add_argument("--start-seed", type=int, default=DEFAULT_START_SEED)
+    parser.add_argument("--wandb-config", default=None, help="W&B 프리셋 (기본: 환경별 설정)")
+    parser.add_argument("--status", action="store_true", help="ledger 상태만 출력")
+    parser.add_argument("extra_args", nargs="*", help="모든 작업에 붙일 추가 with 인자 (key=value)")
+    add_sweep_arguments(parser)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.status:
+        print_status(args.name)
+        return
+    if not args.envs or not args.algorithms:
+        raise SystemExit("--envs와 --algorithms가 필요합니다.")
+    jobs = expand_sweep(
+        args.algorithms,
+        args.envs,
+        range(args.start_seed, args.start_seed + args.seeds),
+        parse_grid(args.grid),
+        args.extra_args,
+    )
+    try:
+        ok = run_sweep(
+            args.name,
+            jobs,
+            workers=args.workers,
+            job_cores=args.job_cores,
+            job_mem_gb=args.job_mem_gb,
+            wandb_config=args.wandb_config,
+            retry_failed=args.retry_failed,
+        )
+    except KeyboardInterrupt:
+        sys.exit(130)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -48,7 +48,9 @@ def validate_algorithm_environment(algorithm: str, environment: str, individual_
 
 def run_experiment(algorithm: str, environment: str, wandb_config: str = None, 
                   individual_rewards: bool = False, seeds: int = 1, 
-                  additional_args: str = "", quick_mode: bool = False) -> bool:
+                  additional_args: str = "", quick_mode: bool = False,
+                  start_seed: int = 1000, workers: int = 1,
+                  job_cores: int = None, job_mem_gb: float = 0.0) -> bool:
     """실험을 실행합니다."""
     
     # 호환성 검증
@@ -82,48 +84,38 @@ def run_experiment(algorithm: str, environment: str, wandb_config: str = None,
     print("=" * 50)
     
     script_dir = Path(__file__).parent
+    run_script = script_dir / "run_with_wandb.py"
+    cmd = [
+        sys.executable, str(run_script),
+        f"--config={algorithm}",
+        f"--env-config={env_config.env_config}",
+        f"--wandb-config={wandb_config}",
+        f"env_args.key={env_config.key}" if env_config.env_config == "gymma" else f"env_args.map_name={env_config.key}",
+    ]
+    if env_config.default_args:
+        cmd.extend(env_config.default_args.split())
+    if additional_args:
+        cmd.extend(additional_args.split())
     
     if seeds == 1:
         # 단일 실험
-        run_script = script_dir / "run_with_wandb.py"
-        cmd = [
-            sys.executable, str(run_script),
-            f"--config={algorithm}",
-            f"--env-config={env_config.env_config}",
-            f"--wandb-config={wandb_config}",
-            f"env_args.key={env_config.key}" if env_config.env_config == "gymma" else f"env_args.map_name={env_config.key}",
-            env_config.default_args
-        ]
-        
-        if additional_args:
-            cmd.extend(additional_args.split())
-        
         print(f"실행 명령어: {' '.join(cmd)}")
         result = subprocess.run(cmd)
         return result.returncode == 0
     
-    else:
-        # 다중 시드 실험
-        multi_seed_script = project_root / "bin" / "run_multi_seed.sh"
-        env_key = env_config.key
-        cmd = [
-            str(multi_seed_script),
-            algorithm,
-            f'"{env_key}"',
-            str(seeds),
-            wandb_config
-        ]
-        
-        # 환경별 추가 설정
-        if env_config.default_args:
-            cmd.append(env_config.default_args)
-        
-        if additional_args:
-            cmd.append(additional_args)
-        
-        print(f"실행 명령어: {' '.join(cmd)}")
-        result = subprocess.run(cmd)
-        return result.returncode == 0
+    # 다중 시드 실험: 자원이 비는 대로 다음 시드를 시작
+    from seed_scheduler import expand_jobs, run_jobs, summarize
+    
+    jobs = expand_jobs([{
+        "name": f"{algorithm}-{environment}",
+        "command": cmd + ["seed={seed}"],
+        "seeds": list(range(start_seed, start_seed + seeds)),
+        "cores": job_cores,
+        "mem_gb": job_mem_gb,
+        "env_procs": 1 if env_config.env_config.startswith("sc2") else 0,
+    }])
+    exit_codes = run_jobs(jobs, max_jobs=workers)
+    return summarize(exit_codes)
 
 def list_environments(category: str = None, algorithm: str = None):
     """지원하는 환경들을 나열합니다."""
@@ -190,6 +182,14 @@ def main():
                        help='개별 보상 모드로 실행')
     parser.add_argument('--seeds', type=int, default=1,
                        help='실행할 시드 개수')
+    parser.add_argument('--start-seed', type=int, default=1000,
+                       help='다중 시드 실행 시 시작 시드')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('RUN_MULTI_SEED_WORKERS', 1)),
+                       help='동시에 실행할 시드 수 (0: 코어/메모리로만 제한)')
+    parser.add_argument('--job-cores', type=int, default=None,
+                       help='시드당 CPU 코어 수 (지정 시 코어 고정, 기본: 총 코어 // workers, 고정 안 함)')
+    parser.add_argument('--job-mem-gb', type=float, default=0.0,
+                       help='시드당 메모리(GiB)')
     parser.add_argument('--quick', action='store_true',
                        help='빠른 모드 (짧은 학습)')
     parser.add_argument('--additional-args', default="",
@@ -218,7 +218,11 @@ def main():
         individual_rewards=args.individual_rewards,
         seeds=args.seeds,
         additional_args=args.additional_args,
-        quick_mode=args.quick
+        quick_mode=args.quick,
+        start_seed=args.start_seed,
+        workers=args.workers,
+        job_cores=args.job_cores,
+        job_mem_gb=args.job_mem_gb
     )
     
     if success:
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import run_cache
+from run_cache import RunCache, canonical_with_args, fingerprint, resolved_config
+
+
+def test_with_args_are_normalised():
+    assert canonical_with_args(["with", "seed=1", "lr=0.0005", "lr=5e-4", "name='qmix'"]) == {
+        "lr": 0.0005,
+        "name": "qmix",
+        "seed": 1,
+    }
+
+
+def test_fingerprint_ignores_argument_order():
+    a = resolved_config("qmix", "sc2v2", ["seed=1", "t_max=1000"])
+    b = resolved_config("qmix", "sc2v2", ["t_max=1000", "seed=1"])
+    assert fingerprint(a) == fingerprint(b)
+    assert fingerprint(a) != fingerprint(resolved_config("qmix", "sc2v2", ["seed=2", "t_max=1000"]))
+
+
+def test_fingerprint_hashes_config_file_contents(tmp_path, monkeypatch):
+    env_dir = tmp_path / "configs" / "envs"
+    env_dir.mkdir(parents=True)
+    config = env_dir / "sc2v2.yaml"
+    config.write_text("env_args:\n  map_name: protoss_5_vs_5\n", encoding="utf-8")
+    monkeypatch.setattr(run_cache, "ROOT", tmp_path)
+    monkeypatch.setattr(run_cache, "PYMARL2_CONFIG_DIR", tmp_path / "pymarl2")
+    before = fingerprint(resolved_config("qmix", "sc2v2", ["seed=1"]))
+    config.write_text("env_args:\n  map_name: zerg_5_vs_5\n", encoding="utf-8")
+    assert fingerprint(resolved_config("qmix", "sc2v2", ["seed=1"])) != before
+
+
+def test_finished_record_round_trips(tmp_path):
+    cache = RunCache(tmp_path)
+    with cache.locked("abc"):
+        entry = cache.mark_running("abc", {"with": {"seed": 1}}, ["python", "main.py"])
+    assert cache.lookup("abc")["status"] == "running"
+    cache.mark_finished("abc", entry, 0, outputs=["results/models/run_1"])
+    done = cache.lookup("abc")
+    assert done["status"] == "done" and done["outputs"] == ["results/models/run_1"]
+    assert cache.mark_running("abc", {}, [])["attempts"] == 2
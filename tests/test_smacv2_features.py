@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from wrappers.smacv2_env import CONFIG_ROOT, _load_scenario_args
+from wrappers.smacv2_features import layout_size, obs_layout, select_features
+
+
+@pytest.fixture(scope="module")
+def layout():
+    env_args = _load_scenario_args(CONFIG_ROOT / "protoss_5_vs_5.yaml")["env_args"]
+    return obs_layout(env_args)
+
+
+def test_no_patterns_selects_everything(layout):
+    columns, selected = select_features(layout)
+    np.testing.assert_array_equal(columns, np.arange(layout_size(layout)))
+    assert [feat.name for feat in selected] == [feat.name for feat in layout]
+
+
+def test_drop_pattern_removes_matching_columns(layout):
+    columns, selected = select_features(layout, drop=["enemy_*.unit_type"])
+    dropped = [feat for feat in layout if feat.name.startswith("enemy_") and feat.name.endswith(".unit_type")]
+    assert len(dropped) == 5
+    assert len(columns) == layout_size(layout) - sum(feat.size for feat in dropped)
+    for feat in dropped:
+        assert not np.isin(np.arange(feat.start, feat.start + feat.size), columns).any()
+    assert not any(feat.name.startswith("enemy_") and feat.name.endswith(".unit_type") for feat in selected)
+
+
+def test_selected_layout_is_repacked(layout):
+    columns, selected = select_features(layout, keep=["enemy_0.*"])
+    assert [feat.name for feat in selected][0] == "enemy_0.attackable"
+    assert selected[0].start == 0
+    assert layout_size(selected) == len(columns)
+    original = {feat.name: feat for feat in layout}
+    for feat in selected:
+        src = original[feat.name]
+        np.testing.assert_array_equal(
+            columns[feat.start : feat.start + feat.size], np.arange(src.start, src.start + src.size)
+        )
+
+
+def test_unmatched_pattern_raises(layout):
+    with pytest.raises(ValueError, match="match nothing"):
+        select_features(layout, keep=["enemy_*.helth"])
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from plugins.buffers.sum_tree import SumTree
+
+
+def test_totals_and_min_follow_updates():
+    tree = SumTree(5)
+    tree.update([0, 1, 2, 3, 4], [1.0, 2.0, 3.0, 4.0, 5.0])
+    assert tree.total == pytest.approx(15.0)
+    assert tree.min == pytest.approx(1.0)
+    tree.update([0, 4], [6.0, 0.5])
+    assert tree.total == pytest.approx(15.5)
+    assert tree.min == pytest.approx(0.5)
+    np.testing.assert_allclose(tree[[0, 4]], [6.0, 0.5])
+
+
+def test_duplicate_indices_keep_last_value():
+    tree = SumTree(4)
+    tree.update([2, 2], [1.0, 3.0])
+    assert tree.total == pytest.approx(3.0)
+
+
+def test_find_maps_prefix_sums_to_leaves():
+    tree = SumTree(3)
+    tree.update([0, 1, 2], [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(tree.find([0.0, 0.99, 1.0, 2.99, 3.0, 5.99]), [0, 0, 1, 1, 2, 2])
+    # Round-off past the total never returns a padding leaf.
+    assert tree.find([6.0 + 1e-9])[0] == 2
+
+
+def test_sample_is_proportional():
+    tree = SumTree(4)
+    tree.update([0, 1, 2, 3], [1.0, 0.0, 3.0, 0.0])
+    drawn = tree.sample(40_000, rng=np.random.default_rng(0))
+    counts = np.bincount(drawn, minlength=4) / drawn.size
+    np.testing.assert_allclose(counts, [0.25, 0.0, 0.75, 0.0], atol=0.01)
+
+
+def test_out_of_range_index_raises():
+    tree = SumTree(3)
+    with pytest.raises(IndexError):
+        tree.update([3], [1.0])
+    with pytest.raises(ValueError):
+        SumTree(0)
@@ -0,0 +1,85 @@
+"""Watchdog restarts of the synthetic SMACv2 backend (no SC2 needed)."""
+from __future__ import annotations
+
+import warnings
+
+import numpy as np
+import pytest
+
+from wrappers.smacv2_env import SMACv2Env
+
+
+def _make_env(**kwargs):
+    return SMACv2Env("protoss_5_vs_5", seed=0, synthetic=True, call_timeout=0.5, **kwargs)
+
+
+def _first_avail(env):
+    return [int(np.flatnonzero(avail)[0]) for avail in env.get_avail_actions()]
+
+
+@pytest.fixture(autouse=True)
+def _quiet_restart_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield
+
+
+def test_crash_mid_episode_restarts_and_truncates():
+    env = _make_env(max_restarts=3)
+    try:
+        env.reset()
+        old_backend = env.env
+        old_backend.env._crash_prob = 1.0
+        _, reward, terminated, _, info = env.step(_first_avail(env))
+        assert env.env is not old_backend
+        assert terminated and reward == 0.0
+        assert info == {"episode_limit": True, "env_restarted": 1}
+        stats = env.get_stats()
+        assert stats["env_restarts"] == 1 and stats["env_crashes"] == 1
+        obs, _ = env.reset()
+        assert len(obs) == env.get_env_info()["n_agents"]
+    finally:
+        env.close()
+
+
+def test_stalled_reset_times_out_and_recovers():
+    env = _make_env(max_restarts=3)
+    try:
+        env.env.env._stall_prob = 1.0
+        env.env.env._stall_s = 30.0
+        obs, _ = env.reset()
+        assert len(obs) == env.get_env_info()["n_agents"]
+        stats = env.get_stats()
+        assert stats["env_timeouts"] == 1 and stats["env_restarts"] == 1
+    finally:
+        env.close()
+
+
+def test_restart_limit_raises():
+    # Every relaunched backend stalls again, so recovery never succeeds.
+    env = _make_env(max_restarts=2, stall_prob=1.0, stall_s=30.0)
+    try:
+        with pytest.raises(RuntimeError, match="after 2 restarts"):
+            env.reset()
+        assert env.get_stats()["env_timeouts"] == 3
+    finally:
+        env.close()
+
+
+def test_healthy_episode_resets_restart_budget():
+    env = _make_env(max_restarts=1)
+    try:
+        for _ in range(2):
+            env.reset()
+            env.env.env._crash_prob = 1.0
+            _, _, terminated, _, info = env.step(_first_avail(env))
+            assert terminated and info.get("env_restarted") == 1
+            # Play the fresh backend's episode to its normal end.
+            env.reset()
+            terminated = False
+            while not terminated:
+                _, _, terminated, _, info = env.step(_first_avail(env))
+            assert "env_restarted" not in info
+        assert env.get_stats()["env_restarts"] == 2
+    finally:
+        env.close()
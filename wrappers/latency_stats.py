@@ -0,0 +1,95 @@
+"""Low-overhead per-call latency histograms.
+
+Each call duration lands in one of a fixed set of log-spaced buckets (1 µs to
+~100 s, 16 buckets per decade), so recording is a ``bisect`` plus an integer
+increment and percentiles are read off the cumulative counts.  Reported
+percentiles are bucket upper edges, i.e. accurate to within ~15%.
+"""
+from __future__ import annotations
+
+import json
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, List
+
+BUCKETS_PER_DECADE = 16
+MIN_NS = 1_000
+DECADES = 8
+BUCKET_EDGES_NS: List[float] = [
+    MIN_NS * 10 ** (idx / BUCKETS_PER_DECADE) for idx in range(DECADES * BUCKETS_PER_DECADE + 1)
+]
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "total_ns", "max_ns")
+
+    def __init__(self) -> None:
+        # One overflow bucket past the last edge.
+        self.counts = [0] * (len(BUCKET_EDGES_NS) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, elapsed_ns: int) -> None:
+        self.counts[bisect_left(BUCKET_EDGES_NS, elapsed_ns)] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def percentile_ns(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        target = q / 100.0 * self.count
+        seen = 0
+        for idx, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                return BUCKET_EDGES_NS[idx] if idx < len(BUCKET_EDGES_NS) else float(self.max_ns)
+        return float(self.max_ns)
+
+    def summary(self) -> Dict[str, float]:
+        summary = {
+            "count": self.count,
+            "mean_ms": self.total_ns / self.count / 1e6 if self.count else 0.0,
+            "max_ms": self.max_ns / 1e6,
+            "total_s": self.total_ns / 1e9,
+        }
+        for q in PERCENTILES:
+            summary[f"p{q}_ms"] = self.percentile_ns(q) / 1e6
+        return summary
+
+
+class CallProfiler:
+    """Named :class:`LatencyHistogram` collection."""
+
+    def __init__(self) -> None:
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def record(self, name: str, elapsed_ns: int) -> None:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        histogram.record(elapsed_ns)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {name: histogram.summary() for name, histogram in self.histograms.items()}
+
+    def dump_json(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as handle:
+            json.dump(self.summary(), handle, indent=2)
+
+    def log_to(self, sink: Any, t: int, prefix: str = "env_") -> None:
+        """Push ``<prefix><call>_{mean,p50,p95,p99}_ms`` scalars to a sink.
+
+        ``sink`` may be a sacred ``Run`` (``log_scalar``) or a PyMARL2
+        ``Logger`` (``log_stat``, which forwards to sacred once the
+        ``0003-forward-scalar-logs`` patch is applied).
+        """
+        log = getattr(sink, "log_scalar", None) or getattr(sink, "log_stat")
+        for name, stats in self.summary().items():
+            for key in ("mean_ms", *(f"p{q}_ms" for q in PERCENTILES)):
+                log(f"{prefix}{name}_{key}", stats[key], t)
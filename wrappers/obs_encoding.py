@@ -0,0 +1,89 @@
+"""Compact float16 / uint8 encodings for SMACv2 observations and states (recordings and IPC).
+
+SMACv2 features are bounded ratios in ``[0, 1]`` or relative offsets in
+``[-1, 1]`` (see :mod:`wrappers.smacv2_features`), so a per-feature affine map
+to ``uint8`` loses at most half a quantisation step (~0.2% of the range) while
+shrinking trajectory recordings and the shared-memory arrays of
+:mod:`wrappers.smacv2_vec_env` 4x; ``float16`` halves them losslessly for
+practical purposes.  The per-feature ``low``/``scale`` vectors are computed
+once from the feature layout; :meth:`ObsCodec.dequantize` restores
+``float32`` values from NumPy arrays or torch tensors where the codes are read.
+
+This does not shrink PyMARL2 replay buffers: ``EpisodeBatch`` stores obs and
+state as float32, so ``uint8`` is rejected for training and ``float16`` only
+changes the env-side arrays.  For smaller training buffers use
+``buffer=compact`` (``compact_obs_dtype``, see ``plugins/buffers/``).
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+from wrappers.smacv2_features import FeatureSpec, layout_bounds
+
+ENCODINGS = ("float32", "float16", "uint8")
+UINT8_LEVELS = 255
+
+
+class ObsCodec:
+    def __init__(self, low: np.ndarray, high: np.ndarray, encoding: str) -> None:
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown obs encoding '{encoding}'. Available: {list(ENCODINGS)}")
+        self.encoding = encoding
+        self.dtype = np.dtype(encoding)
+        self.low = np.asarray(low, dtype=np.float32)
+        span = np.maximum(np.asarray(high, dtype=np.float32) - self.low, 1e-6)
+        self.scale = (span / UINT8_LEVELS).astype(np.float32)
+        self._inv_scale = (1.0 / self.scale).astype(np.float32)
+        self._torch_params: Dict[Any, Any] = {}
+
+    @classmethod
+    def from_layout(cls, layout: Sequence[FeatureSpec], encoding: str) -> "ObsCodec":
+        low, high = layout_bounds(layout)
+        return cls(low, high, encoding)
+
+    @classmethod
+    def uniform(cls, size: int, encoding: str, low: float = -1.0, high: float = 1.0) -> "ObsCodec":
+        """Fallback when the feature layout is unknown: one range for every column."""
+        return cls(np.full(size, low, dtype=np.float32), np.full(size, high, dtype=np.float32), encoding)
+
+    def encode(self, values: np.ndarray) -> np.ndarray:
+        """Encode ``(..., n_features)`` float values into :attr:`dtype`."""
+        values = np.asarray(values, dtype=np.float32)
+        if self.encoding == "float32":
+            return values
+        if self.encoding == "float16":
+            return values.astype(np.float16)
+        codes = (values - self.low) * self._inv_scale
+        np.rint(codes, out=codes)
+        np.clip(codes, 0, UINT8_LEVELS, out=codes)
+        return codes.astype(np.uint8)
+
+    def dequantize(self, codes):
+        """Inverse of :meth:`encode` for NumPy arrays or torch tensors."""
+        # NumPy >= 2 arrays also expose ``.device``; only torch tensors take this path.
+        if not isinstance(codes, np.ndarray) and hasattr(codes, "device"):
+            return self._dequantize_torch(codes)
+        codes = np.asarray(codes)
+        if self.encoding != "uint8":
+            return codes.astype(np.float32)
+        return codes.astype(np.float32) * self.scale + self.low
+
+    def _dequantize_torch(self, codes):
+        if self.encoding != "uint8":
+            return codes.float()
+        params = self._torch_params.get(codes.device)
+        if params is None:
+            import torch
+
+            params = (
+                torch.as_tensor(self.scale, device=codes.device),
+                torch.as_tensor(self.low, device=codes.device),
+            )
+            self._torch_params[codes.device] = params
+        scale, low = params
+        return codes.float() * scale + low
+
+    def to_config(self) -> Dict[str, Any]:
+        return {"encoding": self.encoding, "low": self.low.tolist(), "scale": self.scale.tolist()}
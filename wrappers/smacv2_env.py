@@ -1,25 +1,62 @@
 """SMACv2 environment wrapper for PyMARL2 without touching the submodule."""
 from __future__ import annotations
 
+import asyncio
+import os
+import threading
+import time
+import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Sequence, Tuple
 
+import numpy as np
 import yaml
 
+from wrappers.latency_stats import CallProfiler
+from wrappers.obs_encoding import ObsCodec
+from wrappers.smacv2_features import FeatureSpec, layout_size, obs_layout, select_features, state_layout
+from wrappers.watchdog import BackendFailure, CallWatchdog
+
 try:
     from smacv2.env.starcraft2.wrapper import StarCraftCapabilityEnvWrapper
 except ImportError as exc:  # pragma: no cover - import guard
-    raise ImportError(
-        "smacv2.env.starcraft2.wrapper is required. Install smacv2 with `pip install smacv2`."
-    ) from exc
+    # The synthetic backend does not need smacv2; only fail when SC2 is requested.
+    StarCraftCapabilityEnvWrapper = None
+    _SMACV2_IMPORT_ERROR: ImportError | None = exc
+else:
+    _SMACV2_IMPORT_ERROR = None
 
 CONFIG_ROOT = Path(__file__).resolve().parents[1] / "configs" / "smacv2"
 
 
 class SMACv2Env:
-    """PyMARL2-compatible SMACv2 environment wrapper."""
-
-    def __init__(self, map_name: str, seed: int | None = None, **kwargs: Any) -> None:
+    """PyMARL2-compatible SMACv2 environment wrapper.
+
+    Besides the standard ``MultiAgentEnv`` API it offers a synthetic NumPy
+    backend (``synthetic``), trajectory recording (``record_dir``), threaded
+    and prefetched stepping/resets, call profiling, compact obs encodings,
+    feature pruning and a restart watchdog (``call_timeout``).  The options
+    are documented in ``wrappers/README.md``.
+    """
+
+    def __init__(
+        self,
+        map_name: str,
+        seed: int | None = None,
+        synthetic: bool = False,
+        record_dir: str | None = None,
+        record_chunk_steps: int = 4096,
+        prefetch_reset: bool = False,
+        profile_calls: bool = False,
+        profile_path: str | None = None,
+        obs_encoding: str = "float32",
+        obs_features: Dict[str, Sequence[str]] | Sequence[str] | None = None,
+        state_features: Dict[str, Sequence[str]] | Sequence[str] | None = None,
+        call_timeout: float | None = None,
+        max_restarts: int = 5,
+        **kwargs: Any,
+    ) -> None:
         self._map_name = map_name
         self._config_path = CONFIG_ROOT / f"{map_name}.yaml"
         if not self._config_path.exists():
@@ -32,43 +69,465 @@ class SMACv2Env:
             env_args["seed"] = seed
         env_args.update(kwargs)
 
-        self.env = StarCraftCapabilityEnvWrapper(**env_args)
+        self._profile_path = profile_path
+        self._profiler = CallProfiler() if (profile_calls or profile_path) else None
+
+        self.synthetic = synthetic
+        self.env = _make_backend(synthetic, env_args)
         self.episode_limit = self.env.episode_limit
+        self._env_args = env_args
+
+        self._obs_index, obs_features_layout = self._resolve_view("obs", obs_layout, self.env.get_obs_size(), obs_features)
+        self._state_index, state_features_layout = self._resolve_view(
+            "state", state_layout, self.env.get_state_size(), state_features
+        )
+        self._obs_size = len(self._obs_index) if self._obs_index is not None else self.env.get_obs_size()
+        self._state_size = len(self._state_index) if self._state_index is not None else self.env.get_state_size()
+
+        self._obs_encoding = obs_encoding
+        self._obs_codec = self._build_codec(obs_features_layout, self._obs_size, obs_encoding)
+        self._state_codec = self._build_codec(state_features_layout, self._state_size, obs_encoding)
+        self._full: Dict[str, Any] | None = None
+        # obs/state/avail lists of the current timestep, shared by every caller.
+        self._cache: Dict[str, Any] = {}
+
+        self._record_dir = Path(record_dir) if record_dir else None
+        self._record_chunk_steps = record_chunk_steps
+        self._recorder = None
+        self._record_prev: tuple | None = None
+
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending_step: Future | None = None
+
+        self._prefetch_reset = prefetch_reset
+        self._next_reset_config: Future | None = None
+        self._prefetched_reset: Future | None = None
+
+        self._call_timeout = call_timeout
+        self._max_restarts = max_restarts
+        self._watchdog: CallWatchdog | None = None
+        self._restarts = 0
+        # Restarts since the last episode that ended normally.
+        self._restarts_in_row = 0
+        self._failures = {"timeout": 0, "crash": 0}
+        # Counters of replaced backends, folded into get_stats().
+        self._retired_stats: Dict[str, float] = {}
 
     # Standard PyMARL2 environment API -------------------------------------------------
     def step(self, actions):
-        rewards, terminated, info = self.env.step(actions)
+        rewards, terminated, info = self._step_backend(actions)
         observations = self.get_obs()
         truncated = False
         return observations, rewards, terminated, truncated, info
 
     def reset(self, seed: int | None = None, options: Dict[str, Any] | None = None):
+        return self._timed("reset", self._reset, seed)
+
+    def _reset(self, seed: int | None):
+        prefetched, self._prefetched_reset = self._prefetched_reset, None
+        try:
+            observations = self._reset_backend(prefetched, seed)
+        except BackendFailure as failure:
+            observations = self._recover(failure, seed)
+        self._cache.clear()
+        # The backend already built the first observation; reuse it for get_obs().
+        self._cache["obs"] = observations = self._transform_obs(observations)
+        if self._prefetch_reset:
+            self._next_reset_config = self._worker().submit(self._sample_reset_config)
+        if self._record_dir is not None:
+            self._record_begin()
+        return observations, {}
+
+    def _reset_backend(self, prefetched: Future | None, seed: int | None):
+        if prefetched is not None and seed is None:
+            observations, _ = prefetched.result()
+            return observations
+        if prefetched is not None:
+            # An explicit seed invalidates the episode prepared in the background.
+            prefetched.result()
         if seed is not None:
             self.env.seed(seed)
-        observations, _ = self.env.reset()
-        return observations, {}
+        observations, _ = self._guarded("reset", self.env.reset)
+        return observations
 
     def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._pending_step = None
+        if self._watchdog is not None:
+            self._watchdog.stop()
+            self._watchdog = None
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+        if self._profiler is not None and self._profile_path:
+            self._profiler.dump_json(self._profile_path)
         self.env.close()
 
+    # Instrumentation ------------------------------------------------------------------
+    def get_latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-call count/mean/p50/p95/p99/max latencies in milliseconds."""
+        return self._profiler.summary() if self._profiler is not None else {}
+
+    def dump_latency_stats(self, path: str | Path) -> None:
+        if self._profiler is not None:
+            self._profiler.dump_json(path)
+
+    def log_latency_stats(self, sink: Any, t_env: int) -> None:
+        """Push latency percentiles to a sacred ``Run`` or PyMARL2 ``Logger``."""
+        if self._profiler is not None:
+            self._profiler.log_to(sink, t_env)
+
+    def _timed(self, name: str, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._profiler is None:
+            return fn(*args)
+        start = time.perf_counter_ns()
+        try:
+            return fn(*args)
+        finally:
+            self._profiler.record(name, time.perf_counter_ns() - start)
+
+    # Asynchronous API -----------------------------------------------------------------
+    def step_async(self, actions, full: bool = False) -> None:
+        """Start a :meth:`step` (or :meth:`step_full` if ``full``) on the worker thread."""
+        if self._pending_step is not None:
+            raise RuntimeError("step_async called while a step is pending; call step_wait first")
+        self._pending_step = self._worker().submit(self.step_full if full else self.step, actions)
+
+    def step_wait(self):
+        """Block until the pending :meth:`step_async` finishes and return its result."""
+        if self._pending_step is None:
+            raise RuntimeError("step_wait called without a pending step_async")
+        future, self._pending_step = self._pending_step, None
+        return future.result()
+
+    async def astep(self, actions, full: bool = False):
+        """Awaitable :meth:`step`; other coroutines keep running while SC2 simulates."""
+        self.step_async(actions, full=full)
+        future = self._pending_step
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            if self._pending_step is future:
+                self._pending_step = None
+
+    def _worker(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"smacv2-{self._map_name}")
+        return self._executor
+
+    # Fused array API ------------------------------------------------------------------
+    def step_full(self, actions) -> Dict[str, Any]:
+        """Step and return obs/state/avail/reward/terminated/info in one dict.
+
+        The arrays are reused across calls (see :meth:`bind_full_buffers`), so
+        copy them if they need to outlive the next ``step_full``/``reset_full``.
+        """
+        rewards, terminated, info = self._step_backend(actions)
+        out = self._full_buffers()
+        out["reward"][...] = rewards
+        out["terminated"][...] = terminated
+        self._fill_full(out)
+        out["info"] = info
+        return out
+
+    def reset_full(self, seed: int | None = None) -> Dict[str, Any]:
+        """Reset and return the initial obs/state/avail arrays (see :meth:`step_full`)."""
+        self.reset(seed=seed)
+        out = self._full_buffers()
+        out["reward"][...] = 0.0
+        out["terminated"][...] = False
+        self._fill_full(out)
+        out["info"] = {}
+        return out
+
+    def bind_full_buffers(self, **buffers: np.ndarray) -> None:
+        """Make the fused API write into caller-owned arrays (e.g. shared memory).
+
+        Accepts any of ``obs``, ``state``, ``avail_actions``, ``reward`` and
+        ``terminated``; unspecified outputs keep their private buffers.
+        """
+        out = self._full_buffers()
+        unknown = set(buffers) - {"obs", "state", "avail_actions", "reward", "terminated"}
+        if unknown:
+            raise KeyError(f"Unknown fused buffers: {sorted(unknown)}")
+        for key, array in buffers.items():
+            if array.size != out[key].size:
+                raise ValueError(f"Buffer '{key}' has shape {array.shape}, expected {out[key].shape}")
+            out[key] = array
+
+    def _full_buffers(self) -> Dict[str, Any]:
+        if self._full is None:
+            n_agents = self.get_env_info()["n_agents"]
+            self._full = {
+                "obs": np.zeros((n_agents, self.get_obs_size()), dtype=self._obs_dtype),
+                "state": np.zeros(self.get_state_size(), dtype=self._state_dtype),
+                "avail_actions": np.zeros((n_agents, self.get_total_actions()), dtype=bool),
+                "reward": np.zeros((), dtype=np.float32),
+                "terminated": np.zeros((), dtype=bool),
+                "info": {},
+            }
+        return self._full
+
+    def _fill_full(self, out: Dict[str, Any]) -> None:
+        # Copy each agent row in place so no intermediate stacked array is built.
+        obs_buf = out["obs"].reshape(-1, out["obs"].shape[-1])
+        for row, agent_obs in zip(obs_buf, self.get_obs()):
+            row[:] = agent_obs
+        out["state"].reshape(-1)[:] = self.get_state()
+        avail_buf = out["avail_actions"].reshape(-1, out["avail_actions"].shape[-1])
+        for row, agent_avail in zip(avail_buf, self.get_avail_actions()):
+            row[:] = agent_avail
+
+    def _step_backend(self, actions):
+        restarted = False
+        try:
+            rewards, terminated, info = self._timed("step", self._guarded, "step", self.env.step, actions)
+        except BackendFailure as failure:
+            self._recover(failure)
+            # The episode cannot continue on a new instance; end it as a time-limit
+            # truncation so learners still bootstrap from the last state.
+            rewards, terminated, info = 0.0, True, {"episode_limit": True, "env_restarted": 1}
+            restarted = True
+        self._cache.clear()
+        if terminated and not restarted:
+            self._restarts_in_row = 0
+        if self._recorder is not None:
+            self._record_step(actions, rewards, terminated)
+        if terminated and self._prefetch_reset and self._prefetched_reset is None and not restarted:
+            self._start_prefetched_reset()
+        return rewards, terminated, info
+
+    # Watchdog -------------------------------------------------------------------------
+    def _guarded(self, name: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a backend call, turning hangs and crashes into :class:`BackendFailure`."""
+        if self._call_timeout is None:
+            return fn(*args)
+        if self._watchdog is None:
+            self._watchdog = CallWatchdog(f"smacv2-{self._map_name}-watchdog")
+        try:
+            return self._watchdog.call(self._call_timeout, name, fn, *args)
+        except (BackendFailure, AssertionError):
+            raise
+        except Exception as exc:
+            raise BackendFailure(name, "crash", repr(exc)) from exc
+
+    def _recover(self, failure: BackendFailure, seed: int | None = None):
+        """Relaunch the backend until a fresh episode starts; returns its observations."""
+        while True:
+            self._relaunch(failure)
+            try:
+                if seed is not None:
+                    self.env.seed(seed)
+                observations, _ = self._guarded("reset", self.env.reset)
+                return observations
+            except BackendFailure as exc:
+                failure = exc
+
+    def _relaunch(self, failure: BackendFailure) -> None:
+        self._failures[failure.kind] += 1
+        if self._restarts_in_row >= self._max_restarts:
+            raise RuntimeError(
+                f"SMACv2 backend failed after {self._restarts_in_row} restarts without a healthy episode"
+            ) from failure
+        self._restarts += 1
+        self._restarts_in_row += 1
+        warnings.warn(f"{failure}; relaunching the backend ({self._restarts_in_row}/{self._max_restarts} in a row)")
+
+        old_env = self.env
+        try:
+            old_stats = old_env.get_stats()
+        except Exception:
+            old_stats = {}
+        for key, value in old_stats.items():
+            if key != "win_rate" and isinstance(value, (int, float)):
+                self._retired_stats[key] = self._retired_stats.get(key, 0) + value
+
+        # The hung call keeps its thread; closing the backend (killing SC2) releases it.
+        if self._watchdog is not None:
+            self._watchdog.stop()
+            self._watchdog = None
+        threading.Thread(target=_close_quietly, args=(old_env,), name="smacv2-close", daemon=True).start()
+
+        env_args = dict(self._env_args)
+        if env_args.get("seed") is not None:
+            # Do not replay the episode sequence of the failed instance.
+            env_args["seed"] = int(env_args["seed"]) + self._restarts
+        self.env = _make_backend(self.synthetic, env_args)
+        self._cache.clear()
+        self._next_reset_config = None
+
+    # Reset prefetching ----------------------------------------------------------------
+    def _start_prefetched_reset(self) -> None:
+        # Pin the terminal timestep before the backend moves on to the next episode.
+        self.get_obs()
+        self.get_state()
+        self.get_avail_actions()
+        self._prefetched_reset = self._worker().submit(self._reset_from_sample)
+
+    def _sample_reset_config(self) -> Dict[str, Any] | None:
+        """Draw the next capability config the way smacv2's wrapper ``reset`` does."""
+        distributions = getattr(self.env, "env_key_to_distribution_map", None)
+        if distributions is None or not hasattr(self.env, "env"):
+            return None
+        reset_config: Dict[str, Any] = {}
+        for distribution in distributions.values():
+            reset_config = {**reset_config, **distribution.generate()}
+        return reset_config
+
+    def _reset_from_sample(self):
+        # Runs on the worker thread, after the sampling task queued at the last reset.
+        pending, self._next_reset_config = self._next_reset_config, None
+        reset_config = pending.result() if pending is not None else None
+        if reset_config is None:
+            return self._guarded("reset", self.env.reset)
+        return self._guarded("reset", self.env.env.reset, reset_config)
+
+    def _cached(self, key: str, getter: Callable[[], Any]) -> Any:
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = self._timed(f"get_{key}", getter)
+            return value
+
+    # Trajectory recording -------------------------------------------------------------
+    def _record_begin(self) -> None:
+        if self._recorder is None:
+            from wrappers.trajectory_recorder import TrajectoryRecorder
+
+            n_agents = self.get_env_info()["n_agents"]
+            session = f"{self._map_name}-{os.getpid()}-{time.time_ns()}"
+            self._recorder = TrajectoryRecorder(
+                self._record_dir / session,
+                columns={
+                    "obs": ((n_agents, self.get_obs_size()), self._obs_dtype.name),
+                    "state": ((self.get_state_size(),), self._state_dtype.name),
+                    "avail_actions": ((n_agents, self.get_total_actions()), "bool"),
+                    "actions": ((n_agents,), "int16"),
+                    "reward": ((), "float32"),
+                    "terminated": ((), "bool"),
+                },
+                chunk_steps=self._record_chunk_steps,
+            )
+        else:
+            # A reset before termination closes the partial episode.
+            self._recorder.end_episode()
+        self._record_prev = (self.get_obs(), self.get_state(), self.get_avail_actions())
+
+    def _record_step(self, actions, rewards, terminated) -> None:
+        if self._record_prev is None:
+            return
+        obs, state, avail = self._record_prev
+        self._recorder.append(
+            obs=obs, state=state, avail_actions=avail, actions=actions, reward=rewards, terminated=terminated
+        )
+        if terminated:
+            self._recorder.end_episode()
+            self._record_prev = None
+        else:
+            self._record_prev = (self.get_obs(), self.get_state(), self.get_avail_actions())
+
+    # Feature views and compact encodings ----------------------------------------------
+    def _resolve_view(
+        self,
+        kind: str,
+        layout_fn: Callable[[Dict[str, Any]], List[FeatureSpec]],
+        size: int,
+        selection: Dict[str, Sequence[str]] | Sequence[str] | None,
+    ) -> Tuple[np.ndarray | None, List[FeatureSpec] | None]:
+        """Column indices to keep (``None`` for all) and the resulting layout."""
+        try:
+            layout = layout_fn(self._env_args)
+        except (KeyError, TypeError, ValueError):
+            layout = []
+        if layout_size(layout) != size:
+            if selection:
+                raise ValueError(
+                    f"Cannot select {kind} features: the SMACv2 layout has {layout_size(layout)} columns "
+                    f"but the backend reports {size}"
+                )
+            return None, None
+        if not selection:
+            return None, layout
+        if not isinstance(selection, dict):
+            selection = {"keep": list(selection)}
+        unknown = set(selection) - {"keep", "drop"}
+        if unknown:
+            raise KeyError(f"Unknown {kind}_features keys: {sorted(unknown)}; expected 'keep' and/or 'drop'")
+        index, selected = select_features(layout, keep=selection.get("keep"), drop=selection.get("drop"))
+        if len(index) == size:
+            return None, layout
+        return index, selected
+
+    def _build_codec(self, layout: List[FeatureSpec] | None, size: int, encoding: str) -> ObsCodec | None:
+        if encoding == "float32":
+            return None
+        if layout is not None:
+            return ObsCodec.from_layout(layout, encoding)
+        warnings.warn(
+            f"SMACv2 feature layout does not match the backend size {size}; "
+            f"quantising every feature over [-1, 1] instead."
+        )
+        return ObsCodec.uniform(size, encoding)
+
+    @property
+    def _obs_dtype(self) -> np.dtype:
+        return self._obs_codec.dtype if self._obs_codec is not None else np.dtype(np.float32)
+
+    @property
+    def _state_dtype(self) -> np.dtype:
+        return self._state_codec.dtype if self._state_codec is not None else np.dtype(np.float32)
+
+    def _transform_obs(self, observations):
+        if self._obs_index is None and self._obs_codec is None:
+            return observations
+        return list(self._transform(observations, self._obs_index, self._obs_codec))
+
+    @staticmethod
+    def _transform(values, index: np.ndarray | None, codec: ObsCodec | None):
+        values = np.asarray(values, dtype=np.float32)
+        if index is not None:
+            values = np.take(values, index, axis=-1)
+        return values if codec is None else codec.encode(values)
+
+    def _backend_obs(self):
+        return self._transform_obs(self.env.get_obs())
+
+    def _backend_state(self):
+        state = self.env.get_state()
+        if self._state_index is None and self._state_codec is None:
+            return state
+        return self._transform(state, self._state_index, self._state_codec)
+
+    def get_obs_codec(self) -> ObsCodec:
+        """Codec of the emitted observations (identity for ``float32``)."""
+        return self._obs_codec or ObsCodec.uniform(self.get_obs_size(), "float32")
+
+    def get_state_codec(self) -> ObsCodec:
+        return self._state_codec or ObsCodec.uniform(self.get_state_size(), "float32")
+
     # Delegated helpers ----------------------------------------------------------------
     def get_obs(self):
-        return self.env.get_obs()
+        return self._cached("obs", self._backend_obs)
 
     def get_obs_agent(self, agent_id: int):
-        return self.env.get_obs_agent(agent_id)
+        obs = self.env.get_obs_agent(agent_id)
+        if self._obs_index is None and self._obs_codec is None:
+            return obs
+        return self._transform(obs, self._obs_index, self._obs_codec)
 
     def get_obs_size(self) -> int:
-        return self.env.get_obs_size()
+        return self._obs_size
 
     def get_state(self):
-        return self.env.get_state()
+        return self._cached("state", self._backend_state)
 
     def get_state_size(self) -> int:
-        return self.env.get_state_size()
+        return self._state_size
 
     def get_avail_actions(self):
-        return self.env.get_avail_actions()
+        return self._cached("avail_actions", self.env.get_avail_actions)
 
     def get_avail_agent_actions(self, agent_id: int):
         return self.env.get_avail_agent_actions(agent_id)
@@ -86,10 +545,53 @@ class SMACv2Env:
         self.env.save_replay()
 
     def get_env_info(self) -> Dict[str, Any]:
-        return self.env.get_env_info()
+        env_info = self.env.get_env_info()
+        if self._obs_index is not None or self._state_index is not None:
+            env_info = {**env_info, "obs_shape": self._obs_size, "state_shape": self._state_size}
+        if self._obs_codec is not None:
+            env_info = {
+                **env_info,
+                "obs_encoding": self._obs_encoding,
+                "obs_dtype": self._obs_dtype.name,
+                "state_dtype": self._state_dtype.name,
+            }
+        return env_info
 
     def get_stats(self) -> Dict[str, Any]:
-        return self.env.get_stats()
+        stats = self.env.get_stats()
+        if self._call_timeout is None:
+            return stats
+        stats = dict(stats)
+        for key, value in self._retired_stats.items():
+            stats[key] = stats.get(key, 0) + value
+        if self._retired_stats and "battles_game" in stats:
+            stats["win_rate"] = stats.get("battles_won", 0) / max(stats["battles_game"], 1)
+        stats.update(
+            env_restarts=self._restarts,
+            env_timeouts=self._failures["timeout"],
+            env_crashes=self._failures["crash"],
+        )
+        return stats
+
+
+def _make_backend(synthetic: bool, env_args: Dict[str, Any]):
+    if synthetic:
+        from wrappers.smacv2_synthetic import SyntheticCapabilityEnvWrapper
+
+        return SyntheticCapabilityEnvWrapper(**env_args)
+    if StarCraftCapabilityEnvWrapper is None:
+        raise ImportError(
+            "smacv2.env.starcraft2.wrapper is required. Install smacv2 with `pip install smacv2` "
+            "or pass synthetic=True to use the NumPy backend."
+        ) from _SMACV2_IMPORT_ERROR
+    return StarCraftCapabilityEnvWrapper(**env_args)
+
+
+def _close_quietly(env: Any) -> None:
+    try:
+        env.close()
+    except Exception:
+        pass
 
 
 def _load_scenario_args(config_path: Path) -> Dict[str, Any]:
@@ -98,13 +600,24 @@ def _load_scenario_args(config_path: Path) -> Dict[str, Any]:
 
 
 def register_smacv2_env() -> None:
-    """Register SMACv2 under the PyMARL2 env REGISTRY if not already present."""
+    """Register SMACv2 as PyMARL2's ``sc2v2`` env.
+
+    :class:`wrappers.smacv2_vec_env.SMACv2VecEnv` is deliberately not
+    registered: it steps ``n_envs`` battles at once and does not follow the
+    ``MultiAgentEnv`` API the stock runners expect.
+    """
     from external.pymarl2.src import envs as pymarl2_envs
 
-    if "sc2v2" in pymarl2_envs.REGISTRY:
-        return
+    if "sc2v2" not in pymarl2_envs.REGISTRY:
 
-    def _factory(**kwargs: Any) -> SMACv2Env:
-        return SMACv2Env(**kwargs)
+        def _factory(**kwargs: Any) -> SMACv2Env:
+            # PyMARL2 stores obs/state in float32 EpisodeBatches and never
+            # dequantises them, so uint8 codes would reach the networks as-is.
+            if kwargs.get("obs_encoding", "float32") == "uint8":
+                raise ValueError(
+                    "obs_encoding='uint8' is not supported for PyMARL2 training; "
+                    "use float32/float16 or the recorder/vectorised env directly"
+                )
+            return SMACv2Env(**kwargs)
 
-    pymarl2_envs.REGISTRY["sc2v2"] = _factory
+        pymarl2_envs.REGISTRY["sc2v2"] = _factory
@@ -0,0 +1,276 @@
+"""Static description of SMACv2 observation/state feature layouts.
+
+The layouts mirror how ``smacv2``'s ``StarCraft2Env`` assembles agent
+observations and the global state for capability (``10gen_*``) maps, derived
+purely from the scenario ``env_args`` so that no StarCraft II process is
+needed.  Every feature is named ``<entity>.<feature>`` (for example
+``enemy_3.health`` or ``own.pos``) and carries the value range it is
+normalised to, which is what the synthetic backend, the compact encodings and
+the feature-selection views build on.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+N_ACTIONS_MOVE = 4
+N_ACTIONS_NO_ATTACK = 6
+PATHING_GRID_BITS = 8
+TERRAIN_HEIGHT_BITS = 9
+DEFAULT_EPISODE_LIMIT = 200
+
+# (feature name, width, low, high) per entity type.
+Feature = Tuple[str, int, float, float]
+
+
+@dataclass(frozen=True)
+class ScenarioSpec:
+    race: str
+    n_agents: int
+    n_enemies: int
+    n_actions: int
+    unit_type_bits: int
+    shield_bits: int
+    map_x: int
+    map_y: int
+    episode_limit: int
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    name: str
+    start: int
+    size: int
+    low: float
+    high: float
+
+    @property
+    def stop(self) -> int:
+        return self.start + self.size
+
+
+def scenario_spec(env_args: Dict[str, Any]) -> ScenarioSpec:
+    capability = env_args.get("capability_config", {}) or {}
+    team_gen = capability.get("team_gen", {}) or {}
+    start_positions = capability.get("start_positions", {}) or {}
+    map_name = str(env_args.get("map_name", ""))
+    race = next((name for name in ("protoss", "terran", "zerg") if name in map_name), "terran")
+
+    n_agents = int(capability.get("n_units", 0))
+    n_enemies = int(capability.get("n_enemies", n_agents))
+    if n_agents <= 0:
+        raise ValueError(f"capability_config.n_units is required for map '{map_name}'")
+
+    n_actions = N_ACTIONS_NO_ATTACK + n_enemies
+    if env_args.get("conic_fov", False):
+        n_actions += int(env_args.get("num_fov_actions", 12))
+
+    return ScenarioSpec(
+        race=race,
+        n_agents=n_agents,
+        n_enemies=n_enemies,
+        n_actions=n_actions,
+        unit_type_bits=len(team_gen.get("unit_types", []) or []),
+        shield_bits=1 if race == "protoss" else 0,
+        map_x=int(start_positions.get("map_x", 32)),
+        map_y=int(start_positions.get("map_y", 32)),
+        episode_limit=int(env_args.get("episode_limit", DEFAULT_EPISODE_LIMIT)),
+    )
+
+
+def _health_features(spec: ScenarioSpec) -> List[Feature]:
+    features: List[Feature] = [("health", 1, 0.0, 1.0)]
+    if spec.shield_bits:
+        features.append(("shield", spec.shield_bits, 0.0, 1.0))
+    return features
+
+
+def _unit_type_features(spec: ScenarioSpec) -> List[Feature]:
+    return [("unit_type", spec.unit_type_bits, 0.0, 1.0)] if spec.unit_type_bits else []
+
+
+def obs_entity_features(env_args: Dict[str, Any], spec: ScenarioSpec | None = None) -> Dict[str, List[Feature]]:
+    """Per-entity observation features in the order SMACv2 writes them."""
+    spec = spec or scenario_spec(env_args)
+
+    move: List[Feature] = [("directions", N_ACTIONS_MOVE, 0.0, 1.0)]
+    if env_args.get("obs_pathing_grid", False):
+        move.append(("pathing_grid", PATHING_GRID_BITS, 0.0, 1.0))
+    if env_args.get("obs_terrain_height", False):
+        move.append(("terrain_height", TERRAIN_HEIGHT_BITS, 0.0, 1.0))
+
+    enemy: List[Feature] = [
+        ("attackable", 1, 0.0, 1.0),
+        ("distance", 1, 0.0, 1.0),
+        ("rel_x", 1, -1.0, 1.0),
+        ("rel_y", 1, -1.0, 1.0),
+    ]
+    ally: List[Feature] = [
+        ("visible", 1, 0.0, 1.0),
+        ("distance", 1, 0.0, 1.0),
+        ("rel_x", 1, -1.0, 1.0),
+        ("rel_y", 1, -1.0, 1.0),
+    ]
+    if env_args.get("obs_all_health", True):
+        enemy.extend(_health_features(spec))
+        ally.extend(_health_features(spec))
+    enemy.extend(_unit_type_features(spec))
+    ally.extend(_unit_type_features(spec))
+    if env_args.get("obs_last_action", False):
+        ally.append(("last_action", spec.n_actions, 0.0, 1.0))
+
+    own: List[Feature] = []
+    if env_args.get("obs_own_health", True):
+        own.extend(_health_features(spec))
+    own.extend(_unit_type_features(spec))
+    if env_args.get("obs_own_pos", False):
+        own.append(("pos", 2, 0.0, 1.0))
+    if env_args.get("conic_fov", False):
+        own.append(("fov", 2, -1.0, 1.0))
+    if env_args.get("obs_timestep_number", False):
+        own.append(("timestep", 1, 0.0, 1.0))
+
+    return {"move": move, "enemy": enemy, "ally": ally, "own": own}
+
+
+def state_entity_features(env_args: Dict[str, Any], spec: ScenarioSpec | None = None) -> Dict[str, List[Feature]]:
+    """Per-entity global-state features in the order SMACv2 writes them."""
+    spec = spec or scenario_spec(env_args)
+    ally: List[Feature] = [
+        ("health", 1, 0.0, 1.0),
+        ("cooldown", 1, 0.0, 1.0),
+        ("rel_x", 1, -1.0, 1.0),
+        ("rel_y", 1, -1.0, 1.0),
+    ]
+    enemy: List[Feature] = [
+        ("health", 1, 0.0, 1.0),
+        ("rel_x", 1, -1.0, 1.0),
+        ("rel_y", 1, -1.0, 1.0),
+    ]
+    if spec.shield_bits:
+        ally.append(("shield", spec.shield_bits, 0.0, 1.0))
+        enemy.append(("shield", spec.shield_bits, 0.0, 1.0))
+    ally.extend(_unit_type_features(spec))
+    enemy.extend(_unit_type_features(spec))
+    return {"ally": ally, "enemy": enemy}
+
+
+def _flatten(blocks: Sequence[Tuple[str, int, List[Feature]]], offset: int = 0) -> List[FeatureSpec]:
+    layout: List[FeatureSpec] = []
+    for prefix, count, features in blocks:
+        for idx in range(count):
+            entity = f"{prefix}_{idx}" if prefix in ("enemy", "ally") else prefix
+            for name, size, low, high in features:
+                layout.append(FeatureSpec(f"{entity}.{name}", offset, size, low, high))
+                offset += size
+    return layout
+
+
+def obs_layout(env_args: Dict[str, Any]) -> List[FeatureSpec]:
+    spec = scenario_spec(env_args)
+    entities = obs_entity_features(env_args, spec)
+    return _flatten(
+        [
+            ("move", 1, entities["move"]),
+            ("enemy", spec.n_enemies, entities["enemy"]),
+            ("ally", spec.n_agents - 1, entities["ally"]),
+            ("own", 1, entities["own"]),
+        ]
+    )
+
+
+def state_layout(env_args: Dict[str, Any]) -> List[FeatureSpec]:
+    spec = scenario_spec(env_args)
+    if env_args.get("obs_instead_of_state", False):
+        per_agent = obs_layout(env_args)
+        obs_size = layout_size(per_agent)
+        return [
+            FeatureSpec(f"agent_{agent}.{feat.name}", agent * obs_size + feat.start, feat.size, feat.low, feat.high)
+            for agent in range(spec.n_agents)
+            for feat in per_agent
+        ]
+
+    entities = state_entity_features(env_args, spec)
+    layout = _flatten(
+        [
+            ("ally", spec.n_agents, entities["ally"]),
+            ("enemy", spec.n_enemies, entities["enemy"]),
+        ]
+    )
+    offset = layout_size(layout)
+    if env_args.get("state_last_action", True):
+        layout.append(FeatureSpec("last_action", offset, spec.n_agents * spec.n_actions, 0.0, 1.0))
+        offset += spec.n_agents * spec.n_actions
+    if env_args.get("state_timestep_number", False):
+        layout.append(FeatureSpec("timestep", offset, 1, 0.0, 1.0))
+    return layout
+
+
+def layout_size(layout: Sequence[FeatureSpec]) -> int:
+    return layout[-1].stop if layout else 0
+
+
+def layout_bounds(layout: Sequence[FeatureSpec]) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-column ``(low, high)`` arrays for a flattened layout."""
+    size = layout_size(layout)
+    low = np.zeros(size, dtype=np.float32)
+    high = np.ones(size, dtype=np.float32)
+    for feat in layout:
+        low[feat.start : feat.stop] = feat.low
+        high[feat.start : feat.stop] = feat.high
+    return low, high
+
+
+def _matches(feat: FeatureSpec, pattern: str) -> bool:
+    # ``health`` selects every ``*.health``; dotted patterns match the full name.
+    return fnmatchcase(feat.name, pattern) or fnmatchcase(feat.name.rsplit(".", 1)[-1], pattern)
+
+
+def select_features(
+    layout: Sequence[FeatureSpec],
+    keep: Sequence[str] | None = None,
+    drop: Sequence[str] | None = None,
+) -> Tuple[np.ndarray, List[FeatureSpec]]:
+    """Resolve keep/drop name patterns into a column index array.
+
+    Patterns are shell-style (``enemy_*.unit_type``, ``pathing_grid``,
+    ``ally_?.last_action``).  Features matching ``keep`` (all of them when it
+    is empty) and no ``drop`` pattern are selected, in layout order.  Returns
+    the ``int64`` columns to ``np.take`` and the selected layout re-packed
+    from offset 0.  A pattern that matches nothing raises ``ValueError`` so a
+    typo does not silently keep the full observation.
+    """
+    keep = list(keep or [])
+    drop = list(drop or [])
+    unmatched = [pattern for pattern in keep + drop if not any(_matches(feat, pattern) for feat in layout)]
+    if unmatched:
+        names = sorted({feat.name.rsplit(".", 1)[-1] for feat in layout})
+        raise ValueError(f"Feature patterns {unmatched} match nothing. Known features: {names}")
+
+    columns: List[np.ndarray] = []
+    selected: List[FeatureSpec] = []
+    offset = 0
+    for feat in layout:
+        if keep and not any(_matches(feat, pattern) for pattern in keep):
+            continue
+        if any(_matches(feat, pattern) for pattern in drop):
+            continue
+        columns.append(np.arange(feat.start, feat.stop, dtype=np.int64))
+        selected.append(FeatureSpec(feat.name, offset, feat.size, feat.low, feat.high))
+        offset += feat.size
+    if not selected:
+        raise ValueError("Feature selection removed every column")
+    return np.concatenate(columns), selected
+
+
+def feature_offsets(features: Sequence[Feature]) -> Dict[str, slice]:
+    """Column slices of each named feature within one entity block."""
+    offsets: Dict[str, slice] = {}
+    start = 0
+    for name, size, _, _ in features:
+        offsets[name] = slice(start, start + size)
+        start += size
+    return offsets
@@ -0,0 +1,494 @@
+"""Pure-NumPy stand-in for ``StarCraftCapabilityEnvWrapper``.
+
+It reproduces the observation/state/action sizes, ``episode_limit`` and
+avail-action masks of a ``configs/smacv2/*.yaml`` scenario without StarCraft
+II, so the wrapper, runners and learners can be benchmarked and profiled on
+any Linux box.  Battles are a crude vectorised skirmish (units move, attack
+enemies in range and die), which is enough to exercise masking, rewards and
+episode termination.  The wall-clock cost of the SC2 game step is emulated by
+a configurable cost model::
+
+    step_latency_ms + unit_latency_ms * (n_agents + n_enemies)   per step
+    reset_latency_ms                                             per reset
+
+The layout mirrors smacv2: the wrapper samples a capability config from its
+``env_key_to_distribution_map`` and hands it to an inner ``env`` whose
+``reset(episode_config)`` starts the episode.
+
+For exercising the :class:`~wrappers.smacv2_env.SMACv2Env` watchdog, each
+step/reset can also stall for ``stall_s`` seconds (``stall_prob``) or kill the
+"process" (``crash_prob``), after which every call raises ``ConnectionError``
+like a dead SC2 websocket.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from wrappers.smacv2_features import (
+    N_ACTIONS_MOVE,
+    N_ACTIONS_NO_ATTACK,
+    feature_offsets,
+    layout_size,
+    obs_entity_features,
+    obs_layout,
+    scenario_spec,
+    state_entity_features,
+    state_layout,
+)
+
+SIGHT_RANGE = 9.0
+SHOOT_RANGE = 6.0
+# Fraction of a unit's health removed by a single attack.
+ATTACK_DAMAGE = 0.15
+# Unit offsets for the north/south/east/west move actions.
+MOVE_DIRECTIONS = np.array([[0.0, 1.0], [0.0, -1.0], [1.0, 0.0], [-1.0, 0.0]], dtype=np.float32)
+
+
+class _WeightedTeamsDistribution:
+    def __init__(self, config: Dict[str, Any], n_units: int, n_enemies: int, rng: np.random.Generator) -> None:
+        self.unit_types = list(config.get("unit_types", []) or ["unit"])
+        weights = np.asarray(config.get("weights") or [1.0] * len(self.unit_types), dtype=np.float64)
+        self.weights = weights / weights.sum()
+        self.n_units = n_units
+        self.n_enemies = n_enemies
+        self.rng = rng
+
+    def generate(self) -> Dict[str, Any]:
+        ally = self.rng.choice(len(self.unit_types), size=self.n_units, p=self.weights)
+        enemy = np.concatenate(
+            [ally, self.rng.choice(len(self.unit_types), size=max(self.n_enemies - self.n_units, 0), p=self.weights)]
+        )[: self.n_enemies]
+        return {"team_gen": {"ally_team": ally, "enemy_team": enemy}}
+
+
+class _SurroundedAndReflectDistribution:
+    def __init__(self, config: Dict[str, Any], n_units: int, n_enemies: int, rng: np.random.Generator) -> None:
+        self.p = float(config.get("p", 0.5))
+        self.map_x = float(config.get("map_x", 32))
+        self.map_y = float(config.get("map_y", 32))
+        self.n_units = n_units
+        self.n_enemies = n_enemies
+        self.rng = rng
+
+    def generate(self) -> Dict[str, Any]:
+        centre = np.array([self.map_x / 2, self.map_y / 2], dtype=np.float32)
+        ally = centre + self.rng.normal(0.0, 1.0, size=(self.n_units, 2)).astype(np.float32)
+        if self.rng.random() < self.p:
+            angles = self.rng.uniform(0.0, 2 * np.pi, size=self.n_enemies)
+            radius = min(self.map_x, self.map_y) / 4
+            enemy = centre + radius * np.stack([np.cos(angles), np.sin(angles)], axis=1).astype(np.float32)
+        else:
+            enemy = np.array([self.map_x, self.map_y], dtype=np.float32) - ally[np.arange(self.n_enemies) % self.n_units]
+        return {
+            "ally_start_positions": {"item": ally},
+            "enemy_start_positions": {"item": enemy.astype(np.float32)},
+        }
+
+
+class SyntheticStarCraft2Env:
+    """Vectorised NumPy battle with SMACv2-shaped observations."""
+
+    def __init__(
+        self,
+        step_latency_ms: float = 0.0,
+        unit_latency_ms: float = 0.0,
+        reset_latency_ms: float = 0.0,
+        seed: int | None = None,
+        stall_prob: float = 0.0,
+        crash_prob: float = 0.0,
+        stall_s: float = 3600.0,
+        **env_args: Any,
+    ) -> None:
+        self.env_args = env_args
+        self.spec = scenario_spec(env_args)
+        self.n_agents = self.spec.n_agents
+        self.n_enemies = self.spec.n_enemies
+        self.n_actions = self.spec.n_actions
+        self.episode_limit = self.spec.episode_limit
+        self.rng = np.random.default_rng(seed)
+
+        self._step_cost = (step_latency_ms + unit_latency_ms * (self.n_agents + self.n_enemies)) / 1000.0
+        self._reset_cost = reset_latency_ms / 1000.0
+
+        self._stall_prob = stall_prob
+        self._crash_prob = crash_prob
+        self._stall_s = stall_s
+        self._fault_rng = np.random.default_rng(None if seed is None else [seed, 1])
+        self._dead = False
+        self._closed = threading.Event()
+
+        self._obs_features = obs_entity_features(env_args, self.spec)
+        self._state_features = state_entity_features(env_args, self.spec)
+        self._obs_size = layout_size(obs_layout(env_args))
+        self._state_size = layout_size(state_layout(env_args))
+
+        self._episode_steps = 0
+        self._last_action = np.zeros((self.n_agents, self.n_actions), dtype=np.float32)
+        self.battles_won = 0
+        self.battles_game = 0
+        self.timeouts = 0
+        self.force_restarts = 0
+
+    # Episode dynamics -----------------------------------------------------------------
+    def reset(self, episode_config: Dict[str, Any] | None = None):
+        episode_config = episode_config or {}
+        self._maybe_fail("reset")
+        if self._reset_cost:
+            time.sleep(self._reset_cost)
+
+        team = episode_config.get("team_gen", {})
+        n_types = max(self.spec.unit_type_bits, 1)
+        self.ally_types = np.asarray(team.get("ally_team", np.zeros(self.n_agents)), dtype=np.int64) % n_types
+        self.enemy_types = np.asarray(team.get("enemy_team", np.zeros(self.n_enemies)), dtype=np.int64) % n_types
+
+        centre = np.array([self.spec.map_x / 2, self.spec.map_y / 2], dtype=np.float32)
+        ally_pos = episode_config.get("ally_start_positions", {}).get("item")
+        enemy_pos = episode_config.get("enemy_start_positions", {}).get("item")
+        self.ally_pos = (centre - 4 if ally_pos is None else np.asarray(ally_pos, dtype=np.float32)).reshape(-1, 2)
+        self.enemy_pos = (centre + 4 if enemy_pos is None else np.asarray(enemy_pos, dtype=np.float32)).reshape(-1, 2)
+        self.ally_pos = np.broadcast_to(self.ally_pos, (self.n_agents, 2)).copy()
+        self.enemy_pos = np.broadcast_to(self.enemy_pos, (self.n_enemies, 2)).copy()
+
+        self.ally_health = np.ones(self.n_agents, dtype=np.float32)
+        self.enemy_health = np.ones(self.n_enemies, dtype=np.float32)
+        self.ally_shield = np.ones(self.n_agents, dtype=np.float32)
+        self.enemy_shield = np.ones(self.n_enemies, dtype=np.float32)
+        self.ally_cooldown = np.zeros(self.n_agents, dtype=np.float32)
+        self._last_action.fill(0.0)
+        self._episode_steps = 0
+        return self.get_obs(), self.get_state()
+
+    def step(self, actions):
+        self._maybe_fail("step")
+        if self._step_cost:
+            time.sleep(self._step_cost)
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.n_agents)
+        ally_alive = self.ally_health > 0
+        enemy_alive_before = self.enemy_health > 0
+        enemy_hp_before = self.enemy_health.sum() + self.enemy_shield.sum()
+
+        self._last_action.fill(0.0)
+        self._last_action[np.arange(self.n_agents), actions] = 1.0
+
+        # Moves.
+        move_idx = actions - 2
+        moving = ally_alive & (move_idx >= 0) & (move_idx < N_ACTIONS_MOVE)
+        move_amount = float(self.env_args.get("move_amount", 2))
+        self.ally_pos[moving] += move_amount * MOVE_DIRECTIONS[move_idx[moving]]
+        np.clip(self.ally_pos, 0.0, [self.spec.map_x, self.spec.map_y], out=self.ally_pos)
+
+        # Ally attacks (only against live enemies in range, as enforced by the mask).
+        target = actions - N_ACTIONS_NO_ATTACK
+        attacking = ally_alive & (target >= 0) & (target < self.n_enemies)
+        if attacking.any():
+            damage = np.bincount(target[attacking], minlength=self.n_enemies).astype(np.float32) * ATTACK_DAMAGE
+            self._apply_damage(self.enemy_health, self.enemy_shield, damage)
+        self.ally_cooldown = np.where(attacking, 1.0, np.maximum(self.ally_cooldown - 0.5, 0.0)).astype(np.float32)
+
+        # Enemies close in and hit the nearest live ally in range.
+        enemy_alive = self.enemy_health > 0
+        if enemy_alive.any() and ally_alive.any():
+            dist = self._distances(self.enemy_pos, self.ally_pos)
+            dist[:, ~ally_alive] = np.inf
+            nearest = dist.argmin(axis=1)
+            delta = self.ally_pos[nearest] - self.enemy_pos
+            norm = np.maximum(np.linalg.norm(delta, axis=1, keepdims=True), 1e-6)
+            step = np.minimum(norm, 1.0) * delta / norm
+            in_range = dist[np.arange(self.n_enemies), nearest] <= SHOOT_RANGE
+            self.enemy_pos[enemy_alive & ~in_range] += step[enemy_alive & ~in_range]
+            hits = enemy_alive & in_range & (self.rng.random(self.n_enemies) < 0.5)
+            if hits.any():
+                damage = np.bincount(nearest[hits], minlength=self.n_agents).astype(np.float32) * ATTACK_DAMAGE
+                self._apply_damage(self.ally_health, self.ally_shield, damage)
+
+        self._episode_steps += 1
+        enemy_alive = self.enemy_health > 0
+        dead_enemies = int((~enemy_alive).sum())
+        dead_allies = int((self.ally_health <= 0).sum())
+        won = dead_enemies == self.n_enemies
+        lost = dead_allies == self.n_agents
+        timeout = self._episode_steps >= self.episode_limit
+        terminated = won or lost or timeout
+
+        reward = self._reward(enemy_hp_before, enemy_alive_before & ~enemy_alive, won)
+        info: Dict[str, Any] = {"battle_won": won, "dead_allies": dead_allies, "dead_enemies": dead_enemies}
+        if terminated:
+            self.battles_game += 1
+            self.battles_won += int(won)
+            if timeout and not (won or lost):
+                self.timeouts += 1
+                info["episode_limit"] = True
+        return reward, terminated, info
+
+    def _maybe_fail(self, call: str) -> None:
+        if self._dead or self._closed.is_set():
+            raise ConnectionError("Synthetic SC2 process is gone")
+        if not (self._stall_prob or self._crash_prob):
+            return
+        draw = self._fault_rng.random()
+        if draw < self._crash_prob:
+            self._dead = True
+            raise ConnectionError(f"Synthetic SC2 process crashed during {call}")
+        if draw < self._crash_prob + self._stall_prob and self._closed.wait(self._stall_s):
+            raise ConnectionError(f"Synthetic SC2 process was closed while {call} stalled")
+
+    def _reward(self, enemy_hp_before: float, killed: np.ndarray, won: bool) -> float:
+        death_value = float(self.env_args.get("reward_death_value", 10))
+        win_value = float(self.env_args.get("reward_win", 200))
+        damage = float(enemy_hp_before - self.enemy_health.sum() - self.enemy_shield.sum())
+        reward = damage + death_value * int(killed.sum()) + (win_value if won else 0.0)
+        if self.env_args.get("reward_scale", True):
+            max_reward = self.n_enemies * (death_value + 1 + self.spec.shield_bits) + win_value
+            reward /= max_reward / float(self.env_args.get("reward_scale_rate", 20))
+        return reward
+
+    @staticmethod
+    def _apply_damage(health: np.ndarray, shield: np.ndarray, damage: np.ndarray) -> None:
+        absorbed = np.minimum(shield, damage)
+        shield -= absorbed
+        np.maximum(health - (damage - absorbed), 0.0, out=health)
+
+    @staticmethod
+    def _distances(src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        return np.linalg.norm(src[:, None, :] - dst[None, :, :], axis=-1)
+
+    # Observations ---------------------------------------------------------------------
+    def _unit_type_onehot(self, types: np.ndarray) -> np.ndarray:
+        return np.eye(max(self.spec.unit_type_bits, 1), dtype=np.float32)[types][:, : self.spec.unit_type_bits]
+
+    def _fill(self, block: np.ndarray, offsets: Dict[str, slice], name: str, values: np.ndarray) -> None:
+        if name in offsets:
+            block[..., offsets[name]] = values.reshape(block[..., offsets[name]].shape)
+
+    def get_obs(self) -> List[np.ndarray]:
+        n, m = self.n_agents, self.n_enemies
+        ally_alive = self.ally_health > 0
+        enemy_alive = self.enemy_health > 0
+        blocks: List[np.ndarray] = []
+
+        move = np.zeros((n, sum(f[1] for f in self._obs_features["move"])), dtype=np.float32)
+        move[:, :N_ACTIONS_MOVE] = ally_alive[:, None]
+        blocks.append(move)
+
+        feats = self._obs_features["enemy"]
+        offsets = feature_offsets(feats)
+        enemy = np.zeros((n, m, sum(f[1] for f in feats)), dtype=np.float32)
+        delta = (self.enemy_pos[None, :, :] - self.ally_pos[:, None, :]) / SIGHT_RANGE
+        dist = np.linalg.norm(delta, axis=-1)
+        visible = (dist < 1.0) & ally_alive[:, None] & enemy_alive[None, :]
+        self._fill(enemy, offsets, "attackable", dist * SIGHT_RANGE <= SHOOT_RANGE)
+        self._fill(enemy, offsets, "distance", dist)
+        self._fill(enemy, offsets, "rel_x", delta[..., 0])
+        self._fill(enemy, offsets, "rel_y", delta[..., 1])
+        self._fill(enemy, offsets, "health", np.broadcast_to(self.enemy_health, (n, m)))
+        self._fill(enemy, offsets, "shield", np.broadcast_to(self.enemy_shield, (n, m)))
+        self._fill(enemy, offsets, "unit_type", np.broadcast_to(self._unit_type_onehot(self.enemy_types), (n, m, self.spec.unit_type_bits)))
+        enemy *= visible[..., None]
+        blocks.append(enemy.reshape(n, -1))
+
+        if n > 1:
+            feats = self._obs_features["ally"]
+            offsets = feature_offsets(feats)
+            # Row i lists every ally except agent i, in index order.
+            others = np.array([[j for j in range(n) if j != i] for i in range(n)], dtype=np.int64)
+            ally = np.zeros((n, n - 1, sum(f[1] for f in feats)), dtype=np.float32)
+            delta = (self.ally_pos[others] - self.ally_pos[:, None, :]) / SIGHT_RANGE
+            dist = np.linalg.norm(delta, axis=-1)
+            visible = (dist < 1.0) & ally_alive[:, None] & ally_alive[others]
+            self._fill(ally, offsets, "visible", visible)
+            self._fill(ally, offsets, "distance", dist)
+            self._fill(ally, offsets, "rel_x", delta[..., 0])
+            self._fill(ally, offsets, "rel_y", delta[..., 1])
+            self._fill(ally, offsets, "health", self.ally_health[others])
+            self._fill(ally, offsets, "shield", self.ally_shield[others])
+            self._fill(ally, offsets, "unit_type", self._unit_type_onehot(self.ally_types)[others])
+            self._fill(ally, offsets, "last_action", self._last_action[others])
+            ally *= visible[..., None]
+            blocks.append(ally.reshape(n, -1))
+
+        feats = self._obs_features["own"]
+        offsets = feature_offsets(feats)
+        own = np.zeros((n, sum(f[1] for f in feats)), dtype=np.float32)
+        self._fill(own, offsets, "health", self.ally_health)
+        self._fill(own, offsets, "shield", self.ally_shield)
+        self._fill(own, offsets, "unit_type", self._unit_type_onehot(self.ally_types))
+        self._fill(own, offsets, "pos", self.ally_pos / np.array([self.spec.map_x, self.spec.map_y], dtype=np.float32))
+        self._fill(own, offsets, "timestep", np.full(n, self._episode_steps / self.episode_limit, dtype=np.float32))
+        own *= ally_alive[:, None]
+        blocks.append(own)
+
+        obs = np.concatenate(blocks, axis=1)
+        return list(obs)
+
+    def get_obs_agent(self, agent_id: int) -> np.ndarray:
+        return self.get_obs()[agent_id]
+
+    def get_obs_size(self) -> int:
+        return self._obs_size
+
+    def get_state(self) -> np.ndarray:
+        if self.env_args.get("obs_instead_of_state", False):
+            return np.concatenate(self.get_obs(), axis=0).astype(np.float32)
+
+        centre = np.array([self.spec.map_x / 2, self.spec.map_y / 2], dtype=np.float32)
+        scale = np.array([self.spec.map_x, self.spec.map_y], dtype=np.float32) / 2
+        parts: List[np.ndarray] = []
+
+        feats = self._state_features["ally"]
+        offsets = feature_offsets(feats)
+        ally = np.zeros((self.n_agents, sum(f[1] for f in feats)), dtype=np.float32)
+        rel = (self.ally_pos - centre) / scale
+        self._fill(ally, offsets, "health", self.ally_health)
+        self._fill(ally, offsets, "cooldown", self.ally_cooldown)
+        self._fill(ally, offsets, "rel_x", rel[:, 0])
+        self._fill(ally, offsets, "rel_y", rel[:, 1])
+        self._fill(ally, offsets, "shield", self.ally_shield)
+        self._fill(ally, offsets, "unit_type", self._unit_type_onehot(self.ally_types))
+        ally *= (self.ally_health > 0)[:, None]
+        parts.append(ally.reshape(-1))
+
+        feats = self._state_features["enemy"]
+        offsets = feature_offsets(feats)
+        enemy = np.zeros((self.n_enemies, sum(f[1] for f in feats)), dtype=np.float32)
+        rel = (self.enemy_pos - centre) / scale
+        self._fill(enemy, offsets, "health", self.enemy_health)
+        self._fill(enemy, offsets, "rel_x", rel[:, 0])
+        self._fill(enemy, offsets, "rel_y", rel[:, 1])
+        self._fill(enemy, offsets, "shield", self.enemy_shield)
+        self._fill(enemy, offsets, "unit_type", self._unit_type_onehot(self.enemy_types))
+        enemy *= (self.enemy_health > 0)[:, None]
+        parts.append(enemy.reshape(-1))
+
+        if self.env_args.get("state_last_action", True):
+            parts.append(self._last_action.reshape(-1))
+        if self.env_args.get("state_timestep_number", False):
+            parts.append(np.array([self._episode_steps / self.episode_limit], dtype=np.float32))
+        return np.concatenate(parts).astype(np.float32)
+
+    def get_state_size(self) -> int:
+        return self._state_size
+
+    def get_avail_actions(self) -> List[np.ndarray]:
+        n = self.n_agents
+        avail = np.zeros((n, self.n_actions), dtype=np.int64)
+        alive = self.ally_health > 0
+        avail[~alive, 0] = 1
+        avail[alive, 1 : 2 + N_ACTIONS_MOVE] = 1
+        in_range = self._distances(self.ally_pos, self.enemy_pos) <= SHOOT_RANGE
+        in_range &= alive[:, None] & (self.enemy_health > 0)[None, :]
+        avail[:, N_ACTIONS_NO_ATTACK : N_ACTIONS_NO_ATTACK + self.n_enemies] = in_range
+        return list(avail)
+
+    def get_avail_agent_actions(self, agent_id: int) -> np.ndarray:
+        return self.get_avail_actions()[agent_id]
+
+    def get_total_actions(self) -> int:
+        return self.n_actions
+
+    def get_env_info(self) -> Dict[str, Any]:
+        return {
+            "state_shape": self.get_state_size(),
+            "obs_shape": self.get_obs_size(),
+            "n_actions": self.get_total_actions(),
+            "n_agents": self.n_agents,
+            "episode_limit": self.episode_limit,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "battles_won": self.battles_won,
+            "battles_game": self.battles_game,
+            "battles_draw": self.timeouts,
+            "win_rate": self.battles_won / max(self.battles_game, 1),
+            "timeouts": self.timeouts,
+            "restarts": self.force_restarts,
+        }
+
+    def seed(self, seed: int | None = None) -> None:
+        self.rng = np.random.default_rng(seed)
+
+    def render(self) -> None:
+        pass
+
+    def save_replay(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self._closed.set()
+
+
+class SyntheticCapabilityEnvWrapper:
+    """Drop-in replacement for ``smacv2``'s ``StarCraftCapabilityEnvWrapper``."""
+
+    _DISTRIBUTIONS = {
+        "weighted_teams": _WeightedTeamsDistribution,
+        "surrounded_and_reflect": _SurroundedAndReflectDistribution,
+    }
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.env = SyntheticStarCraft2Env(**kwargs)
+        self.episode_limit = self.env.episode_limit
+        self.n_agents = self.env.n_agents
+        self.env_key_to_distribution_map: Dict[str, Any] = {}
+        for key, config in (kwargs.get("capability_config", {}) or {}).items():
+            if not isinstance(config, dict) or config.get("dist_type") not in self._DISTRIBUTIONS:
+                continue
+            cls = self._DISTRIBUTIONS[config["dist_type"]]
+            self.env_key_to_distribution_map[key] = cls(config, self.env.n_agents, self.env.n_enemies, self.env.rng)
+
+    def reset(self):
+        reset_config: Dict[str, Any] = {}
+        for distribution in self.env_key_to_distribution_map.values():
+            reset_config = {**reset_config, **distribution.generate()}
+        return self.env.reset(reset_config)
+
+    def step(self, actions):
+        return self.env.step(actions)
+
+    def get_obs(self):
+        return self.env.get_obs()
+
+    def get_obs_agent(self, agent_id: int):
+        return self.env.get_obs_agent(agent_id)
+
+    def get_obs_size(self) -> int:
+        return self.env.get_obs_size()
+
+    def get_state(self):
+        return self.env.get_state()
+
+    def get_state_size(self) -> int:
+        return self.env.get_state_size()
+
+    def get_avail_actions(self):
+        return self.env.get_avail_actions()
+
+    def get_avail_agent_actions(self, agent_id: int):
+        return self.env.get_avail_agent_actions(agent_id)
+
+    def get_total_actions(self) -> int:
+        return self.env.get_total_actions()
+
+    def get_env_info(self) -> Dict[str, Any]:
+        return self.env.get_env_info()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.env.get_stats()
+
+    def seed(self, seed: int | None = None) -> None:
+        self.env.seed(seed)
+        for distribution in self.env_key_to_distribution_map.values():
+            distribution.rng = self.env.rng
+
+    def render(self) -> None:
+        self.env.render()
+
+    def save_replay(self) -> None:
+        self.env.save_replay()
+
+    def close(self) -> None:
+        self.env.close()
@@ -0,0 +1,245 @@
+"""Vectorised SMACv2 environment backed by shared-memory NumPy buffers."""
+from __future__ import annotations
+
+import multiprocessing as mp
+import traceback
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from wrappers.smacv2_env import SMACv2Env
+
+
+def _buffer_layout(n_envs: int, env_info: Dict[str, Any]) -> Dict[str, Tuple[Tuple[int, ...], str]]:
+    n_agents = int(env_info["n_agents"])
+    return {
+        "obs": ((n_envs, n_agents, int(env_info["obs_shape"])), env_info.get("obs_dtype", "float32")),
+        "state": ((n_envs, int(env_info["state_shape"])), env_info.get("state_dtype", "float32")),
+        "avail_actions": ((n_envs, n_agents, int(env_info["n_actions"])), "bool"),
+        "actions": ((n_envs, n_agents), "int64"),
+        "reward": ((n_envs,), "float32"),
+        "terminated": ((n_envs,), "bool"),
+    }
+
+
+class _SharedArray:
+    """NumPy view over a named ``SharedMemory`` block."""
+
+    def __init__(self, shape: Tuple[int, ...], dtype: str, name: str | None = None) -> None:
+        nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self._owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+        if self._owner:
+            self.array.fill(0)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def release(self) -> None:
+        # Drop the ndarray first so the underlying buffer can be closed.
+        self.array = None  # type: ignore[assignment]
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def _worker(remote, env_idx: int, map_name: str, seed: int | None, env_kwargs: Dict[str, Any]) -> None:
+    env: SMACv2Env | None = None
+    blocks: Dict[str, _SharedArray] = {}
+    try:
+        env = SMACv2Env(map_name=map_name, seed=seed, **env_kwargs)
+        remote.send((True, env.get_env_info()))
+
+        while True:
+            cmd, payload = remote.recv()
+            try:
+                if cmd == "attach":
+                    for key, (name, shape, dtype) in payload.items():
+                        blocks[key] = _SharedArray(shape, dtype, name=name)
+                    # Per-env slices; 1-D columns keep a length-1 axis so they stay writable views.
+                    views = {
+                        key: block.array[env_idx] if block.array.ndim > 1 else block.array[env_idx : env_idx + 1]
+                        for key, block in blocks.items()
+                    }
+                    env.bind_full_buffers(
+                        **{key: views[key] for key in ("obs", "state", "avail_actions", "reward", "terminated")}
+                    )
+                    result: Any = None
+                elif cmd == "step":
+                    result = env.step_full(views["actions"])["info"]
+                elif cmd == "reset":
+                    env.reset_full(seed=payload)
+                    result = None
+                elif cmd == "get_stats":
+                    result = env.get_stats()
+                elif cmd == "save_replay":
+                    env.save_replay()
+                    result = None
+                elif cmd == "close":
+                    remote.send((True, None))
+                    break
+                else:
+                    raise NotImplementedError(f"Unknown SMACv2VecEnv command: {cmd}")
+            except Exception:
+                remote.send((False, traceback.format_exc()))
+                continue
+            remote.send((True, result))
+    except Exception:
+        remote.send((False, traceback.format_exc()))
+    finally:
+        views = {}
+        for block in blocks.values():
+            block.release()
+        if env is not None:
+            env.close()
+        remote.close()
+
+
+class SMACv2VecEnv:
+    """Step ``n_envs`` SMACv2 instances in worker processes.
+
+    Observations, states, rewards, termination flags and avail-action masks are
+    written by the workers straight into shared-memory arrays shaped
+    ``(n_envs, n_agents, obs_dim)`` etc., so only commands and the (small) info
+    dicts travel through the pipes.  The arrays returned by :meth:`step` and
+    :meth:`reset` are views into that shared memory and are overwritten by the
+    next call; copy them if they need to outlive a step.
+    """
+
+    def __init__(
+        self,
+        map_name: str,
+        n_envs: int = 1,
+        seed: int | None = None,
+        start_method: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        if n_envs < 1:
+            raise ValueError(f"n_envs must be positive, got {n_envs}")
+        self.n_envs = n_envs
+        self._closed = False
+        self._blocks: Dict[str, _SharedArray] = {}
+
+        # Start the tracker before forking so workers share it instead of each
+        # spawning their own (which would unlink the blocks when a worker exits).
+        resource_tracker.ensure_running()
+        ctx = mp.get_context(start_method)
+        self._remotes = []
+        self._processes = []
+        for idx in range(n_envs):
+            parent_conn, child_conn = ctx.Pipe()
+            env_seed = None if seed is None else seed + idx
+            process = ctx.Process(
+                target=_worker,
+                args=(child_conn, idx, map_name, env_seed, kwargs),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._remotes.append(parent_conn)
+            self._processes.append(process)
+
+        try:
+            env_infos = [self._receive(remote) for remote in self._remotes]
+            self._env_info = env_infos[0]
+            self.episode_limit = self._env_info["episode_limit"]
+            for key, (shape, dtype) in _buffer_layout(n_envs, self._env_info).items():
+                self._blocks[key] = _SharedArray(shape, dtype)
+            specs = {
+                key: (block.name, block.array.shape, block.array.dtype.str)
+                for key, block in self._blocks.items()
+            }
+            self._broadcast("attach", specs, range(n_envs))
+        except Exception:
+            self.close()
+            raise
+
+    # Vectorised API -------------------------------------------------------------------
+    def reset(self, env_ids: Sequence[int] | None = None, seed: int | None = None):
+        ids = self._resolve_ids(env_ids)
+        payloads = [None if seed is None else seed + idx for idx in ids]
+        self._broadcast("reset", payloads, ids)
+        return self.get_obs(), self.get_state(), self.get_avail_actions()
+
+    def step(self, actions, env_ids: Sequence[int] | None = None):
+        """Step the selected envs; ``actions`` has one row per selected env."""
+        ids = self._resolve_ids(env_ids)
+        actions_buf = self._blocks["actions"].array
+        actions_buf[ids] = np.asarray(actions).reshape(len(ids), -1)
+        infos = self._broadcast("step", None, ids)
+        return (
+            self.get_obs(),
+            self.get_state(),
+            self.get_avail_actions(),
+            self._blocks["reward"].array,
+            self._blocks["terminated"].array,
+            infos,
+        )
+
+    def get_obs(self) -> np.ndarray:
+        return self._blocks["obs"].array
+
+    def get_state(self) -> np.ndarray:
+        return self._blocks["state"].array
+
+    def get_avail_actions(self) -> np.ndarray:
+        return self._blocks["avail_actions"].array
+
+    def get_env_info(self) -> Dict[str, Any]:
+        return {**self._env_info, "n_envs": self.n_envs}
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        return self._broadcast("get_stats", None, range(self.n_envs))
+
+    def save_replay(self) -> None:
+        self._broadcast("save_replay", None, range(self.n_envs))
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for remote in self._remotes:
+            try:
+                remote.send(("close", None))
+            except (BrokenPipeError, EOFError, OSError):
+                pass
+        for remote in self._remotes:
+            try:
+                remote.recv()
+            except (EOFError, OSError):
+                pass
+            remote.close()
+        for process in self._processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+        for block in self._blocks.values():
+            block.release()
+        self._blocks = {}
+
+    # Internals ------------------------------------------------------------------------
+    def _resolve_ids(self, env_ids: Sequence[int] | None) -> List[int]:
+        if env_ids is None:
+            return list(range(self.n_envs))
+        return [int(idx) for idx in env_ids]
+
+    def _broadcast(self, cmd: str, payload: Any, env_ids: Sequence[int]) -> List[Any]:
+        ids = list(env_ids)
+        payloads = payload if isinstance(payload, list) else [payload] * len(ids)
+        for idx, item in zip(ids, payloads):
+            self._remotes[idx].send((cmd, item))
+        return [self._receive(self._remotes[idx]) for idx in ids]
+
+    @staticmethod
+    def _receive(remote) -> Any:
+        ok, payload = remote.recv()
+        if not ok:
+            raise RuntimeError(f"SMACv2VecEnv worker failed:\n{payload}")
+        return payload
@@ -0,0 +1,230 @@
+"""Chunked, memory-mapped columnar trajectory storage.
+
+A recording session is a directory with one sub-directory per column (``obs``,
+``state``, ``avail_actions``, ...) holding fixed-size ``.npy`` chunks, plus::
+
+    meta.json      column shapes/dtypes, chunk size and the number of durable rows
+    episodes.bin   append-only raw int64 pairs of [start_row, length]
+
+Rows are handed to a background thread through a queue of at most
+``max_pending`` items, so the step loop only pays for a copy of the arrays and
+blocks only when the disk falls that far behind.  Each finished episode
+appends 16 bytes to the index; chunks and index are flushed and ``meta.json``
+rewritten only on chunk rollover and on close, so after a crash the reader
+sees every episode up to the last flush.  :class:`TrajectoryReader` maps the
+chunks read-only and returns zero-copy views for episodes that do not straddle
+a chunk boundary.
+"""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+META_FILE = "meta.json"
+EPISODES_FILE = "episodes.bin"
+
+ColumnSpec = Tuple[Tuple[int, ...], str]
+
+
+def _chunk_path(root: Path, column: str, chunk_idx: int) -> Path:
+    return root / column / f"chunk_{chunk_idx:05d}.npy"
+
+
+def _atomic_write(path: Path, writer) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as handle:
+        writer(handle)
+    os.replace(tmp, path)
+
+
+class TrajectoryRecorder:
+    """Append step rows to memory-mapped column chunks from a writer thread."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        columns: Dict[str, ColumnSpec],
+        chunk_steps: int = 4096,
+        max_pending: int = 8192,
+    ) -> None:
+        if chunk_steps < 1:
+            raise ValueError(f"chunk_steps must be positive, got {chunk_steps}")
+        if max_pending < 1:
+            raise ValueError(f"max_pending must be positive, got {max_pending}")
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.columns = {name: (tuple(shape), np.dtype(dtype).str) for name, (shape, dtype) in columns.items()}
+        self.chunk_steps = chunk_steps
+
+        self._queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=max_pending)
+        self._chunks: Dict[str, np.memmap] = {}
+        self._chunk_idx = -1
+        self._n_steps = 0
+        self._episode_start = 0
+        self._index = (self.root / EPISODES_FILE).open("wb")
+        self._error: BaseException | None = None
+        self._closed = False
+
+        for name in self.columns:
+            (self.root / name).mkdir(exist_ok=True)
+        self._write_meta()
+        self._thread = threading.Thread(target=self._run, name="trajectory-recorder", daemon=True)
+        self._thread.start()
+
+    # Producer side --------------------------------------------------------------------
+    def append(self, **row: Any) -> None:
+        """Queue one step; arrays are copied so callers may reuse their buffers."""
+        self._raise_pending_error()
+        missing = set(self.columns) - set(row)
+        if missing:
+            raise KeyError(f"Missing trajectory columns: {sorted(missing)}")
+        self._queue.put(("row", {name: np.array(row[name], dtype=self.columns[name][1]) for name in self.columns}))
+
+    def end_episode(self) -> None:
+        self._raise_pending_error()
+        self._queue.put(("episode", None))
+
+    def flush(self) -> None:
+        """Block until every queued row has been written and the indexed episodes are readable."""
+        self._raise_pending_error()
+        self._queue.put(("flush", None))
+        self._queue.join()
+        self._raise_pending_error()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(("stop", None))
+        self._thread.join()
+        self._raise_pending_error()
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Trajectory recorder writer thread failed") from self._error
+
+    # Writer thread --------------------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            kind, payload = self._queue.get()
+            try:
+                if self._error is None:
+                    if kind == "row":
+                        self._write_row(payload)
+                    elif kind == "episode":
+                        self._finish_episode()
+                    elif kind == "flush":
+                        self._checkpoint()
+                    elif kind == "stop":
+                        self._finish_episode()
+                        self._checkpoint()
+            except BaseException as exc:  # pragma: no cover - surfaced on next call
+                self._error = exc
+            finally:
+                self._queue.task_done()
+            if kind == "stop":
+                self._index.close()
+                return
+
+    def _write_row(self, row: Dict[str, np.ndarray]) -> None:
+        chunk_idx, offset = divmod(self._n_steps, self.chunk_steps)
+        if chunk_idx != self._chunk_idx:
+            self._open_chunk(chunk_idx)
+        for name, value in row.items():
+            self._chunks[name][offset] = value
+        self._n_steps += 1
+
+    def _open_chunk(self, chunk_idx: int) -> None:
+        self._checkpoint()
+        self._chunks = {
+            name: np.lib.format.open_memmap(
+                _chunk_path(self.root, name, chunk_idx),
+                mode="w+",
+                dtype=dtype,
+                shape=(self.chunk_steps, *shape),
+            )
+            for name, (shape, dtype) in self.columns.items()
+        }
+        self._chunk_idx = chunk_idx
+
+    def _checkpoint(self) -> None:
+        """Flush chunks, then the index, then publish the indexed row count in meta."""
+        for chunk in self._chunks.values():
+            chunk.flush()
+        self._index.flush()
+        self._write_meta()
+
+    def _finish_episode(self) -> None:
+        length = self._n_steps - self._episode_start
+        if length <= 0:
+            return
+        self._index.write(np.array([self._episode_start, length], dtype=np.int64).tobytes())
+        self._episode_start = self._n_steps
+
+    def _write_meta(self) -> None:
+        meta = {
+            "chunk_steps": self.chunk_steps,
+            # Rows after the last completed episode are not indexed yet.  Index
+            # entries past this count were written after the last flush.
+            "n_steps": self._episode_start,
+            "columns": {name: {"shape": list(shape), "dtype": dtype} for name, (shape, dtype) in self.columns.items()},
+        }
+        payload = json.dumps(meta, indent=2).encode("utf-8")
+        _atomic_write(self.root / META_FILE, lambda handle: handle.write(payload))
+
+
+class TrajectoryReader:
+    """Read-only, memory-mapped access to a recording session."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        with (self.root / META_FILE).open("r", encoding="utf-8") as handle:
+            meta = json.load(handle)
+        self.chunk_steps = int(meta["chunk_steps"])
+        self.n_steps = int(meta["n_steps"])
+        self.columns = {name: (tuple(spec["shape"]), spec["dtype"]) for name, spec in meta["columns"].items()}
+        episodes_path = self.root / EPISODES_FILE
+        episodes = np.fromfile(episodes_path, dtype=np.int64) if episodes_path.exists() else np.zeros(0, dtype=np.int64)
+        episodes = episodes[: len(episodes) // 2 * 2].reshape(-1, 2)
+        # Keep only episodes whose rows were flushed when meta.json was written.
+        self.episodes = episodes[episodes.sum(axis=1) <= self.n_steps]
+        self._chunks: Dict[Tuple[str, int], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.episodes)
+
+    def _chunk(self, column: str, chunk_idx: int) -> np.ndarray:
+        key = (column, chunk_idx)
+        if key not in self._chunks:
+            self._chunks[key] = np.load(_chunk_path(self.root, column, chunk_idx), mmap_mode="r")
+        return self._chunks[key]
+
+    def rows(self, column: str, start: int, stop: int) -> np.ndarray:
+        """Rows ``[start, stop)`` of a column; a view unless they span chunks."""
+        first_chunk, first_offset = divmod(start, self.chunk_steps)
+        last_chunk = (stop - 1) // self.chunk_steps
+        if first_chunk == last_chunk:
+            return self._chunk(column, first_chunk)[first_offset : first_offset + (stop - start)]
+        parts = []
+        for chunk_idx in range(first_chunk, last_chunk + 1):
+            lo = max(start - chunk_idx * self.chunk_steps, 0)
+            hi = min(stop - chunk_idx * self.chunk_steps, self.chunk_steps)
+            parts.append(self._chunk(column, chunk_idx)[lo:hi])
+        return np.concatenate(parts)
+
+    def episode(self, index: int, columns: Sequence[str] | None = None) -> Dict[str, np.ndarray]:
+        start, length = (int(v) for v in self.episodes[index])
+        names = columns or list(self.columns)
+        return {name: self.rows(name, start, start + length) for name in names}
+
+
+def list_sessions(record_dir: str | Path) -> List[Path]:
+    """Session directories (one per recording env instance) under ``record_dir``."""
+    root = Path(record_dir)
+    return sorted(path.parent for path in root.glob(f"*/{META_FILE}"))
@@ -0,0 +1,55 @@
+"""Per-call timeouts for environment backends that may hang.
+
+A hung SC2 call blocks in a websocket read that cannot be interrupted from
+Python, so :class:`CallWatchdog` runs calls on a daemon thread and lets the
+caller give up after ``timeout`` seconds.  The abandoned thread is left to
+finish (or die with the backend process once it is closed) and a fresh
+watchdog is created for the relaunched backend.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable
+
+
+class BackendFailure(RuntimeError):
+    """A backend call timed out (``kind == "timeout"``) or raised (``"crash"``)."""
+
+    def __init__(self, call: str, kind: str, detail: str) -> None:
+        super().__init__(f"SMACv2 backend {call} {kind}: {detail}")
+        self.call = call
+        self.kind = kind
+
+
+class CallWatchdog:
+    def __init__(self, name: str) -> None:
+        self._requests: "queue.SimpleQueue[tuple | None]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def call(self, timeout: float | None, name: str, fn: Callable[..., Any], *args: Any) -> Any:
+        future: Future = Future()
+        self._requests.put((future, fn, args))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout as exc:
+            raise BackendFailure(name, "timeout", f"no reply after {timeout:.1f}s") from exc
+
+    def stop(self) -> None:
+        self._requests.put(None)
+
+    def _run(self) -> None:
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            future, fn, args = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as exc:
+                future.set_exception(exc)